@@ -3,11 +3,44 @@
 Generate test CSV data for CSV Splitter GUI testing.
 
 This script creates sample CSV files with various data patterns
-to test the CSV Splitter functionality.
+to test the CSV Splitter functionality. It can also generate large,
+seeded synthetic datasets for benchmarking:
+
+    python examples/generate_test_data.py
+    python examples/generate_test_data.py synthetic big.csv --size 2GB \
+        --cardinality 10,1000,0 --skew 1.1 --quoted-fraction 0.05 --workers 8
+    python examples/generate_test_data.py synthetic big.csv.gz --rows 50000000
+
+Synthetic output is identical for the same seed and options whatever
+the number of workers, because every chunk of rows is seeded on its own.
 """
 
+import argparse
+import bz2
 import csv
+import gzip
+import io
+import itertools
+import lzma
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+from multiprocessing import Pool
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+COMPRESSORS = {
+    # A fixed mtime keeps gzip headers, and so the output, identical between runs
+    "gzip": (".gz", lambda path, level: gzip.GzipFile(path, "wb", compresslevel=level, mtime=0)),
+    "bz2": (".bz2", lambda path, level: bz2.open(path, "wb", compresslevel=level)),
+    "xz": (".xz", lambda path, level: lzma.open(path, "wb", preset=level)),
+}
+
+DEFAULT_CHUNK_ROWS = 100_000
+NUMERIC_VALUE_RANGE = 1_000_000_000  # Values for unbounded (cardinality 0) columns
 
 
 def create_test_data_directory():
@@ -72,8 +105,182 @@ def write_csv_file(filename, data):
     print(f"Generated: {filename}")
 
 
-def main():
-    """Generate all test data files."""
+class SyntheticSpec:
+    """Options for a synthetic dataset."""
+
+    def __init__(
+        self,
+        rows: int,
+        cardinalities: Sequence[int],
+        skew: float = 0.0,
+        quoted_fraction: float = 0.0,
+        empty_fraction: float = 0.0,
+        seed: int = 42,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        compression: Optional[str] = None,
+        compression_level: int = 6,
+    ):
+        self.rows = rows
+        self.cardinalities = list(cardinalities)
+        self.skew = skew
+        self.quoted_fraction = quoted_fraction
+        self.empty_fraction = empty_fraction
+        self.seed = seed
+        self.chunk_rows = chunk_rows
+        self.compression = compression
+        self.compression_level = compression_level
+
+    @property
+    def header(self) -> List[str]:
+        return ["ID"] + [f"COL{i:02d}" for i in range(1, len(self.cardinalities) + 1)]
+
+
+def _vocabulary(spec: SyntheticSpec, column: int, cardinality: int) -> List[str]:
+    """
+    Build the distinct values of a bounded column.
+
+    A quoted_fraction of the values contain an embedded delimiter,
+    quote or newline so that the writer has to quote them.
+    """
+    rng = random.Random(f"{spec.seed}:vocab:{column}")
+    values = []
+    for index in range(cardinality):
+        value = f"C{column}V{index}"
+        if rng.random() < spec.quoted_fraction:
+            value = rng.choice((
+                f"{value}, with comma",
+                f'{value} "quoted"',
+                f"{value}\nsecond line",
+            ))
+        values.append(value)
+    return values
+
+
+def _cumulative_weights(spec: SyntheticSpec, cardinality: int) -> List[float]:
+    """Zipf-style cumulative weights, plus a trailing slot for empty values."""
+    weights = [1.0 / (rank ** spec.skew) for rank in range(1, cardinality + 1)]
+    total = sum(weights)
+    scale = (1.0 - spec.empty_fraction) / total
+    cum_weights = list(itertools.accumulate(w * scale for w in weights))
+    cum_weights.append(1.0)
+    return cum_weights
+
+
+# Per-process cache of (values, cum_weights) so that each worker builds a
+# column's vocabulary once rather than once per chunk
+_column_tables: Dict[tuple, tuple] = {}
+
+
+def _column_table(spec: SyntheticSpec, column: int, cardinality: int) -> tuple:
+    key = (spec.seed, column, cardinality, spec.skew, spec.quoted_fraction, spec.empty_fraction)
+    if key not in _column_tables:
+        _column_tables[key] = (
+            _vocabulary(spec, column, cardinality) + [""],
+            _cumulative_weights(spec, cardinality),
+        )
+    return _column_tables[key]
+
+
+def _generate_chunk(task) -> str:
+    """Generate one chunk of rows into a (possibly compressed) part file."""
+    spec, chunk_index, part_path = task
+    first_row = chunk_index * spec.chunk_rows
+    count = min(spec.chunk_rows, spec.rows - first_row)
+    rng = random.Random(f"{spec.seed}:chunk:{chunk_index}")
+
+    columns = [[str(i) for i in range(first_row, first_row + count)]]
+    for column, cardinality in enumerate(spec.cardinalities, start=1):
+        if cardinality > 0:
+            values, cum_weights = _column_table(spec, column, cardinality)
+            columns.append(rng.choices(values, cum_weights=cum_weights, k=count))
+        else:
+            empty = spec.empty_fraction
+            columns.append([
+                "" if empty and rng.random() < empty else str(rng.randrange(NUMERIC_VALUE_RANGE))
+                for _ in range(count)
+            ])
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(zip(*columns))
+    _write_part(spec, part_path, buffer.getvalue().encode("utf-8"))
+    return part_path
+
+
+def _write_part(spec: SyntheticSpec, part_path: str, data: bytes) -> None:
+    """Write one part; compressed parts are independent, concatenable streams."""
+    if spec.compression:
+        opener = COMPRESSORS[spec.compression][1]
+        with opener(part_path, spec.compression_level) as f:
+            f.write(data)
+    else:
+        with open(part_path, "wb") as f:
+            f.write(data)
+
+
+def estimate_rows_for_size(spec: SyntheticSpec, target_bytes: int) -> int:
+    """Estimate how many rows give an uncompressed file of target_bytes."""
+    pilot = SyntheticSpec(
+        rows=min(10_000, spec.chunk_rows), cardinalities=spec.cardinalities, skew=spec.skew,
+        quoted_fraction=spec.quoted_fraction, empty_fraction=spec.empty_fraction,
+        seed=spec.seed, chunk_rows=min(10_000, spec.chunk_rows),
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        part = _generate_chunk((pilot, 0, os.path.join(tmp_dir, "pilot.csv")))
+        bytes_per_row = os.path.getsize(part) / pilot.rows
+    return max(1, int(target_bytes / bytes_per_row))
+
+
+def generate_synthetic_csv(path, spec: SyntheticSpec, workers: int = 1) -> Path:
+    """
+    Stream a seeded synthetic CSV file to path.
+
+    Rows are generated in fixed-size chunks on a process pool, written as
+    part files and appended in order, so memory stays bounded by the
+    chunk size and the output does not depend on the worker count.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = (spec.rows + spec.chunk_rows - 1) // spec.chunk_rows
+
+    with tempfile.TemporaryDirectory(dir=str(path.parent)) as tmp_dir:
+        header_part = os.path.join(tmp_dir, "header")
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(spec.header)
+        _write_part(spec, header_part, buffer.getvalue().encode("utf-8"))
+
+        tasks = [(spec, i, os.path.join(tmp_dir, f"part{i:08d}")) for i in range(chunks)]
+        tmp_output = path.with_name(path.name + ".tmp")
+        with open(tmp_output, "wb") as out:
+            for part in itertools.chain([header_part], _run_tasks(tasks, workers)):
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+                os.unlink(part)
+        os.replace(tmp_output, path)
+    return path
+
+
+def _run_tasks(tasks, workers: int):
+    """Yield finished part files in order."""
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _generate_chunk(task)
+        return
+    with Pool(processes=workers) as pool:
+        for part in pool.imap(_generate_chunk, tasks):
+            yield part
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as 500MB, 2GB or 1048576 into bytes."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)B?\s*", text.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {text}")
+    factor = 1024 ** "BKMGT".index(match.group(2) or "B")
+    return int(float(match.group(1)) * factor)
+
+
+def generate_samples():
+    """Generate all sample test data files."""
     print("Generating test data for CSV Splitter GUI...")
     
     # Create test data directory
@@ -98,5 +305,68 @@ def main():
     print("\nLoad any of these files in CSV Splitter GUI to test functionality!")
 
 
+def main(argv=None):
+    """Generate sample files, or a synthetic dataset with the 'synthetic' command."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("samples", help="Write the small sample files (default)")
+
+    synthetic = subparsers.add_parser("synthetic", help="Write a large seeded synthetic dataset")
+    synthetic.add_argument("output", help="Output path; a .gz/.bz2/.xz suffix enables compression")
+    size_group = synthetic.add_mutually_exclusive_group(required=True)
+    size_group.add_argument("--rows", type=int, help="Number of data rows")
+    size_group.add_argument("--size", type=parse_size,
+                            help="Approximate uncompressed size, e.g. 2GB")
+    synthetic.add_argument("--columns", type=int, default=8, help="Number of columns after ID")
+    synthetic.add_argument(
+        "--cardinality", default="10,1000,0",
+        help="Comma-separated distinct values per column, repeated across columns (0 = unbounded)"
+    )
+    synthetic.add_argument("--skew", type=float, default=0.0, help="Zipf exponent (0 = uniform)")
+    synthetic.add_argument("--quoted-fraction", type=float, default=0.0,
+                           help="Share of values with embedded commas, quotes or newlines")
+    synthetic.add_argument("--empty-fraction", type=float, default=0.0,
+                           help="Share of empty values")
+    synthetic.add_argument("--compression", choices=sorted(COMPRESSORS), help="Compress the output")
+    synthetic.add_argument("--compression-level", type=int, default=6)
+    synthetic.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    synthetic.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    synthetic.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args(argv)
+    if args.command != "synthetic":
+        generate_samples()
+        return 0
+
+    compression = args.compression
+    if compression is None:
+        for name, (suffix, _) in COMPRESSORS.items():
+            if args.output.endswith(suffix):
+                compression = name
+
+    pattern = [int(value) for value in args.cardinality.split(",")]
+    spec = SyntheticSpec(
+        rows=args.rows or 0,
+        cardinalities=[pattern[i % len(pattern)] for i in range(args.columns)],
+        skew=args.skew,
+        quoted_fraction=args.quoted_fraction,
+        empty_fraction=args.empty_fraction,
+        seed=args.seed,
+        chunk_rows=args.chunk_rows,
+        compression=compression,
+        compression_level=args.compression_level,
+    )
+    if args.size:
+        spec.rows = estimate_rows_for_size(spec, args.size)
+
+    print(f"Generating {spec.rows:,} rows x {len(spec.header)} columns "
+          f"with {args.workers} worker(s)...")
+    path = generate_synthetic_csv(args.output, spec, workers=args.workers)
+    print(f"Generated: {path} ({os.path.getsize(path) / (1024 * 1024):,.1f} MB)")
+    return 0
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""
+Archive output sink: partitions written as members of one zip or tar file.
+
+Hundreds of thousands of tiny output files are bound by file system
+metadata operations, not by bytes. Written as members of a single
+archive they become one large sequential write. Each partition is
+encoded into an in-memory buffer and written as one member when the
+input ends; a partition whose buffer reaches its limit is written as
+numbered part members instead, each with its own header.
+"""
+
+import io
+import os
+import tarfile
+import time
+import zipfile
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .config import Config
+from .exceptions import FileOperationError, ValidationError
+from .profiling import NULL_PROFILER
+from .writers import PartitionInfo, RollingPolicy, encode_rows, unique_name
+
+
+ARCHIVE_FORMATS: Tuple[str, ...] = ("zip", "tar")
+
+_FORMAT_SUFFIXES: Tuple[Tuple[str, str], ...] = (
+    (".zip", "zip"), (".tar", "tar"), (".tar.gz", "tar"), (".tgz", "tar"),
+)
+_GZIP_SUFFIXES: Tuple[str, ...] = (".tar.gz", ".tgz")
+
+
+def archive_format_for(path: str) -> Optional[str]:
+    """Archive format implied by a file name, or None if the suffix is unknown."""
+    lower = path.lower()
+    for suffix, archive_format in _FORMAT_SUFFIXES:
+        if lower.endswith(suffix):
+            return archive_format
+    return None
+
+
+def default_compression_level(
+    path: str, archive_format: str, compression_level: Optional[int]
+) -> Optional[int]:
+    """
+    Compression level to write an archive with.
+
+    A tar archive named .tar.gz or .tgz without a level is gzipped at
+    Config.ARCHIVE_GZIP_LEVEL, so its content matches its name.
+    """
+    gzip_suffix = path.lower().endswith(_GZIP_SUFFIXES)
+    if compression_level is None and archive_format == "tar" and gzip_suffix:
+        return Config.ARCHIVE_GZIP_LEVEL
+    return compression_level
+
+
+def validate_archive_options(archive_format: str, compression_level: Optional[int]) -> None:
+    """
+    Check an archive format and compression level.
+
+    Raises:
+        ValidationError: If the format is unknown or the level is not 0-9
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValidationError(
+            f"Unknown archive format '{archive_format}'. "
+            f"Choose one of: {', '.join(ARCHIVE_FORMATS)}"
+        )
+    if compression_level is not None and (
+        isinstance(compression_level, bool) or not isinstance(compression_level, int)
+        or not 0 <= compression_level <= 9
+    ):
+        raise ValidationError("Compression level must be an integer from 0 to 9")
+
+
+class _MemberBuffer:
+    """Encoded rows of one partition not yet written to the archive."""
+
+    __slots__ = ('data', 'rows')
+
+    def __init__(self, header: bytes):
+        self.data = bytearray(header)
+        self.rows = 0
+
+
+class ArchiveSink:
+    """Writes keyed rows as CSV members of a single zip or tar archive."""
+
+    def __init__(
+        self,
+        archive: str,
+        header: List[str],
+        name_for: Callable[[Tuple], str],
+        archive_format: str = "zip",
+        compression_level: Optional[int] = None,
+        member_bytes: int = Config.ARCHIVE_MEMBER_BYTES,
+        buffer_bytes: int = Config.ARCHIVE_BUFFER_BYTES,
+        profiler=NULL_PROFILER
+    ):
+        """
+        Initialize archive sink and start writing the archive.
+
+        Args:
+            archive: Path of the archive to create; an existing file is
+                replaced once every member has been written
+            header: Header row at the top of every member
+            name_for: Function mapping a split key to its member name
+            archive_format: "zip" or "tar"
+            compression_level: Deflate level 0-9 of every zip member, or of
+                the gzip stream wrapping a tar archive; None stores the
+                members uncompressed, except that a tar archive named
+                .tar.gz or .tgz is gzipped at Config.ARCHIVE_GZIP_LEVEL
+            member_bytes: Encoded bytes buffered for one partition before
+                they are written as a part member
+            buffer_bytes: Encoded bytes buffered across all partitions;
+                above it the largest buffers are written as part members
+            profiler: Phase profiler recording encoding, write and close time
+
+        Raises:
+            ValidationError: If the format or compression level is invalid
+            FileOperationError: If the archive cannot be created
+        """
+        validate_archive_options(archive_format, compression_level)
+        compression_level = default_compression_level(archive, archive_format, compression_level)
+        self.archive = archive
+        self.name_for = name_for
+        self.archive_format = archive_format
+        self.compression_level = compression_level
+        self.member_bytes = max(1, member_bytes)
+        self.buffer_bytes = max(self.member_bytes, buffer_bytes)
+        self.profiler = profiler
+        # Every member written, in archive order, and the rows of every key
+        self.members: List[PartitionInfo] = []
+        self.key_rows: Dict[Tuple, int] = {}
+        self.buffered_bytes = 0
+        self.peak_buffered_bytes = 0
+
+        with profiler.phase("encoding"):
+            self._header = encode_rows([header])
+        self._buffers: Dict[Tuple, _MemberBuffer] = {}
+        # Member name and last part number of every key written in parts
+        self._names: Dict[Tuple, str] = {}
+        self._parts: Dict[Tuple, int] = {}
+        self._used_names: Set[str] = set()
+        self._mtime = time.time()
+        self._temp_path = archive + '.building'
+        self._file = None
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(archive)), exist_ok=True)
+            self._file = open(self._temp_path, 'wb', buffering=Config.ARCHIVE_WRITE_BUFFER_SIZE)
+            if archive_format == "zip":
+                if compression_level is None:
+                    compression = zipfile.ZIP_STORED
+                else:
+                    compression = zipfile.ZIP_DEFLATED
+                self._zip = zipfile.ZipFile(
+                    self._file, 'w', compression=compression, allowZip64=True,
+                    compresslevel=compression_level
+                )
+            elif compression_level is None:
+                self._tar = tarfile.open(fileobj=self._file, mode='w')
+            else:
+                self._tar = tarfile.open(
+                    fileobj=self._file, mode='w:gz', compresslevel=compression_level
+                )
+        except OSError as e:
+            self.abort()
+            raise FileOperationError(f"Cannot create archive {archive}: {e}")
+
+    def write(self, split_key: Tuple, rows: Sequence[Sequence[str]]) -> None:
+        """Buffer rows of a partition, writing a part member once its buffer is full."""
+        buffer = self._buffers.get(split_key)
+        if buffer is None:
+            buffer = self._buffers[split_key] = _MemberBuffer(self._header)
+            self.buffered_bytes += len(buffer.data)
+            self.key_rows.setdefault(split_key, 0)
+        with self.profiler.phase("encoding"):
+            data = encode_rows(rows)
+        buffer.data += data
+        buffer.rows += len(rows)
+        self.key_rows[split_key] += len(rows)
+        self.buffered_bytes += len(data)
+        self.peak_buffered_bytes = max(self.peak_buffered_bytes, self.buffered_bytes)
+        if len(buffer.data) >= self.member_bytes:
+            self._write_member(split_key, as_part=True)
+        elif self.buffered_bytes > self.buffer_bytes:
+            self.flush_largest(self.buffer_bytes // 2)
+
+    def flush_largest(self, target_bytes: int) -> None:
+        """Write the largest buffers as part members until at most target_bytes stay buffered."""
+        largest = sorted(
+            self._buffers, key=lambda split_key: len(self._buffers[split_key].data), reverse=True
+        )
+        for split_key in largest:
+            if self.buffered_bytes <= target_bytes:
+                break
+            self._write_member(split_key, as_part=True)
+
+    def close(self) -> int:
+        """
+        Write the remaining buffers as members and move the archive into place.
+
+        Returns:
+            Size of the archive file in bytes
+        """
+        try:
+            for split_key in list(self._buffers):
+                self._write_member(split_key, as_part=split_key in self._parts)
+            with self.profiler.phase("close"):
+                if self._zip is not None:
+                    self._zip.close()
+                else:
+                    self._tar.close()
+                self._file.close()
+            os.replace(self._temp_path, self.archive)
+        except (OSError, zipfile.LargeZipFile, tarfile.TarError) as e:
+            self.abort()
+            raise FileOperationError(f"Error writing archive {self.archive}: {e}")
+        return os.path.getsize(self.archive)
+
+    def abort(self) -> None:
+        """Discard the partly written archive."""
+        for archive in (self._zip, self._tar, self._file):
+            if archive is None:
+                continue
+            try:
+                archive.close()
+            except (OSError, ValueError, tarfile.TarError):
+                pass
+        if os.path.exists(self._temp_path):
+            os.unlink(self._temp_path)
+
+    def _member_name(self, split_key: Tuple) -> str:
+        """Member name of a key, with a numeric suffix if another key cleaned to the same name."""
+        name = self._names.get(split_key)
+        if name is None:
+            name = unique_name(self.name_for(split_key), self._used_names)
+            self._names[split_key] = name
+        return name
+
+    def _write_member(self, split_key: Tuple, as_part: bool) -> None:
+        """Write a partition's buffer as one member and release it."""
+        buffer = self._buffers.pop(split_key)
+        self.buffered_bytes -= len(buffer.data)
+        name = self._member_name(split_key)
+        part = None
+        if as_part:
+            part = self._parts[split_key] = self._parts.get(split_key, 0) + 1
+            name = RollingPolicy.part_path(name, part)
+        with self.profiler.phase("write"):
+            if self._zip is not None:
+                self._zip.writestr(name, bytes(buffer.data))
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(buffer.data)
+                info.mtime = self._mtime
+                info.mode = 0o644
+                self._tar.addfile(info, io.BytesIO(buffer.data))
+        self.members.append(PartitionInfo(split_key, name, buffer.rows, len(buffer.data), part))
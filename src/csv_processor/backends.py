@@ -0,0 +1,303 @@
+"""
+Pluggable CSV parser backends.
+
+Every backend yields the same rows, as lists of strings, for the same
+input; they differ only in throughput. Blank lines are skipped, and rows
+with fewer fields than the header are padded with empty values while
+extra fields are dropped, so a ragged file reads the same whichever
+backend "auto" picks for its size. The stdlib ``csv`` module is the
+default and always available. The pyarrow and polars backends are used
+only when those libraries are installed.
+"""
+
+import csv
+import importlib.util
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+from .config import Config
+from .dialect import CSVDialect
+from .exceptions import ValidationError
+
+
+Batches = Iterator[List[List[str]]]
+
+
+class ParserBackend:
+    """Base class for CSV parser backends."""
+
+    name = "base"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if the libraries this backend needs are installed."""
+        return True
+
+    @classmethod
+    def supports(cls, dialect: CSVDialect) -> bool:
+        """Return True if this backend can parse files in the given dialect."""
+        return True
+
+    def read_batches(
+        self,
+        file_path: str,
+        dialect: CSVDialect,
+        batch_size: int = Config.PARSE_BATCH_SIZE
+    ) -> Tuple[List[str], Batches]:
+        """
+        Open a CSV file for streaming.
+
+        Args:
+            file_path: Path to the CSV file
+            dialect: Detected dialect of the file
+            batch_size: Approximate number of rows per batch
+
+        Returns:
+            Tuple of the header row and an iterator of row batches
+
+        Raises:
+            StopIteration: If the file has no header row
+        """
+        raise NotImplementedError
+
+
+class CsvModuleBackend(ParserBackend):
+    """Parser backend using the stdlib csv module."""
+
+    name = "csv"
+
+    def read_batches(
+        self,
+        file_path: str,
+        dialect: CSVDialect,
+        batch_size: int = Config.PARSE_BATCH_SIZE
+    ) -> Tuple[List[str], Batches]:
+        return self.resume(file_path, dialect, batch_size, 0)
+
+    @classmethod
+    def resume(
+        cls,
+        file_path: str,
+        dialect: CSVDialect,
+        batch_size: int,
+        skip_rows: int
+    ) -> Tuple[List[str], Batches]:
+        """Open a CSV file for streaming, starting after its first skip_rows data rows."""
+        csvfile = dialect.open(file_path)
+        try:
+            reader = csv.reader(csvfile, **dialect.reader_kwargs())
+            header = next(reader)
+        except BaseException:
+            csvfile.close()
+            raise
+        return header, cls._iter_batches(csvfile, reader, len(header), batch_size, skip_rows)
+
+    @staticmethod
+    def _iter_batches(csvfile, reader, width: int, batch_size: int, skip_rows: int = 0) -> Batches:
+        padding = [""] * width
+        with csvfile:
+            batch: List[List[str]] = []
+            for row in reader:
+                # Native readers skip blank lines; match them
+                if not row:
+                    continue
+                if skip_rows:
+                    skip_rows -= 1
+                    continue
+                if len(row) != width:
+                    row = (row + padding)[:width]
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+
+class PyArrowBackend(ParserBackend):
+    """Parser backend streaming record batches from pyarrow.csv."""
+
+    name = "pyarrow"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec("pyarrow") is not None
+
+    @classmethod
+    def supports(cls, dialect: CSVDialect) -> bool:
+        return not dialect.skipinitialspace
+
+    def read_batches(
+        self,
+        file_path: str,
+        dialect: CSVDialect,
+        batch_size: int = Config.PARSE_BATCH_SIZE
+    ) -> Tuple[List[str], Batches]:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        header = read_header(file_path, dialect)
+        encoding = 'utf8' if dialect.encoding in ('utf-8', 'utf-8-sig') else dialect.encoding
+
+        def open_stream():
+            return pa_csv.open_csv(
+                file_path,
+                read_options=pa_csv.ReadOptions(
+                    encoding=encoding,
+                    block_size=Config.NATIVE_BLOCK_SIZE,
+                ),
+                parse_options=pa_csv.ParseOptions(
+                    delimiter=dialect.delimiter,
+                    quote_char=dialect.quotechar,
+                    double_quote=dialect.doublequote,
+                    escape_char=dialect.escapechar or False,
+                    newlines_in_values=True,
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.string() for name in header},
+                    null_values=[],
+                    strings_can_be_null=False,
+                    quoted_strings_can_be_null=False,
+                ),
+            )
+
+        return header, self._iter_batches(open_stream, file_path, dialect, batch_size)
+
+    @staticmethod
+    def _iter_batches(open_stream, file_path: str, dialect: CSVDialect, batch_size: int) -> Batches:
+        import pyarrow as pa
+
+        rows_read = 0
+        try:
+            # Opening parses the first block, so it can fail on a ragged row too
+            for record_batch in open_stream():
+                columns = [column.to_pylist() for column in record_batch.columns]
+                if columns:
+                    batch = [list(row) for row in zip(*columns)]
+                    rows_read += len(batch)
+                    yield batch
+        except pa.ArrowInvalid:
+            # pyarrow can only skip or reject a row whose field count differs
+            # from the header; the csv module pads or truncates it instead
+            _, batches = CsvModuleBackend.resume(file_path, dialect, batch_size, rows_read)
+            yield from batches
+
+
+class PolarsBackend(ParserBackend):
+    """Parser backend streaming batches from polars' batched CSV reader."""
+
+    name = "polars"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec("polars") is not None
+
+    @classmethod
+    def supports(cls, dialect: CSVDialect) -> bool:
+        return (
+            dialect.encoding in ('utf-8', 'utf-8-sig')
+            and dialect.escapechar is None
+            and not dialect.skipinitialspace
+        )
+
+    def read_batches(
+        self,
+        file_path: str,
+        dialect: CSVDialect,
+        batch_size: int = Config.PARSE_BATCH_SIZE
+    ) -> Tuple[List[str], Batches]:
+        import polars as pl
+
+        header = read_header(file_path, dialect)
+        reader = pl.read_csv_batched(
+            file_path,
+            has_header=True,
+            separator=dialect.delimiter,
+            quote_char=dialect.quotechar,
+            infer_schema_length=0,
+            truncate_ragged_lines=True,
+            batch_size=batch_size,
+        )
+        return header, self._iter_batches(reader, file_path, dialect, batch_size)
+
+    @staticmethod
+    def _iter_batches(reader, file_path: str, dialect: CSVDialect, batch_size: int) -> Batches:
+        import polars as pl
+
+        rows_read = 0
+        while True:
+            frames = reader.next_batches(1)
+            if not frames:
+                return
+            for frame in frames:
+                # Empty fields and short rows' missing fields read as nulls, and so
+                # does every field of a blank line; the csv module tells a blank
+                # line from a row of empty fields
+                if frame.select(pl.all_horizontal(pl.all().is_null())).to_series().any():
+                    _, batches = CsvModuleBackend.resume(file_path, dialect, batch_size, rows_read)
+                    yield from batches
+                    return
+                rows_read += frame.height
+                yield [list(row) for row in frame.fill_null("").rows()]
+
+
+BACKENDS: Dict[str, Type[ParserBackend]] = {
+    CsvModuleBackend.name: CsvModuleBackend,
+    PyArrowBackend.name: PyArrowBackend,
+    PolarsBackend.name: PolarsBackend,
+}
+
+# Preference order for "auto" on large inputs
+_NATIVE_PREFERENCE: Tuple[Type[ParserBackend], ...] = (PyArrowBackend, PolarsBackend)
+
+
+def read_header(file_path: str, dialect: CSVDialect) -> List[str]:
+    """
+    Read only the header row of a CSV file.
+
+    Raises:
+        StopIteration: If the file has no header row
+    """
+    with dialect.open(file_path) as csvfile:
+        return next(csv.reader(csvfile, **dialect.reader_kwargs()))
+
+
+def available_backends() -> List[str]:
+    """Return the names of the backends that can be used in this environment."""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def select_backend(name: str, file_size: int, dialect: CSVDialect) -> ParserBackend:
+    """
+    Resolve a backend name to a parser backend instance.
+
+    Args:
+        name: Backend name, or "auto" to choose from file size and installed libraries
+        file_size: Size of the source file in bytes
+        dialect: Detected dialect of the source file
+
+    Returns:
+        ParserBackend instance
+
+    Raises:
+        ValidationError: If the backend is unknown, not installed or cannot
+            parse this dialect
+    """
+    if name == "auto":
+        if file_size >= Config.NATIVE_BACKEND_MIN_SIZE:
+            for backend in _NATIVE_PREFERENCE:
+                if backend.is_available() and backend.supports(dialect):
+                    return backend()
+        return CsvModuleBackend()
+
+    backend_class: Optional[Type[ParserBackend]] = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValidationError(
+            f"Unknown parser backend '{name}'. Choose one of: auto, {', '.join(BACKENDS)}"
+        )
+    if not backend_class.is_available():
+        raise ValidationError(f"Parser backend '{name}' is not installed")
+    if not backend_class.supports(dialect):
+        raise ValidationError(
+            f"Parser backend '{name}' cannot read files in this format: {dialect}"
+        )
+    return backend_class()
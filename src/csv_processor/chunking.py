@@ -0,0 +1,275 @@
+"""
+Row-count and byte-size chunking of CSV files by byte range.
+
+A single planning pass scans the raw bytes for record boundaries,
+tracking quote parity so that newlines inside quoted fields never end a
+record. Each planned chunk is then a byte range of the source that can
+be copied verbatim, after the header, by any number of parallel workers.
+"""
+
+import codecs
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from .config import Config
+from .dialect import CSVDialect
+from .exceptions import ValidationError
+from .profiling import NULL_PROFILER
+
+
+class ChunkRange:
+    """Data class for one planned chunk: a byte range of whole records."""
+
+    def __init__(self, index: int, start: int, end: int, rows: int):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.rows = rows
+
+    def __repr__(self) -> str:
+        return (
+            f"ChunkRange(index={self.index}, start={self.start}, end={self.end}, rows={self.rows})"
+        )
+
+
+def _byte_for(text: str, encoding: str) -> bytes:
+    """Encode a format character, requiring a single byte."""
+    data = text.encode(encoding)
+    if len(data) != 1:
+        raise ValidationError(
+            f"Chunked splitting needs single-byte delimiters and quotes, got {text!r}"
+        )
+    return data
+
+
+def check_chunkable(dialect: CSVDialect) -> None:
+    """
+    Check that a file's records can be found by scanning raw bytes.
+
+    Raises:
+        ValidationError: If the encoding is not ASCII-compatible (e.g. UTF-16)
+    """
+    probe = '\n\r,"'
+    if probe.encode(dialect.encoding, 'replace') != probe.encode('ascii'):
+        raise ValidationError(
+            f"Chunked splitting requires an ASCII-compatible encoding, file is {dialect.encoding}"
+        )
+    _byte_for(dialect.quotechar, dialect.encoding)
+
+
+class ChunkPlanner:
+    """Finds the byte ranges of chunks holding at most max_rows records or max_bytes bytes."""
+
+    def __init__(
+        self,
+        dialect: CSVDialect,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        block_size: int = Config.CHUNK_SCAN_BLOCK_SIZE
+    ):
+        """
+        Initialize chunk planner.
+
+        Args:
+            dialect: Detected dialect of the file
+            max_rows: Maximum data rows per chunk
+            max_bytes: Maximum size of each output part, header included
+            block_size: Bytes read per scan step
+        """
+        check_chunkable(dialect)
+        self.dialect = dialect
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.quote = _byte_for(dialect.quotechar, dialect.encoding)
+        self.newline = b'\r' if dialect.lineterminator == '\r' else b'\n'
+        self.escaped_quote = None
+        if dialect.escapechar:
+            self.escaped_quote = _byte_for(dialect.escapechar, dialect.encoding) + self.quote
+
+    def plan(self, file_path: str) -> Tuple[bytes, List[ChunkRange]]:
+        """
+        Scan a file and plan its chunks.
+
+        Returns:
+            Raw header record bytes (without BOM) and the planned chunks
+        """
+        with open(file_path, 'rb') as f:
+            bom = codecs.BOM_UTF8 if self.dialect.has_bom else b''
+            if bom and f.read(len(bom)) != bom:
+                f.seek(0)
+                bom = b''
+            header_start = self._header_start = len(bom)
+            self._in_quotes = False
+            self._chunks: List[ChunkRange] = []
+            self._header_end: Optional[int] = None
+            self._chunk_start = self._record_start = header_start
+            self._chunk_rows = 0
+            self._budget = None
+
+            offset = header_start
+            carry = b''
+            while True:
+                block = f.read(self.block_size)
+                if not block:
+                    break
+                data = carry + block
+                last_newline = data.rfind(self.newline)
+                if last_newline == -1:
+                    carry = data
+                    continue
+                region = data[:last_newline + 1]
+                carry = data[last_newline + 1:]
+                self._scan(region, offset)
+                offset += len(region)
+
+            # A final record without a line terminator; the appended
+            # terminator is clamped off the ranges below
+            end = offset + len(carry)
+            if carry:
+                self._scan(carry + self.newline, offset)
+            if self._in_quotes:
+                # An unterminated quoted field runs to the end of the file
+                self._end_record(end, False)
+
+        if self._header_end is None:
+            return b'', []
+        self._header_end = min(self._header_end, end)
+        self._chunk_start = min(self._chunk_start, end)
+        for chunk in self._chunks:
+            chunk.end = min(chunk.end, end)
+        if self._chunk_rows:
+            self._add_chunk(end)
+        elif self._chunks:
+            # Trailing blank lines belong to the last chunk
+            self._chunks[-1].end = end
+
+        with open(file_path, 'rb') as f:
+            f.seek(header_start)
+            header = f.read(self._header_end - header_start)
+        if not header.endswith(self.newline):
+            header += self.dialect.lineterminator.encode(self.dialect.encoding)
+        return header, self._chunks
+
+    def _scan(self, region: bytes, offset: int) -> None:
+        """Account for a region of whole lines starting at file offset."""
+        newline = self.newline
+        quote = self.quote
+        if (
+            self._header_end is not None
+            and not self._in_quotes
+            and quote not in region
+            and not self._has_blank_line(region)
+        ):
+            rows = region.count(newline)
+            fits_rows = self.max_rows is None or self._chunk_rows + rows < self.max_rows
+            fits_bytes = (
+                self._budget is None or offset + len(region) - self._chunk_start <= self._budget
+            )
+            if fits_rows and fits_bytes:
+                # Fast path: no quoting and no chunk boundary in this region
+                self._chunk_rows += rows
+                self._record_start = offset + len(region)
+                return
+
+        position = 0
+        length = len(region)
+        while position < length:
+            line_end = region.index(newline, position) + 1
+            count = region.count(quote, position, line_end)
+            if count and self.escaped_quote:
+                count -= region.count(self.escaped_quote, position, line_end)
+            if count % 2:
+                self._in_quotes = not self._in_quotes
+            blank = not self._in_quotes and offset + position == self._record_start and \
+                region[position:line_end] in (newline, b'\r' + newline)
+            position = line_end
+            if self._in_quotes:
+                continue
+            self._end_record(offset + position, blank)
+
+    def _end_record(self, end: int, blank: bool) -> None:
+        """Close the record ending at end, starting a new chunk when a limit is reached."""
+        start = self._record_start
+        self._record_start = end
+        if blank:
+            return
+        if self._header_end is None:
+            self._header_end = end
+            self._chunk_start = end
+            if self.max_bytes is not None:
+                self._budget = max(1, self.max_bytes - (end - self._header_start))
+            return
+
+        if self._budget is not None and self._chunk_rows and end - self._chunk_start > self._budget:
+            # This record would overflow the part; it starts the next one
+            self._add_chunk(start)
+            self._chunk_start = start
+            self._chunk_rows = 0
+        self._chunk_rows += 1
+        if self.max_rows is not None and self._chunk_rows >= self.max_rows:
+            self._add_chunk(end)
+            self._chunk_start = end
+            self._chunk_rows = 0
+
+    def _add_chunk(self, end: int) -> None:
+        """Record the part from the current chunk start up to end."""
+        self._chunks.append(ChunkRange(len(self._chunks), self._chunk_start, end, self._chunk_rows))
+
+    def _has_blank_line(self, region: bytes) -> bool:
+        newline = self.newline
+        return (
+            region.startswith(newline) or region.startswith(b'\r' + newline)
+            or newline + newline in region or newline + b'\r' + newline in region
+        )
+
+
+def copy_chunks(
+    source_file: str,
+    header: bytes,
+    chunks: List[ChunkRange],
+    path_for: Callable[[ChunkRange], str],
+    workers: int = 1,
+    profiler=NULL_PROFILER,
+    on_written: Optional[Callable[[ChunkRange, str, int], None]] = None
+) -> List[int]:
+    """
+    Write each chunk to its own file: the header, then the chunk's bytes verbatim.
+
+    Args:
+        source_file: Path to the source CSV file
+        header: Raw header record written at the top of every part
+        chunks: Planned chunks
+        path_for: Function mapping a chunk to its output path
+        workers: Number of chunks copied concurrently
+        profiler: Phase profiler recording write time
+        on_written: Optional callback with the chunk, its path and byte size
+
+    Returns:
+        Bytes written per chunk, in chunk order
+    """
+    block_size = Config.CHUNK_COPY_BLOCK_SIZE
+
+    def copy(chunk: ChunkRange) -> int:
+        path = path_for(chunk)
+        with profiler.phase("write"):
+            with open(source_file, 'rb') as src, open(path, 'wb') as dst:
+                dst.write(header)
+                src.seek(chunk.start)
+                remaining = chunk.end - chunk.start
+                while remaining > 0:
+                    data = src.read(min(block_size, remaining))
+                    if not data:
+                        break
+                    dst.write(data)
+                    remaining -= len(data)
+        size = len(header) + chunk.end - chunk.start
+        if on_written:
+            on_written(chunk, path, size)
+        return size
+
+    if workers <= 1:
+        return [copy(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='csv-chunk') as pool:
+        return list(pool.map(copy, chunks))
+
@@ -2,7 +2,7 @@
 Configuration and constants for CSV Splitter application.
 """
 
-from typing import Final
+from typing import Final, Optional
 
 
 class Config:
@@ -15,6 +15,94 @@ class Config:
     # CSV Processing Configuration
     DEFAULT_ENCODING: Final[str] = "utf-8"
     PROGRESS_UPDATE_INTERVAL: Final[int] = 1000  # Update progress every N rows
+    PROGRESS_LOG_INTERVAL: Final[float] = 5.0  # Seconds between aggregated progress summaries
+    PROGRESS_DETAIL_LIMIT: Final[int] = 25  # Partitions reported individually before aggregating
+    
+    # Dialect Detection Configuration
+    DIALECT_SAMPLE_SIZE: Final[int] = 64 * 1024  # Bytes read to detect format
+    DIALECT_CACHE_SIZE: Final[int] = 128  # Detected dialects kept in memory
+    CANDIDATE_DELIMITERS: Final[str] = ",;\t|"
+    FALLBACK_ENCODINGS: Final[tuple] = ("cp1252", "latin-1")
+    
+    # Parser Backend Configuration
+    DEFAULT_PARSER_BACKEND: Final[str] = "csv"  # "csv", "pyarrow", "polars" or "auto"
+    PARSE_BATCH_SIZE: Final[int] = 10000  # Rows per parsed batch
+    NATIVE_BLOCK_SIZE: Final[int] = 4 * 1024 * 1024  # Bytes per native reader block
+    NATIVE_BACKEND_MIN_SIZE: Final[int] = 64 * 1024 * 1024  # "auto" uses native readers above this
+    
+    # Output Configuration
+    WRITE_BLOCK_ROWS: Final[int] = 10000  # Rows encoded and written per block
+    MAX_OPEN_FILES: Final[int] = 512  # Output files held open at once by streaming writers
+    DEFAULT_WRITER_THREADS: Final[int] = 0  # 0 groups in memory; N pipelines writes on N threads
+    PIPELINE_QUEUE_SIZE: Final[int] = 8  # Batches queued per writer thread before the reader waits
+    CHUNK_SCAN_BLOCK_SIZE: Final[int] = 4 * 1024 * 1024  # Bytes scanned per step planning chunks
+    CHUNK_COPY_BLOCK_SIZE: Final[int] = 1024 * 1024  # Bytes copied per read when writing chunks
+    SORT_MEMORY_BUDGET: Final[int] = 256 * 1024 * 1024  # Bytes of rows buffered before spilling
+    SORT_MERGE_FAN_IN: Final[int] = 64  # Sorted runs merged at once
+    DEDUPE_MEMORY_BUDGET: Final[int] = 256 * 1024 * 1024  # Bytes of seen keys before spilling
+    DEDUPE_BLOOM_ERROR_RATE: Final[float] = 0.001  # False positive rate of approximate dedupe
+    DEDUPE_SPILL_PARTITIONS: Final[int] = 64  # Hash partitions of rows spilled by exact dedupe
+    MERGE_FAN_IN: Final[int] = 256  # Input files read at once by a k-way merge
+    MERGE_READ_BATCH_ROWS: Final[int] = 1000  # Rows read ahead per input during a k-way merge
+    MERGE_WRITE_BUFFER_SIZE: Final[int] = 1024 * 1024  # Bytes buffered by the merge output file
+    SPILL_BATCH_ROWS: Final[int] = 10000  # Most rows pickled per record in spill files
+    SPILL_MIN_BATCH_ROWS: Final[int] = 100  # Fewest rows pickled per record in spill files
+    SPILL_TEMP_DIR: Final[Optional[str]] = None  # Directory for spill files; system temp when None
+    RESOURCE_SAMPLE_INTERVAL: Final[float] = 0.1  # Seconds between resource samples of a run
+    RUN_REPORT_FILENAME: Final[str] = "_run_report.json"
+    MANIFEST_FILENAME: Final[str] = "_manifest.csv"
+    
+    # Memory Budget Configuration
+    MEMORY_FLUSH_FRACTION: Final[float] = 0.5  # Share of max_memory flushing grouped rows
+    MEMORY_SPILL_FRACTION: Final[float] = 0.8  # Share of max_memory spilling sort/dedupe state
+    MEMORY_DEDUPE_FILTER_FRACTION: Final[float] = 0.25  # Most of max_memory for a dedupe filter
+    MEMORY_RSS_INTERVAL: Final[float] = 0.5  # Seconds between RSS readings of a memory-limited run
+    
+    # Ingest Cache Configuration
+    INGEST_CACHE_DIR: Final[Optional[str]] = None  # ~/.cache/csv_processor/ingest when None
+    INGEST_CACHE_MAX_BYTES: Final[int] = 20 * 1024 * 1024 * 1024  # LRU entries evicted above this
+    INGEST_CACHE_CHUNK_ROWS: Final[int] = 65536  # Rows per cached chunk and batch read
+    INGEST_CACHE_MAX_DICTIONARY: Final[int] = 1 << 20  # Distinct values of a dictionary column
+    
+    # SQLite Output Configuration
+    SQLITE_TABLE_NAME: Final[str] = "data"  # Table, or per-key table prefix, of SQLite output
+    SQLITE_BATCH_ROWS: Final[int] = 10000  # Rows buffered per executemany call
+    SQLITE_TRANSACTION_ROWS: Final[int] = 500000  # Rows inserted per transaction
+    SQLITE_CACHE_KIB: Final[int] = 64 * 1024  # SQLite page cache while loading, in KiB
+    
+    # Archive Output Configuration
+    ARCHIVE_MEMBER_BYTES: Final[int] = 8 * 1024 * 1024  # Bytes of a partition per member
+    ARCHIVE_BUFFER_BYTES: Final[int] = 256 * 1024 * 1024  # Bytes buffered over all partitions
+    ARCHIVE_WRITE_BUFFER_SIZE: Final[int] = 1024 * 1024  # Bytes buffered by the archive file
+    ARCHIVE_GZIP_LEVEL: Final[int] = 6  # Gzip level of .tar.gz and .tgz archives when none is given
+    
+    # Job Queue Configuration
+    JOB_QUEUE_PATH: Final[Optional[str]] = None  # ~/.cache/csv_processor/jobs.db when None
+    JOB_WORKERS: Final[int] = 2  # Jobs run at once by a job runner
+    JOB_DEVICE_CONCURRENCY: Final[int] = 1  # Running jobs allowed per source or output disk
+    JOB_POLL_INTERVAL: Final[float] = 1.0  # Seconds between checks for new jobs
+    JOB_ERROR_BACKOFF: Final[float] = 5.0  # Seconds a worker waits after failing to read the queue
+    JOB_PROGRESS_INTERVAL: Final[float] = 2.0  # Seconds between stored progress updates of a job
+    JOB_HEARTBEAT_INTERVAL: Final[float] = 5.0  # Seconds between runner heartbeats
+    JOB_STALE_AFTER: Final[float] = 60.0  # Running jobs without a heartbeat this long are requeued
+    JOB_MAX_ATTEMPTS: Final[int] = 3  # Starts of a job before an abandoned job is failed instead
+    
+    # Job Service Configuration
+    SERVICE_HOST: Final[str] = "127.0.0.1"  # Address the HTTP job service listens on
+    SERVICE_PORT: Final[int] = 8765  # Port the HTTP job service listens on
+    SERVICE_MAX_JSON_BYTES: Final[int] = 1024 * 1024  # Largest accepted JSON job description
+    SERVICE_MAX_LINE: Final[int] = 64 * 1024  # Longest line of chunked upload framing
+    
+    # Watch Folder Configuration
+    WATCH_PATTERN: Final[str] = "*.csv"  # File names split by a watch folder
+    WATCH_WORKERS: Final[int] = 2  # Files split at once by a watch folder
+    WATCH_POLL_INTERVAL: Final[float] = 1.0  # Seconds between checks of the drop directory
+    WATCH_STABLE_SECONDS: Final[float] = 5.0  # Seconds a file stays unchanged before splitting
+    WATCH_DONE_DIR: Final[str] = "done"  # Subdirectory of the drop directory for split files
+    WATCH_FAILED_DIR: Final[str] = "failed"  # Subdirectory of the drop directory for failed files
+    
+    # Metrics Configuration
+    METRICS_EXPORT_INTERVAL: Final[float] = 15.0  # Seconds between metrics file writes
     
     # File Extensions
     CSV_EXTENSION: Final[str] = ".csv"
@@ -0,0 +1,378 @@
+"""
+Memory-bounded removal of duplicate rows while splitting.
+
+Exact mode keeps a hash set of the dedupe keys seen so far. When the set
+outgrows its memory budget, it stops growing: rows whose key is already
+in the set are still dropped immediately, and every other row is spilled
+to one of several temporary hash partitions. Once the input ends each
+partition is deduplicated on its own and the surviving rows are merged
+back in source order. Because every spilled row comes after every row
+accepted in memory, the output order is the same as without spilling.
+Spill files are pickled in batches sized so that the merge, which reads
+one batch of every partition at once, stays within the memory budget.
+
+Approximate mode uses a Bloom filter instead, sized for the estimated
+row count of the source and the target error rate, with the memory budget
+as a cap; it never keeps a duplicate but may drop a small fraction of
+unique rows.
+"""
+
+import hashlib
+import heapq
+import math
+import os
+import pickle
+import shutil
+import tempfile
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .config import Config
+from .exceptions import ValidationError
+from .memory import estimate_rows_bytes, spill_batch_rows
+from .partitioning import stable_bucket
+
+
+DEDUPE_MODES: Tuple[str, ...] = ("exact", "approximate")
+
+# Approximate in-memory cost of a set entry and of each key field,
+# on top of the characters themselves
+_ENTRY_OVERHEAD = 120
+_FIELD_OVERHEAD = 57
+
+# Rows a Bloom filter is sized for, as a multiple of the estimated row count
+_ROW_ESTIMATE_HEADROOM = 2
+
+# (sequence number, dedupe key, split key, row)
+SpillItem = Tuple[int, Tuple, Tuple, Sequence[str]]
+
+
+class DedupePolicy:
+    """How duplicate rows are recognised and how much memory may be used."""
+
+    def __init__(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        mode: str = "exact",
+        memory_budget: int = Config.DEDUPE_MEMORY_BUDGET,
+        error_rate: float = Config.DEDUPE_BLOOM_ERROR_RATE
+    ):
+        """
+        Initialize dedupe policy.
+
+        Args:
+            fields: Fields compared to find duplicates; all included fields when None
+            mode: "exact", spilling to disk beyond the memory budget, or
+                "approximate", using a Bloom filter of at most memory_budget bytes
+            memory_budget: Approximate bytes of memory for seen keys
+            error_rate: Target false positive rate of the Bloom filter
+
+        Raises:
+            ValidationError: If mode or error_rate is invalid
+        """
+        if mode not in DEDUPE_MODES:
+            raise ValidationError(
+                f"Unknown dedupe mode '{mode}'. Choose one of: {', '.join(DEDUPE_MODES)}"
+            )
+        if not 0.0 < error_rate < 1.0:
+            raise ValidationError("Dedupe error rate must be between 0 and 1")
+        self.fields = list(fields) if fields else None
+        self.mode = mode
+        self.memory_budget = memory_budget
+        self.error_rate = error_rate
+
+
+def estimate_row_count(file_path: str) -> int:
+    """
+    Estimate the rows of a CSV file from the line breaks in its first bytes.
+
+    Line breaks inside quoted fields are counted as rows, so the estimate
+    errs on the high side.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        sample = f.read(Config.DIALECT_SAMPLE_SIZE)
+    lines = max(1, sample.count(b'\n'))
+    if len(sample) >= size:
+        return lines
+    return int(size * lines / len(sample)) + 1
+
+
+def _key_digest(key: Sequence[str]) -> bytes:
+    data = "\x1f".join(key).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over key tuples, using double hashing."""
+
+    def __init__(self, size_bytes: int, error_rate: float):
+        """
+        Initialize Bloom filter.
+
+        Args:
+            size_bytes: Size of the bit array
+            error_rate: Target false positive rate, which sets the hash count
+        """
+        self.bits = max(8, size_bytes * 8)
+        self.hashes = max(1, round(-math.log2(error_rate)))
+        self._array = bytearray(self.bits // 8)
+        self.bits = len(self._array) * 8
+
+    @staticmethod
+    def size_for(rows: int, error_rate: float) -> int:
+        """Bytes of a filter holding rows keys at about error_rate."""
+        bits = -max(1, rows) * math.log(error_rate) / (math.log(2) ** 2)
+        return int(math.ceil(bits / 8))
+
+    @property
+    def capacity(self) -> int:
+        """Number of keys the filter holds at roughly its target error rate."""
+        return int(self.bits * math.log(2) / self.hashes)
+
+    def add(self, key: Sequence[str]) -> bool:
+        """
+        Add a key.
+
+        Returns:
+            True if the key was (probably) present already
+        """
+        digest = _key_digest(key)
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        array = self._array
+        bits = self.bits
+        present = True
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not array[byte] & mask:
+                array[byte] |= mask
+                present = False
+        return present
+
+
+class Deduplicator:
+    """Drops duplicate rows from a stream of batches, within a memory budget."""
+
+    def __init__(
+        self,
+        policy: DedupePolicy,
+        temp_dir: Optional[str] = Config.SPILL_TEMP_DIR,
+        filter_bytes: Optional[int] = None,
+        expected_rows: Optional[int] = None
+    ):
+        """
+        Initialize deduplicator.
+
+        Args:
+            policy: Dedupe policy
+            temp_dir: Directory for spilled partitions; the system default when None
+            filter_bytes: Largest Bloom filter in approximate mode; the
+                policy's memory budget when None
+            expected_rows: Estimated rows of the source; the filter is sized
+                for a multiple of them when given, and at the cap otherwise
+        """
+        self.policy = policy
+        self.temp_dir = temp_dir
+        # May be lowered while running, by a memory governor
+        self.memory_budget = policy.memory_budget
+        self.duplicates = 0
+        self.spilled_rows = 0
+        self._spilled_bytes = 0
+        self._seen: Set[Tuple] = set()
+        self._seen_bytes = 0
+        self._bloom: Optional[BloomFilter] = None
+        if policy.mode == "approximate":
+            size = policy.memory_budget if filter_bytes is None else filter_bytes
+            if expected_rows is not None:
+                needed = BloomFilter.size_for(
+                    expected_rows * _ROW_ESTIMATE_HEADROOM, policy.error_rate
+                )
+                size = min(size, needed)
+            self._bloom = BloomFilter(size, policy.error_rate)
+        self._spilling = False
+        self._sequence = 0
+        self._spill_dir: Optional[str] = None
+        self._spill_files: Dict[int, str] = {}
+        self._spill_buffers: Dict[int, List[SpillItem]] = {}
+        self._spill_buffered = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Approximate bytes of seen keys held in memory.
+
+        The Bloom filter of approximate mode is left out: its size is fixed
+        when the run starts and spilling cannot release it.
+        """
+        return self._seen_bytes
+
+    def start_spilling(self) -> None:
+        """Stop growing the set of seen keys and spill unknown rows from now on."""
+        if self._bloom is None:
+            self._spilling = True
+
+    def filter(
+        self,
+        dedupe_keys: List[Tuple],
+        keys: List[Tuple],
+        rows: List[Sequence[str]]
+    ) -> Tuple[List[Tuple], List[Sequence[str]]]:
+        """
+        Remove duplicates from a batch.
+
+        Returns:
+            Split keys and rows to write now; rows spilled for later are
+            returned by drain()
+        """
+        out_keys: List[Tuple] = []
+        out_rows: List[Sequence[str]] = []
+        if self._bloom is not None:
+            add = self._bloom.add
+            for dedupe_key, split_key, row in zip(dedupe_keys, keys, rows):
+                if add(dedupe_key):
+                    self.duplicates += 1
+                else:
+                    out_keys.append(split_key)
+                    out_rows.append(row)
+            return out_keys, out_rows
+
+        seen = self._seen
+        if self._spilling:
+            self._spill(dedupe_keys, keys, rows)
+            return out_keys, out_rows
+
+        before = len(seen)
+        for dedupe_key, split_key, row in zip(dedupe_keys, keys, rows):
+            if dedupe_key in seen:
+                self.duplicates += 1
+            else:
+                seen.add(dedupe_key)
+                out_keys.append(split_key)
+                out_rows.append(row)
+        if len(seen) > before:
+            self._seen_bytes += self._estimate_bytes(dedupe_keys, len(seen) - before)
+            if self._seen_bytes > self.memory_budget:
+                self._spilling = True
+        return out_keys, out_rows
+
+    def drain(self) -> Iterator[Tuple[List[Tuple], List[Sequence[str]]]]:
+        """Yield the distinct spilled rows, in source order, as (split keys, rows) batches."""
+        if not self._spill_files and not self._spill_buffers:
+            return
+        self._flush_spill_buffers()
+        self._seen.clear()
+        batch_rows = spill_batch_rows(
+            self.memory_budget, len(self._spill_files), self._spilled_row_bytes
+        )
+        survivors = [
+            self._dedupe_partition(path, batch_rows) for path in self._spill_files.values()
+        ]
+        merged = heapq.merge(*(self._read_items(path) for path in survivors), key=itemgetter(0))
+
+        batch_rows = Config.PARSE_BATCH_SIZE
+        keys: List[Tuple] = []
+        rows: List[Sequence[str]] = []
+        for _, _, split_key, row in merged:
+            keys.append(split_key)
+            rows.append(row)
+            if len(rows) >= batch_rows:
+                yield keys, rows
+                keys, rows = [], []
+        if rows:
+            yield keys, rows
+
+    def close(self) -> None:
+        """Remove spilled partitions."""
+        self._spill_buffers.clear()
+        self._spill_files.clear()
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _estimate_bytes(self, dedupe_keys: List[Tuple], new_keys: int) -> int:
+        sample = dedupe_keys[:32]
+        chars = sum(len(value) for key in sample for value in key)
+        fields = sum(len(key) for key in sample)
+        per_key = (chars + _FIELD_OVERHEAD * fields) / len(sample) + _ENTRY_OVERHEAD
+        return int(per_key * new_keys)
+
+    def _spill(
+        self, dedupe_keys: List[Tuple], keys: List[Tuple], rows: List[Sequence[str]]
+    ) -> None:
+        """Spill rows not yet known to be duplicates into hash partitions."""
+        seen = self._seen
+        partitions = Config.DEDUPE_SPILL_PARTITIONS
+        buffers = self._spill_buffers
+        sequence = self._sequence
+        spilled = 0
+        for dedupe_key, split_key, row in zip(dedupe_keys, keys, rows):
+            if dedupe_key in seen:
+                self.duplicates += 1
+                continue
+            partition = stable_bucket(dedupe_key, partitions)
+            buffer = buffers.get(partition)
+            if buffer is None:
+                buffer = buffers[partition] = []
+            buffer.append((sequence, dedupe_key, split_key, row))
+            sequence += 1
+            spilled += 1
+        self._sequence = sequence
+        if spilled:
+            batch_bytes = estimate_rows_bytes(rows) + self._estimate_bytes(dedupe_keys, len(rows))
+            row_bytes = batch_bytes / len(rows)
+            self._spilled_bytes += int(row_bytes * spilled)
+        self.spilled_rows += spilled
+        self._spill_buffered += spilled
+        if self._spill_buffered >= spill_batch_rows(self.memory_budget, 1, self._spilled_row_bytes):
+            self._flush_spill_buffers()
+
+    @property
+    def _spilled_row_bytes(self) -> float:
+        """Estimated in-memory bytes of one spilled item."""
+        return self._spilled_bytes / self.spilled_rows if self.spilled_rows else 0.0
+
+    def _flush_spill_buffers(self) -> None:
+        for partition, items in self._spill_buffers.items():
+            path = self._spill_files.get(partition)
+            if path is None:
+                path = self._spill_files[partition] = self._spill_path(f"part{partition:04d}.pkl")
+            with open(path, 'ab') as f:
+                pickle.dump(items, f, pickle.HIGHEST_PROTOCOL)
+        self._spill_buffers = {}
+        self._spill_buffered = 0
+
+    def _dedupe_partition(self, path: str, batch_rows: int) -> str:
+        """Keep the first occurrence of each key in a spilled partition, written in batches."""
+        seen: Set[Tuple] = set()
+        survivors: List[SpillItem] = []
+        survivor_path = path + ".distinct"
+        with open(survivor_path, 'wb') as f:
+            for item in self._read_items(path):
+                if item[1] in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(item[1])
+                survivors.append(item)
+                if len(survivors) >= batch_rows:
+                    pickle.dump(survivors, f, pickle.HIGHEST_PROTOCOL)
+                    survivors = []
+            if survivors:
+                pickle.dump(survivors, f, pickle.HIGHEST_PROTOCOL)
+        os.unlink(path)
+        return survivor_path
+
+    def _read_items(self, path: str) -> Iterator[SpillItem]:
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def _spill_path(self, name: str) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="csv-dedupe-", dir=self.temp_dir)
+        return os.path.join(self._spill_dir, name)
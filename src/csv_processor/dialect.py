@@ -0,0 +1,317 @@
+"""
+CSV dialect, delimiter and encoding detection with a per-file cache.
+"""
+
+import codecs
+import csv
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+from .exceptions import FileOperationError
+
+
+# Order matters: the UTF-32 LE BOM starts with the UTF-16 LE BOM.
+_BOMS: Tuple[Tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+class CSVDialect:
+    """Detected format of a CSV file, shared by header loading and splitting."""
+
+    def __init__(
+        self,
+        encoding: str = Config.DEFAULT_ENCODING,
+        delimiter: str = ',',
+        quotechar: str = '"',
+        doublequote: bool = True,
+        escapechar: Optional[str] = None,
+        skipinitialspace: bool = False,
+        lineterminator: str = '\r\n',
+        quoting: int = csv.QUOTE_MINIMAL,
+        has_bom: bool = False
+    ):
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.doublequote = doublequote
+        self.escapechar = escapechar
+        self.skipinitialspace = skipinitialspace
+        self.lineterminator = lineterminator
+        self.quoting = quoting
+        self.has_bom = has_bom
+
+    def reader_kwargs(self) -> Dict[str, Any]:
+        """
+        Format parameters for ``csv.reader``.
+
+        Quoting is always read as QUOTE_MINIMAL so that quoted and unquoted
+        fields are both accepted, whatever style the sample suggested.
+        """
+        return {
+            'delimiter': self.delimiter,
+            'quotechar': self.quotechar,
+            'doublequote': self.doublequote,
+            'escapechar': self.escapechar,
+            'skipinitialspace': self.skipinitialspace,
+            'quoting': csv.QUOTE_MINIMAL,
+        }
+
+    def open(self, file_path: str):
+        """Open file_path as text using the detected encoding."""
+        return open(file_path, 'r', newline='', encoding=self.encoding)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for reporting."""
+        return {
+            'encoding': self.encoding,
+            'delimiter': self.delimiter,
+            'quotechar': self.quotechar,
+            'doublequote': self.doublequote,
+            'escapechar': self.escapechar,
+            'skipinitialspace': self.skipinitialspace,
+            'lineterminator': self.lineterminator,
+            'quoting': self.quoting,
+            'has_bom': self.has_bom,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"CSVDialect(encoding={self.encoding!r}, delimiter={self.delimiter!r}, "
+            f"quotechar={self.quotechar!r}, lineterminator={self.lineterminator!r})"
+        )
+
+
+class _DialectCache:
+    """Thread-safe LRU cache of detected dialects keyed on path, size and mtime."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, int, int], CSVDialect]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[CSVDialect]:
+        with self._lock:
+            dialect = self._entries.get(key)
+            if dialect is not None:
+                self._entries.move_to_end(key)
+            return dialect
+
+    def put(self, key: Tuple[str, int, int], dialect: CSVDialect) -> None:
+        with self._lock:
+            # Drop stale entries for the same path before adding the new one
+            for stale in [k for k in self._entries if k[0] == key[0]]:
+                del self._entries[stale]
+            self._entries[key] = dialect
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _DialectCache(Config.DIALECT_CACHE_SIZE)
+
+
+def detect_dialect(file_path: str) -> CSVDialect:
+    """
+    Detect the dialect of a CSV file from a bounded sample.
+
+    Results are cached per file and invalidated when its size or
+    modification time changes, so repeated calls never reread the file.
+
+    Args:
+        file_path: Path to the CSV file
+
+    Returns:
+        Detected CSVDialect
+
+    Raises:
+        FileOperationError: If the file cannot be read
+    """
+    try:
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+        dialect = _cache.get(key)
+        if dialect is not None:
+            return dialect
+
+        with open(file_path, 'rb') as f:
+            sample = f.read(Config.DIALECT_SAMPLE_SIZE)
+    except FileNotFoundError:
+        raise FileOperationError(f"File not found: {file_path}")
+    except PermissionError:
+        raise FileOperationError(f"Permission denied: {file_path}")
+    except OSError as e:
+        raise FileOperationError(f"Error reading file {file_path}: {str(e)}")
+
+    dialect = detect_dialect_from_sample(sample, truncated=stat.st_size > len(sample))
+    _cache.put(key, dialect)
+    return dialect
+
+
+def clear_dialect_cache() -> None:
+    """Forget all cached dialect detections."""
+    _cache.clear()
+
+
+def detect_dialect_from_sample(sample: bytes, truncated: bool = False) -> CSVDialect:
+    """
+    Detect a CSV dialect from the leading bytes of a file.
+
+    Args:
+        sample: Leading bytes of the file
+        truncated: Whether the file continues past the sample
+
+    Returns:
+        Detected CSVDialect
+    """
+    encoding, has_bom = _detect_encoding(sample)
+    text = _decode_sample(sample, encoding)
+
+    if truncated:
+        # Drop the last, probably incomplete, line
+        cut = max(text.rfind('\n'), text.rfind('\r'))
+        if cut > 0:
+            text = text[:cut + 1]
+
+    dialect = CSVDialect(encoding=encoding, has_bom=has_bom)
+    if not text:
+        return dialect
+
+    dialect.lineterminator = _detect_lineterminator(text)
+
+    try:
+        sniffed = csv.Sniffer().sniff(text, delimiters=Config.CANDIDATE_DELIMITERS)
+        dialect.quotechar = sniffed.quotechar or '"'
+        dialect.skipinitialspace = sniffed.skipinitialspace
+        sniffed_delimiter: Optional[str] = sniffed.delimiter
+    except csv.Error:
+        sniffed_delimiter = None
+
+    # The sniffer reports doublequote=False whenever the sample happens to
+    # contain no doubled quotes, so only switch to backslash escaping on
+    # positive evidence. A field ending in an escaped quote (\"hi\"") holds
+    # a doubled quote too, so those preceded by a backslash don't count.
+    quote = re.escape(dialect.quotechar)
+    if '\\' + dialect.quotechar in text and not re.search(r'(?<!\\)' + quote * 2, text):
+        dialect.doublequote = False
+        dialect.escapechar = '\\'
+
+    dialect.delimiter = _choose_delimiter(text, dialect.quotechar, sniffed_delimiter, truncated)
+    dialect.quoting = _detect_quoting(text, dialect)
+    return dialect
+
+
+def _detect_encoding(sample: bytes) -> Tuple[str, bool]:
+    """Detect the text encoding from a BOM or byte statistics."""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding, True
+
+    if sample:
+        # BOM-less UTF-16: ASCII text leaves every other byte NUL
+        even_nuls = sample[0::2].count(0)
+        odd_nuls = sample[1::2].count(0)
+        half = len(sample) / 2
+        if odd_nuls > half * 0.4 and even_nuls < half * 0.05:
+            return 'utf-16-le', False
+        if even_nuls > half * 0.4 and odd_nuls < half * 0.05:
+            return 'utf-16-be', False
+
+    for encoding in (Config.DEFAULT_ENCODING,) + Config.FALLBACK_ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding, False
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1', False
+
+
+def _decode_sample(sample: bytes, encoding: str) -> str:
+    """Decode a sample, tolerating a multi-byte sequence cut at its end."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    return decoder.decode(sample, final=False)
+
+
+def _detect_lineterminator(text: str) -> str:
+    """Return the most common line terminator in text."""
+    crlf = text.count('\r\n')
+    lf = text.count('\n') - crlf
+    cr = text.count('\r') - crlf
+    if lf > crlf and lf >= cr:
+        return '\n'
+    if cr > crlf and cr > lf:
+        return '\r'
+    return '\r\n'
+
+
+def _field_count_score(
+    text: str, delimiter: str, quotechar: str, truncated: bool
+) -> Tuple[float, int]:
+    """Score a delimiter by how consistently it splits records into several fields."""
+    try:
+        records = list(csv.reader(io.StringIO(text), delimiter=delimiter, quotechar=quotechar))
+    except csv.Error:
+        return 0.0, 0
+
+    counts = [len(record) for record in records if record]
+    if truncated and len(counts) > 1:
+        counts = counts[:-1]
+    if not counts:
+        return 0.0, 0
+
+    histogram: Dict[int, int] = {}
+    for count in counts:
+        histogram[count] = histogram.get(count, 0) + 1
+    modal_count, modal_freq = max(histogram.items(), key=lambda item: (item[1], item[0]))
+    if modal_count < 2:
+        return 0.0, modal_count
+    return modal_freq / len(counts), modal_count
+
+
+def _choose_delimiter(text: str, quotechar: str, sniffed: Optional[str], truncated: bool) -> str:
+    """Pick the delimiter that splits the sample most consistently."""
+    scores: List[Tuple[float, int, str]] = []
+    for candidate in Config.CANDIDATE_DELIMITERS:
+        if candidate not in text:
+            continue
+        consistency, width = _field_count_score(text, candidate, quotechar, truncated)
+        if width > 1:
+            scores.append((consistency, width, candidate))
+
+    if not scores:
+        return sniffed if sniffed and sniffed in Config.CANDIDATE_DELIMITERS else ','
+
+    best_consistency = max(score[0] for score in scores)
+    # Trust the sniffer when it agrees with the best statistical candidates
+    for consistency, _, candidate in scores:
+        if candidate == sniffed and consistency >= best_consistency:
+            return candidate
+    return max(scores)[2]
+
+
+def _detect_quoting(text: str, dialect: CSVDialect) -> int:
+    """Classify the sample as QUOTE_ALL, QUOTE_MINIMAL or QUOTE_NONE."""
+    if dialect.quotechar not in text:
+        return csv.QUOTE_NONE
+
+    first_line = text.splitlines()[0] if text else ''
+    fields = first_line.split(dialect.delimiter)
+    if fields and all(
+        len(field) >= 2 and field[0] == dialect.quotechar and field[-1] == dialect.quotechar
+        for field in fields
+    ):
+        return csv.QUOTE_ALL
+    return csv.QUOTE_MINIMAL
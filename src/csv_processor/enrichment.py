@@ -0,0 +1,187 @@
+"""
+Hash-join enrichment of source rows from a small lookup CSV.
+
+The lookup file is read once into a dictionary keyed by its join columns.
+While the source streams through the split engine, every row is extended
+with the chosen lookup columns of its matching entry, so the joined
+columns can be split on, included and deduplicated like source columns.
+"""
+
+import csv
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .dialect import detect_dialect
+from .exceptions import FileOperationError, ProcessingError, ValidationError
+
+
+JOIN_TYPES: Tuple[str, ...] = ("left", "inner")
+
+
+class LookupJoin:
+    """A lookup CSV joined to the source rows on one or more key columns."""
+
+    def __init__(
+        self,
+        lookup_file: str,
+        on: Sequence[str],
+        columns: Optional[Sequence[str]] = None,
+        lookup_on: Optional[Sequence[str]] = None,
+        how: str = "left",
+        prefix: str = ""
+    ):
+        """
+        Initialize lookup join.
+
+        Args:
+            lookup_file: Path to the lookup CSV file
+            on: Source fields whose values are looked up
+            columns: Lookup columns added to every row; all columns except
+                the lookup key columns when None
+            lookup_on: Lookup key columns matched against on, in the same
+                order; the same names as on when None
+            how: "left" keeps unmatched rows with empty joined values,
+                "inner" drops them
+            prefix: Prepended to the names of the joined columns
+
+        Raises:
+            ValidationError: If the key columns or join type are invalid
+        """
+        if not on:
+            raise ValidationError("At least one join field must be given")
+        if lookup_on is not None and len(lookup_on) != len(on):
+            raise ValidationError("Join fields and lookup key fields must have the same length")
+        if how not in JOIN_TYPES:
+            raise ValidationError(
+                f"Unknown join type '{how}'. Choose one of: {', '.join(JOIN_TYPES)}"
+            )
+        self.lookup_file = lookup_file
+        self.on = list(on)
+        self.lookup_on = list(lookup_on) if lookup_on is not None else list(on)
+        self.columns = list(columns) if columns is not None else None
+        self.how = how
+        self.prefix = prefix
+        self.duplicate_keys = 0
+        self._lock = threading.Lock()
+        self._loaded: Optional[Tuple[Tuple[int, float], List[str], Dict[Tuple, List[str]]]] = None
+
+    def load(self) -> Tuple[List[str], Dict[Tuple, List[str]]]:
+        """
+        Load the lookup file into a hash index, once per version of the file.
+
+        Returns:
+            Joined column names (without prefix) and the index mapping each
+            key tuple to its joined values; the first entry of a repeated key wins
+
+        Raises:
+            FileOperationError: If the lookup file does not exist
+            ProcessingError: If the lookup file has no header
+            ValidationError: If a key or joined column is not in its header
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.lookup_file)
+            except FileNotFoundError:
+                raise FileOperationError(f"Lookup file not found: {self.lookup_file}")
+            version = (stat.st_size, stat.st_mtime)
+            if self._loaded is None or self._loaded[0] != version:
+                columns, index = self._read_index()
+                self._loaded = (version, columns, index)
+            return self._loaded[1], self._loaded[2]
+
+    def _read_index(self) -> Tuple[List[str], Dict[Tuple, List[str]]]:
+        dialect = detect_dialect(self.lookup_file)
+        with dialect.open(self.lookup_file) as f:
+            reader = csv.reader(f, **dialect.reader_kwargs())
+            header = next(reader, None)
+            if header is None:
+                raise ProcessingError(f"Lookup file is empty or has no headers: {self.lookup_file}")
+
+            columns = self.columns
+            if columns is None:
+                columns = [name for name in header if name not in self.lookup_on]
+            missing = [name for name in self.lookup_on + columns if name not in header]
+            if missing:
+                raise ValidationError(
+                    f"Lookup fields not found in lookup file header: {', '.join(missing)}"
+                )
+
+            key_indices = [header.index(name) for name in self.lookup_on]
+            value_indices = [header.index(name) for name in columns]
+            width = max(key_indices + value_indices) + 1
+            index: Dict[Tuple, List[str]] = {}
+            duplicates = 0
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) < width:
+                    row = row + [""] * (width - len(row))
+                key = tuple([row[i] for i in key_indices])
+                if key in index:
+                    duplicates += 1
+                    continue
+                index[key] = [row[i] for i in value_indices]
+        self.duplicate_keys = duplicates
+        return columns, index
+
+
+class Enricher:
+    """Extends batches of source rows with the columns of a loaded LookupJoin."""
+
+    def __init__(self, join: LookupJoin, header: List[str]):
+        """
+        Initialize enricher.
+
+        Args:
+            join: Lookup join to apply
+            header: Source file header
+
+        Raises:
+            ValidationError: If a join field is missing from the source or a
+                joined column name is already taken
+        """
+        missing = [name for name in join.on if name not in header]
+        if missing:
+            raise ValidationError(f"Join fields not found in CSV header: {', '.join(missing)}")
+        columns, self._index = join.load()
+        joined = [join.prefix + name for name in columns]
+        clashes = [name for name in joined if name in header]
+        if clashes:
+            raise ValidationError(
+                f"Joined columns already exist in CSV header: {', '.join(clashes)}; "
+                f"set a join prefix"
+            )
+        self.header = header + joined
+        self.inner = join.how == "inner"
+        self.matched = 0
+        self.unmatched = 0
+        self._width = len(header)
+        self._key_indices = [header.index(name) for name in join.on]
+        self._missing = [""] * len(joined)
+
+    def apply(self, batch: List[List[str]]) -> List[List[str]]:
+        """Return the batch with joined values appended to every row."""
+        index = self._index
+        width = self._width
+        key_indices = self._key_indices
+        missing = None if self.inner else self._missing
+        out = []
+        unmatched = 0
+        for row in batch:
+            if len(row) != width:
+                if len(row) < width:
+                    raise ProcessingError(
+                        f"Row has {len(row)} fields but the header has {width}: {row!r}"
+                    )
+                row = row[:width]
+            values = index.get(tuple([row[i] for i in key_indices]))
+            if values is None:
+                unmatched += 1
+                if missing is None:
+                    continue
+                values = missing
+            out.append(row + values)
+        self.matched += len(batch) - unmatched
+        self.unmatched += unmatched
+        return out
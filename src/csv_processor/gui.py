@@ -5,11 +5,12 @@ Main GUI application for CSV Data Processor.
 import tkinter as tk
 from tkinter import ttk
 import threading
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 from .config import Config
 from .processor import CSVProcessor
+from .jobs import JobQueue, JobRunner
 from .ui_components import (
     FieldSelectionTable, 
     LogDisplay, 
@@ -44,16 +45,37 @@ class CSVProcessorGUI:
         self.log_display: Optional[LogDisplay] = None
         self.progress: Optional[ttk.Progressbar] = None
         self.status_label: Optional[ttk.Label] = None
+        self.job_queue: Optional[JobQueue] = None
+        self.job_runner: Optional[JobRunner] = None
+        self.pending_jobs: List[int] = []
         
         # Setup GUI
         self._setup_window()
         self._setup_ui()
         self._setup_logging()
+        self._start_job_runner()
     
     def _setup_window(self) -> None:
         """Configure the main window."""
         self.root.title(Config.WINDOW_TITLE)
         self.root.geometry(Config.WINDOW_SIZE)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _start_job_runner(self) -> None:
+        """Open the job queue and run jobs queued in earlier sessions."""
+        try:
+            self.job_queue = JobQueue()
+            self.job_runner = JobRunner(self.job_queue)
+            self.job_runner.start()
+        except CSVProcessorException as e:
+            self.job_queue = self.job_runner = None
+            self._log_message(f"Job queue unavailable: {str(e)}")
+    
+    def _on_close(self) -> None:
+        """Stop taking queued jobs and close the window; unfinished jobs run next session."""
+        if self.job_runner is not None:
+            self.job_runner.stop(wait=False)
+        self.root.destroy()
     
     def _setup_ui(self) -> None:
         """Set up the user interface."""
@@ -138,6 +160,10 @@ class CSVProcessorGUI:
             button_frame, text="Process CSV", command=self._process_csv
         ).pack(side=tk.LEFT, padx=Config.BUTTON_PADDING)
         
+        ttk.Button(
+            button_frame, text="Queue Job", command=self._queue_csv
+        ).pack(side=tk.LEFT, padx=Config.BUTTON_PADDING)
+        
         ttk.Button(
             button_frame, text="Clear", command=self._clear_form
         ).pack(side=tk.LEFT, padx=Config.BUTTON_PADDING)
@@ -284,6 +310,58 @@ class CSVProcessorGUI:
         processing_thread.daemon = True
         processing_thread.start()
     
+    def _queue_csv(self) -> None:
+        """Submit the current selection to the job queue and return at once."""
+        if not self._validate_inputs():
+            return
+        
+        if self.job_queue is None:
+            self._start_job_runner()
+            if self.job_queue is None:
+                ValidationHelper.show_error(
+                    "Error", "Could not queue job: the job queue is unavailable"
+                )
+                return
+        
+        try:
+            job_id = self.job_queue.submit(
+                self.input_file.get(), self.output_dir.get(),
+                self.field_table.get_split_by_fields(), self.field_table.get_included_fields()
+            )
+        except CSVProcessorException as e:
+            ValidationHelper.show_error("Error", f"Could not queue job: {str(e)}")
+            return
+        
+        self.job_runner.wake()
+        self._log_message(f"Queued job {job_id}: {self.input_file.get()}")
+        if not self.pending_jobs:
+            self.root.after(int(Config.JOB_POLL_INTERVAL * 1000), self._poll_jobs)
+        self.pending_jobs.append(job_id)
+    
+    def _poll_jobs(self) -> None:
+        """Log queued jobs that have finished, polling again while any are pending."""
+        still_pending = []
+        for job_id in self.pending_jobs:
+            try:
+                job = self.job_queue.get(job_id)
+            except CSVProcessorException as e:
+                self._log_message(f"Could not read job {job_id}: {str(e)}")
+                job = None
+            if job is None or not job.finished:
+                if job is not None:
+                    still_pending.append(job_id)
+                continue
+            if job.status == 'succeeded':
+                self._log_message(
+                    f"Job {job_id} completed: created {job.result['files_created']} files "
+                    f"from {job.result['total_rows']} rows"
+                )
+            else:
+                self._log_message(f"Job {job_id} {job.status}: {job.error}")
+        self.pending_jobs = still_pending
+        if self.pending_jobs:
+            self.root.after(int(Config.JOB_POLL_INTERVAL * 1000), self._poll_jobs)
+    
     def _process_csv_worker(self) -> None:
         """Worker method for CSV processing (runs in separate thread)."""
         try:
@@ -314,6 +392,10 @@ class CSVProcessorGUI:
                 self.root.after(0, lambda: self._log_message("Processing completed successfully"))
                 self.root.after(0, lambda: self._log_message(f"Created {result.files_created} files"))
                 self.root.after(0, lambda: self._log_message(f"Processed {result.total_rows} rows"))
+                self.root.after(0, lambda: self._log_message(
+                    f"Wrote {result.bytes_written / (1024 * 1024):,.1f} MB "
+                    f"in {result.wall_time:.2f}s ({result.rows_per_second:,.0f} rows/s)"
+                ))
                 self.root.after(0, lambda: self.status_label.config(text="Completed successfully"))
                 self.root.after(0, lambda: ValidationHelper.show_processing_complete(
                     result.files_created, result.total_rows
@@ -0,0 +1,380 @@
+"""
+Binary columnar cache of parsed source files.
+
+The first split of a source parses it once and stores every column in its
+own files under the cache directory. Columns are dictionary-encoded: the
+distinct values are pickled once and each row stores a uint32 code in a
+file that is memory-mapped when read. A column with more than
+Config.INGEST_CACHE_MAX_DICTIONARY distinct values is stored plain, as
+pickled chunks of values. Later runs read only the columns they need,
+without parsing CSV again.
+
+Entries are keyed by the source's absolute path and invalidated when its
+size or modification time changes. When the cache grows past its size
+limit, the least recently used entries are evicted.
+"""
+
+import array
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import Config
+
+
+Batches = Iterator[List[List[str]]]
+
+_FORMAT_VERSION = 1
+_META_FILENAME = "meta.json"
+_CODE_TYPE = "I"
+_CODE_SIZE = array.array(_CODE_TYPE).itemsize
+_BUILD_PREFIX = ".building-"
+# Builds left behind by a crashed process are removed after this long
+_STALE_BUILD_SECONDS = 24 * 3600
+
+
+def default_cache_dir() -> str:
+    """Per-user cache directory used when none is configured."""
+    return os.path.join(os.path.expanduser("~"), ".cache", "csv_processor", "ingest")
+
+
+class _ColumnBuilder:
+    """Encodes the values of one column while the source is parsed."""
+
+    def __init__(self, directory: str, index: int, max_dictionary: int, chunk_rows: int):
+        base = os.path.join(directory, f"c{index:05d}")
+        self.codes_path = base + ".codes"
+        self.dictionary_path = base + ".dict"
+        self.values_path = base + ".values"
+        self.max_dictionary = max_dictionary
+        self.chunk_rows = chunk_rows
+        self._lookup: Dict[str, int] = {}
+        self._dictionary: List[str] = []
+        self._codes_file = open(self.codes_path, 'wb')
+        self._values_file = None
+        self._pending: List[str] = []
+
+    def add(self, values: Sequence[str]) -> None:
+        """Append the column's values of one batch."""
+        if self._values_file is not None:
+            self._add_plain(values)
+            return
+        lookup = self._lookup
+        dictionary = self._dictionary
+        codes = array.array(_CODE_TYPE)
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(dictionary)
+                dictionary.append(value)
+            codes.append(code)
+        codes.tofile(self._codes_file)
+        if len(dictionary) > self.max_dictionary:
+            self._switch_to_plain()
+
+    def finish(self) -> Dict[str, Any]:
+        """Flush the column and return its metadata."""
+        if self._values_file is not None:
+            if self._pending:
+                pickle.dump(self._pending, self._values_file, pickle.HIGHEST_PROTOCOL)
+                self._pending = []
+            self._values_file.close()
+            return {'encoding': 'plain'}
+        self._codes_file.close()
+        with open(self.dictionary_path, 'wb') as f:
+            pickle.dump(self._dictionary, f, pickle.HIGHEST_PROTOCOL)
+        return {'encoding': 'dictionary', 'distinct': len(self._dictionary)}
+
+    def abort(self) -> None:
+        self._codes_file.close()
+        if self._values_file is not None:
+            self._values_file.close()
+
+    def _switch_to_plain(self) -> None:
+        """Rewrite the codes written so far as plain values and continue plain."""
+        self._codes_file.close()
+        self._values_file = open(self.values_path, 'wb')
+        lookup = self._dictionary.__getitem__
+        with open(self.codes_path, 'rb') as f:
+            while True:
+                codes = array.array(_CODE_TYPE)
+                codes.frombytes(f.read(self.chunk_rows * _CODE_SIZE))
+                if not codes:
+                    break
+                self._add_plain(list(map(lookup, codes)))
+        os.unlink(self.codes_path)
+        self._lookup = {}
+        self._dictionary = []
+
+    def _add_plain(self, values: Sequence[str]) -> None:
+        pending = self._pending
+        pending.extend(values)
+        chunk_rows = self.chunk_rows
+        if len(pending) >= chunk_rows:
+            full = len(pending) - len(pending) % chunk_rows
+            for start in range(0, full, chunk_rows):
+                pickle.dump(
+                    pending[start:start + chunk_rows], self._values_file, pickle.HIGHEST_PROTOCOL
+                )
+            del pending[:full]
+
+
+class CachedSource:
+    """A cache entry: the header, row count and encoded columns of one source version."""
+
+    def __init__(self, directory: str, meta: Dict[str, Any]):
+        self.directory = directory
+        self.header: List[str] = meta['header']
+        self.rows: int = meta['rows']
+        self.size_bytes: int = meta['bytes']
+        self._columns: List[Dict[str, Any]] = meta['columns']
+        self._chunk_rows: int = meta['chunk_rows']
+
+    def encoding(self, field: str) -> str:
+        """Storage of a column: "dictionary" or "plain"."""
+        return self._columns[self.header.index(field)]['encoding']
+
+    def read_batches(self, fields: Sequence[str]) -> Batches:
+        """
+        Stream rows holding only the given fields, in that order.
+
+        Raises:
+            ValueError: If a field is not in the header
+        """
+        readers = [self._read_column(self.header.index(field)) for field in fields]
+        for parts in zip(*readers):
+            yield [list(row) for row in zip(*parts)]
+
+    def _read_column(self, index: int) -> Iterator[List[str]]:
+        """Yield the values of one column a chunk at a time."""
+        base = os.path.join(self.directory, f"c{index:05d}")
+        if self._columns[index]['encoding'] == 'plain':
+            with open(base + ".values", 'rb') as f:
+                while True:
+                    try:
+                        yield pickle.load(f)
+                    except EOFError:
+                        return
+
+        with open(base + ".dict", 'rb') as f:
+            lookup = pickle.load(f).__getitem__
+        if not self.rows:
+            return
+        chunk_rows = self._chunk_rows
+        with open(base + ".codes", 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            codes = memoryview(mapped).cast(_CODE_TYPE)
+            try:
+                for start in range(0, self.rows, chunk_rows):
+                    yield list(map(lookup, codes[start:start + chunk_rows]))
+            finally:
+                codes.release()
+
+
+class IngestCache:
+    """Directory of columnar cache entries, bounded in size with LRU eviction."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = Config.INGEST_CACHE_DIR,
+        max_bytes: int = Config.INGEST_CACHE_MAX_BYTES
+    ):
+        """
+        Initialize ingest cache.
+
+        Args:
+            cache_dir: Directory holding the entries; default_cache_dir() when None.
+                Pass a source's own directory to keep its cache beside it
+            max_bytes: Total size above which least recently used entries are evicted
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def entry_path(self, source_file: str) -> str:
+        """Directory of the entry for a source path."""
+        path = os.path.abspath(source_file).encode("utf-8", "surrogatepass")
+        return os.path.join(self.cache_dir, hashlib.blake2b(path, digest_size=12).hexdigest())
+
+    def lookup(self, source_file: str) -> Optional[CachedSource]:
+        """Return the current entry of a source, or None if it is missing or stale."""
+        entry = self.entry_path(source_file)
+        meta = self._read_meta(entry)
+        if meta is None or not self._is_current(meta, source_file):
+            return None
+        try:
+            os.utime(os.path.join(entry, _META_FILENAME))
+        except OSError:
+            pass
+        return CachedSource(entry, meta)
+
+    def open(
+        self,
+        source_file: str,
+        read_batches: Callable[[], Tuple[List[str], Batches]]
+    ) -> Tuple[CachedSource, bool]:
+        """
+        Return the entry of a source, building it first if needed.
+
+        Args:
+            source_file: Path to the source CSV file
+            read_batches: Parses the source, returning its header and row batches
+
+        Returns:
+            The cache entry, and whether it was built by this call
+        """
+        with self._lock:
+            cached = self.lookup(source_file)
+            if cached is not None:
+                return cached, False
+            cached = self._build(source_file, read_batches)
+            self.evict(keep=cached.directory)
+            return cached, True
+
+    def total_bytes(self) -> int:
+        """Size of all complete entries."""
+        return sum(size for _, _, size in self._entries())
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used entries until the cache fits max_bytes.
+
+        Args:
+            keep: Entry directory that is never evicted
+
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for _, entry, size in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _entries(self) -> List[Tuple[float, str, int]]:
+        """(last used, directory, size) of every complete entry; removes abandoned builds."""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return entries
+        now = time.time()
+        for name in names:
+            entry = os.path.join(self.cache_dir, name)
+            if name.startswith(_BUILD_PREFIX):
+                try:
+                    if now - os.path.getmtime(entry) > _STALE_BUILD_SECONDS:
+                        shutil.rmtree(entry, ignore_errors=True)
+                except OSError:
+                    pass
+                continue
+            meta = self._read_meta(entry)
+            if meta is None:
+                continue
+            try:
+                last_used = os.path.getmtime(os.path.join(entry, _META_FILENAME))
+            except OSError:
+                continue
+            entries.append((last_used, entry, meta['bytes']))
+        return entries
+
+    def _read_meta(self, entry: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(entry, _META_FILENAME), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (
+            meta.get('version') != _FORMAT_VERSION
+            or meta.get('code_size') != _CODE_SIZE
+            or meta.get('byteorder') != sys.byteorder
+        ):
+            return None
+        return meta
+
+    def _is_current(self, meta: Dict[str, Any], source_file: str) -> bool:
+        try:
+            stat = os.stat(source_file)
+        except OSError:
+            return False
+        return meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns
+
+    def _build(
+        self, source_file: str, read_batches: Callable[[], Tuple[List[str], Batches]]
+    ) -> CachedSource:
+        """Parse the source into a new entry, replacing any stale one."""
+        stat = os.stat(source_file)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=_BUILD_PREFIX, dir=self.cache_dir)
+        try:
+            header, batches = read_batches()
+            width = len(header)
+            chunk_rows = Config.INGEST_CACHE_CHUNK_ROWS
+            max_dictionary = Config.INGEST_CACHE_MAX_DICTIONARY
+            builders = [
+                _ColumnBuilder(build_dir, i, max_dictionary, chunk_rows) for i in range(width)
+            ]
+            rows = 0
+            try:
+                for batch in batches:
+                    if any(len(row) != width for row in batch):
+                        # Short rows read as empty values, extra fields are dropped
+                        padding = [""] * width
+                        batch = [(row + padding)[:width] for row in batch]
+                    for builder, values in zip(builders, zip(*batch)):
+                        builder.add(values)
+                    rows += len(batch)
+                columns = [builder.finish() for builder in builders]
+            except BaseException:
+                for builder in builders:
+                    builder.abort()
+                raise
+
+            size = sum(entry.stat().st_size for entry in os.scandir(build_dir))
+            meta = {
+                'version': _FORMAT_VERSION,
+                'code_size': _CODE_SIZE,
+                'byteorder': sys.byteorder,
+                'source': os.path.abspath(source_file),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'header': header,
+                'rows': rows,
+                'chunk_rows': chunk_rows,
+                'columns': columns,
+                'bytes': size,
+            }
+            with open(os.path.join(build_dir, _META_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+            entry = self.entry_path(source_file)
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.rename(build_dir, entry)
+            except OSError:
+                # Another process published the same entry first
+                shutil.rmtree(build_dir, ignore_errors=True)
+                meta = self._read_meta(entry) or meta
+        except BaseException:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+        return CachedSource(entry, meta)
@@ -0,0 +1,589 @@
+"""
+Persistent split job queue backed by SQLite, and a worker pool running it.
+
+JobQueue stores each job's source, fields and options with its status,
+progress and result, so queued jobs survive restarts and several
+processes can share one queue. JobRunner takes jobs in priority order on
+a pool of worker threads, never running more than a set number of jobs
+at once on the same source or output disk. Runners write heartbeats for
+their running jobs; jobs of a runner that stopped without finishing them
+are queued again.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .dedupe import DedupePolicy
+from .enrichment import LookupJoin
+from .exceptions import FileOperationError, ValidationError
+from .processor import CSVProcessor, ProcessingResult
+from .sorting import SortColumn
+
+
+JOB_STATUSES: Tuple[str, ...] = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES: Tuple[str, ...] = ("succeeded", "failed", "cancelled")
+
+# Options passed to CSVProcessor and to split_csv_by_fields
+PROCESSOR_OPTIONS: Tuple[str, ...] = ("parser_backend", "writer_threads", "max_memory")
+SPLIT_OPTIONS: Tuple[str, ...] = (
+    "run_report", "manifest", "buckets", "max_rows_per_file", "max_bytes_per_file",
+    "sort_by", "sort_memory", "dedupe", "join", "layout",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    source_file TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    split_by_fields TEXT NOT NULL,
+    included_fields TEXT NOT NULL,
+    options TEXT NOT NULL,
+    source_device INTEGER,
+    output_device INTEGER,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL,
+    runner_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    progress TEXT,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, priority DESC, id);
+"""
+
+
+def default_queue_path() -> str:
+    """Per-user job database used when none is configured."""
+    return os.path.join(os.path.expanduser("~"), ".cache", "csv_processor", "jobs.db")
+
+
+def _device(path: str) -> Optional[int]:
+    """Device number of the disk holding path, or of its nearest existing parent."""
+    path = os.path.abspath(path)
+    while True:
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+
+def encode_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert job options to JSON-compatible values.
+
+    Raises:
+        ValidationError: If an option is unknown or cannot be stored
+    """
+    unknown = sorted(set(options) - set(PROCESSOR_OPTIONS + SPLIT_OPTIONS))
+    if unknown:
+        raise ValidationError(f"Unknown job options: {', '.join(unknown)}")
+    encoded = dict(options)
+    if encoded.get('sort_by'):
+        encoded['sort_by'] = [
+            {
+                'field': column.field, 'kind': column.kind,
+                'descending': column.descending, 'date_format': column.date_format,
+            } if isinstance(column, SortColumn) else column
+            for column in encoded['sort_by']
+        ]
+    if isinstance(encoded.get('dedupe'), DedupePolicy):
+        policy = encoded['dedupe']
+        encoded['dedupe'] = {
+            'fields': policy.fields, 'mode': policy.mode,
+            'memory_budget': policy.memory_budget, 'error_rate': policy.error_rate,
+        }
+    if isinstance(encoded.get('join'), LookupJoin):
+        join = encoded['join']
+        encoded['join'] = {
+            'lookup_file': os.path.abspath(join.lookup_file), 'on': join.on,
+            'columns': join.columns, 'lookup_on': join.lookup_on, 'how': join.how,
+            'prefix': join.prefix,
+        }
+    try:
+        json.dumps(encoded)
+    except (TypeError, ValueError) as e:
+        raise ValidationError(f"Job options cannot be stored: {e}")
+    return encoded
+
+
+def decode_options(encoded: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Rebuild stored job options.
+
+    Returns:
+        Keyword arguments for CSVProcessor and for split_csv_by_fields
+    """
+    processor_kwargs = {name: encoded[name] for name in PROCESSOR_OPTIONS if name in encoded}
+    split_kwargs = {name: encoded[name] for name in SPLIT_OPTIONS if name in encoded}
+    if split_kwargs.get('sort_by'):
+        split_kwargs['sort_by'] = [
+            SortColumn(**column) if isinstance(column, dict) else column
+            for column in split_kwargs['sort_by']
+        ]
+    if isinstance(split_kwargs.get('dedupe'), dict):
+        split_kwargs['dedupe'] = DedupePolicy(**split_kwargs['dedupe'])
+    if isinstance(split_kwargs.get('join'), dict):
+        split_kwargs['join'] = LookupJoin(**split_kwargs['join'])
+    return processor_kwargs, split_kwargs
+
+
+def progress_recorder(queue: 'JobQueue', job_id: int) -> Callable[[str], None]:
+    """Progress callback storing a job's latest message every Config.JOB_PROGRESS_INTERVAL."""
+    last_update = 0.0
+
+    def on_progress(message: str) -> None:
+        nonlocal last_update
+        now = time.monotonic()
+        if now - last_update >= Config.JOB_PROGRESS_INTERVAL:
+            last_update = now
+            try:
+                queue.update_progress(job_id, message)
+            except FileOperationError:
+                pass
+
+    return on_progress
+
+
+class Job:
+    """Data class for one queued split job and its state."""
+
+    def __init__(self, row: sqlite3.Row):
+        self.id: int = row['id']
+        self.status: str = row['status']
+        self.priority: int = row['priority']
+        self.source_file: str = row['source_file']
+        self.output_dir: str = row['output_dir']
+        self.split_by_fields: List[str] = json.loads(row['split_by_fields'])
+        self.included_fields: List[str] = json.loads(row['included_fields'])
+        self.options: Dict[str, Any] = json.loads(row['options'])
+        self.submitted_at: float = row['submitted_at']
+        self.started_at: Optional[float] = row['started_at']
+        self.finished_at: Optional[float] = row['finished_at']
+        self.attempts: int = row['attempts']
+        self.progress: Optional[str] = row['progress']
+        self.result: Optional[Dict[str, Any]] = json.loads(row['result']) if row['result'] else None
+        self.error: Optional[str] = row['error']
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for reporting."""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'priority': self.priority,
+            'source_file': self.source_file,
+            'output_dir': self.output_dir,
+            'split_by_fields': self.split_by_fields,
+            'included_fields': self.included_fields,
+            'options': self.options,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'attempts': self.attempts,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class JobQueue:
+    """SQLite table of split jobs, safe to share between threads and processes."""
+
+    def __init__(self, path: Optional[str] = Config.JOB_QUEUE_PATH):
+        """
+        Initialize job queue, creating the database if needed.
+
+        Args:
+            path: SQLite database file; default_queue_path() when None
+
+        Raises:
+            FileOperationError: If the database cannot be opened
+        """
+        self.path = path or default_queue_path()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            raise FileOperationError(f"Cannot create job queue directory {directory}: {e}")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived autocommit connection, translating SQLite errors."""
+        try:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Cannot open job queue {self.path}: {e}")
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Job queue error: {e}")
+        finally:
+            conn.close()
+
+    def submit(
+        self,
+        source_file: str,
+        output_dir: str,
+        split_by_fields: Sequence[str],
+        included_fields: Sequence[str],
+        priority: int = 0,
+        **options: Any
+    ) -> int:
+        """
+        Queue a split job.
+
+        Args:
+            source_file: Path to the source CSV file
+            output_dir: Directory where output files will be created
+            split_by_fields: Field names to split by, in order
+            included_fields: Field names written to the output, in order
+            priority: Jobs with a higher priority run first; equal
+                priorities run in submission order
+            **options: split_csv_by_fields keyword arguments, plus
+                parser_backend, writer_threads and max_memory for the processor
+
+        Returns:
+            Job id
+
+        Raises:
+            ValidationError: If the fields are empty or an option is invalid
+        """
+        if not split_by_fields:
+            raise ValidationError("At least one split_by field must be specified")
+        if not included_fields:
+            raise ValidationError("At least one field must be included in output")
+        encoded = encode_options(options)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (status, priority, source_file, output_dir, split_by_fields, "
+                "included_fields, options, source_device, output_device, submitted_at) "
+                "VALUES ('queued', ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    priority, os.path.abspath(source_file), os.path.abspath(output_dir),
+                    json.dumps(list(split_by_fields)), json.dumps(list(included_fields)),
+                    json.dumps(encoded), _device(source_file), _device(output_dir), time.time(),
+                )
+            )
+            return cursor.lastrowid
+
+    def begin(
+        self,
+        source_name: str,
+        output_dir: str,
+        split_by_fields: Sequence[str],
+        included_fields: Sequence[str],
+        runner_id: str,
+        **options: Any
+    ) -> int:
+        """
+        Record a job that the caller runs itself, such as a streamed upload.
+
+        The job starts as running under runner_id. It cannot be run again,
+        so if the runner stops sending heartbeats it is failed rather than
+        requeued.
+
+        Returns:
+            Job id
+        """
+        encoded = encode_options(options)
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (status, source_file, output_dir, split_by_fields, "
+                "included_fields, options, output_device, submitted_at, started_at, "
+                "heartbeat_at, runner_id, attempts) "
+                "VALUES ('running', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    source_name, os.path.abspath(output_dir), json.dumps(list(split_by_fields)),
+                    json.dumps(list(included_fields)), json.dumps(encoded), _device(output_dir),
+                    now, now, now, runner_id, Config.JOB_MAX_ATTEMPTS,
+                )
+            )
+            return cursor.lastrowid
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Return a job, or None if there is no job with this id."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(row) if row is not None else None
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Job]:
+        """Return all jobs, or those with the given status, in submission order."""
+        with self._connect() as conn:
+            if status is None:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,)
+                ).fetchall()
+        return [Job(row) for row in rows]
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not started. Returns whether it was cancelled."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            return cursor.rowcount == 1
+
+    def claim(
+        self, runner_id: str, device_limit: int = Config.JOB_DEVICE_CONCURRENCY
+    ) -> Optional[Job]:
+        """
+        Mark the next runnable job as running and return it.
+
+        The highest-priority queued job is taken whose source and output
+        disks each have fewer than device_limit running jobs, counted over
+        every runner sharing the queue.
+
+        Returns:
+            The claimed job, or None if no job can start now
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                running: Dict[int, int] = {}
+                devices = conn.execute(
+                    "SELECT source_device, output_device FROM jobs WHERE status = 'running'"
+                )
+                for row in devices:
+                    for device in {row['source_device'], row['output_device']} - {None}:
+                        running[device] = running.get(device, 0) + 1
+                full = {device for device, count in running.items() if count >= device_limit}
+
+                claimed = None
+                candidates = conn.execute(
+                    "SELECT id, source_device, output_device FROM jobs WHERE status = 'queued' "
+                    "ORDER BY priority DESC, id"
+                )
+                for row in candidates:
+                    if row['source_device'] in full or row['output_device'] in full:
+                        continue
+                    now = time.time()
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', runner_id = ?, started_at = ?, "
+                        "heartbeat_at = ?, attempts = attempts + 1, progress = NULL WHERE id = ?",
+                        (runner_id, now, now, row['id'])
+                    )
+                    claimed = conn.execute(
+                        "SELECT * FROM jobs WHERE id = ?", (row['id'],)
+                    ).fetchone()
+                    break
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return Job(claimed) if claimed is not None else None
+
+    def update_progress(self, job_id: int, message: str) -> None:
+        """Record the latest progress message of a running job."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, heartbeat_at = ? "
+                "WHERE id = ? AND status = 'running'",
+                (message, time.time(), job_id)
+            )
+
+    def finish(self, job_id: int, result: ProcessingResult, runner_id: str) -> bool:
+        """
+        Record the result of a job, marking it succeeded or failed.
+
+        Only the runner currently holding the job can finish it, so a runner
+        whose job was requeued meanwhile cannot overwrite the newer run.
+
+        Returns:
+            Whether the result was recorded
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? "
+                "WHERE id = ? AND runner_id = ? AND status = 'running'",
+                (
+                    'succeeded' if result.success else 'failed', time.time(),
+                    json.dumps(result.to_dict(include_partitions=False)), result.error,
+                    job_id, runner_id,
+                )
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, runner_id: str) -> None:
+        """Mark the running jobs of a runner as alive."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE runner_id = ? AND status = 'running'",
+                (time.time(), runner_id)
+            )
+
+    def requeue_stale(self, stale_after: float = Config.JOB_STALE_AFTER) -> int:
+        """
+        Queue again the running jobs whose runner stopped sending heartbeats.
+
+        Jobs that have already been started Config.JOB_MAX_ATTEMPTS times
+        are failed instead.
+
+        Returns:
+            Number of jobs queued again
+        """
+        cutoff = time.time() - stale_after
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+                "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+                (
+                    time.time(), "Job abandoned by its runner too many times",
+                    cutoff, Config.JOB_MAX_ATTEMPTS,
+                )
+            )
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', runner_id = NULL, started_at = NULL "
+                "WHERE status = 'running' AND heartbeat_at < ?",
+                (cutoff,)
+            )
+            return cursor.rowcount
+
+
+class JobRunner:
+    """Runs queued jobs on a pool of worker threads."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = Config.JOB_WORKERS,
+        device_limit: int = Config.JOB_DEVICE_CONCURRENCY,
+        processor_factory: Callable[..., CSVProcessor] = CSVProcessor
+    ):
+        """
+        Initialize job runner.
+
+        Args:
+            queue: Job queue to take jobs from
+            workers: Number of jobs run at once
+            device_limit: Running jobs allowed per source or output disk
+            processor_factory: Creates the CSVProcessor of each job from
+                progress_callback and the job's processor options
+        """
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.device_limit = max(1, device_limit)
+        self.processor_factory = processor_factory
+        self.runner_id = uuid.uuid4().hex
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Queue again jobs abandoned by stopped runners, then start the workers."""
+        if self._threads:
+            return
+        self._stop.clear()
+        self.queue.requeue_stale()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        self._threads.append(
+            threading.Thread(target=self._keep_alive, name="job-heartbeat", daemon=True)
+        )
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop taking jobs; with wait, block until the running jobs finish."""
+        self._stop.set()
+        self._wakeup.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def wake(self) -> None:
+        """Check for new jobs now rather than at the next poll."""
+        self._wakeup.set()
+
+    def run_pending(self) -> int:
+        """
+        Run jobs in the calling thread until none can start.
+
+        Returns:
+            Number of jobs run
+        """
+        count = 0
+        while True:
+            job = self.queue.claim(self.runner_id, self.device_limit)
+            if job is None:
+                return count
+            self._run(job)
+            count += 1
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(self.runner_id, self.device_limit)
+            except FileOperationError as e:
+                self.logger.error(
+                    f"Cannot take a job: {e}; retrying in {Config.JOB_ERROR_BACKOFF:g}s"
+                )
+                self._stop.wait(Config.JOB_ERROR_BACKOFF)
+                continue
+            if job is None:
+                self._wakeup.wait(Config.JOB_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _keep_alive(self) -> None:
+        while not self._stop.wait(Config.JOB_HEARTBEAT_INTERVAL):
+            try:
+                self.queue.heartbeat(self.runner_id)
+                self.queue.requeue_stale()
+            except FileOperationError:
+                pass
+
+    def _run(self, job: Job) -> None:
+        """Run one job and store its result."""
+        try:
+            processor_kwargs, split_kwargs = decode_options(job.options)
+            processor = self.processor_factory(
+                progress_callback=progress_recorder(self.queue, job.id), **processor_kwargs
+            )
+            result = processor.split_csv_by_fields(
+                job.source_file, job.output_dir, job.split_by_fields, job.included_fields,
+                **split_kwargs
+            )
+        except Exception as e:
+            result = ProcessingResult(success=False, error=f"Unexpected error: {str(e)}")
+        try:
+            recorded = self.queue.finish(job.id, result, self.runner_id)
+        except FileOperationError as e:
+            # The job is requeued once its heartbeats stop
+            self.logger.error(f"Cannot record the result of job {job.id}: {e}")
+            return
+        if not recorded:
+            self.logger.warning(
+                f"Job {job.id} was taken over by another runner; its result was not recorded"
+            )
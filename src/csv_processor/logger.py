@@ -4,7 +4,8 @@ Logging configuration for CSV Splitter application.
 
 import logging
 import sys
-from typing import Optional
+import time
+from typing import Callable, Optional
 from datetime import datetime
 
 from .config import Config
@@ -98,4 +99,75 @@ def setup_gui_logging(log_callback) -> None:
     # Add handler to CSV splitter loggers
     csv_logger = logging.getLogger('csv_splitter')
     csv_logger.addHandler(gui_handler)
-    csv_logger.setLevel(logging.INFO)
\ No newline at end of file
+    csv_logger.setLevel(logging.INFO)
+
+
+class ProgressAggregator:
+    """
+    Collapses high-frequency progress events into periodic summaries.
+    
+    The first detail_limit events are reported individually; after that,
+    events are counted and reported at most once per interval as a single
+    summary line, so runs with many thousands of partitions do not send
+    one log record per partition through every handler.
+    """
+    
+    def __init__(
+        self,
+        report: Callable[[str], None],
+        action: str = "Created",
+        noun: str = "files",
+        interval: float = Config.PROGRESS_LOG_INTERVAL,
+        detail_limit: int = Config.PROGRESS_DETAIL_LIMIT
+    ):
+        """
+        Initialize progress aggregator.
+        
+        Args:
+            report: Function called with each message to emit
+            action: Verb used in summaries, e.g. "Created"
+            noun: Plural noun used in summaries, e.g. "files"
+            interval: Minimum seconds between summaries
+            detail_limit: Number of events reported individually first
+        """
+        self.report = report
+        self.action = action
+        self.noun = noun
+        self.interval = interval
+        self.detail_limit = detail_limit
+        self.total = 0
+        self._pending = 0
+        self._window_start = time.monotonic()
+    
+    def add(self, detail: Optional[Callable[[], str]] = None) -> None:
+        """
+        Record one event.
+        
+        Args:
+            detail: Optional function building the individual message; it is
+                only called while events are still reported individually
+        """
+        self.total += 1
+        if self.total <= self.detail_limit and detail is not None:
+            self.report(detail())
+            self._window_start = time.monotonic()
+            return
+        
+        self._pending += 1
+        now = time.monotonic()
+        if now - self._window_start >= self.interval:
+            self._emit(now)
+    
+    def flush(self) -> None:
+        """Report any events not yet summarized."""
+        if self._pending:
+            self._emit(time.monotonic())
+    
+    def _emit(self, now: float) -> None:
+        elapsed = max(now - self._window_start, 0.0)
+        self.report(
+            f"{self.action} {self._pending:,} {self.noun} in the last {elapsed:.1f} s "
+            f"({self.total:,} total)"
+        )
+        self._pending = 0
+        self._window_start = now
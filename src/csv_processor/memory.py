@@ -0,0 +1,159 @@
+"""
+Memory budget governor switching split strategies under memory pressure.
+
+Grouping every row in memory and writing each partition once is the
+fastest way to split, but its memory grows with the input. A
+MemoryGovernor sums cheap estimates of the bytes held by grouping
+buffers, sort buffers and dedupe state, and now and then compares them
+with the growth of the process RSS since the run started. As usage
+approaches max_memory it escalates, and never backs off, since freed
+memory is rarely returned to the operating system:
+
+    group   rows are grouped in memory and written when the input ends
+    flush   grouped rows are written out, then every batch as it is read
+    spill   sort buffers and dedupe state are spilled to disk as well
+
+Checks go on while spilled dedupe rows are drained and sorted partitions
+are merged, and spill files are pickled in batches sized from the budget
+so that reading many of them back at once stays within it.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .resources import current_rss_bytes
+
+
+MEMORY_STRATEGIES: Tuple[str, ...] = ("group", "flush", "spill")
+
+# Approximate in-memory cost of a buffered row and of each of its fields,
+# on top of the characters themselves
+_ROW_OVERHEAD = 160
+_FIELD_OVERHEAD = 57
+
+
+def estimate_rows_bytes(rows: Sequence[Sequence[str]]) -> int:
+    """Estimate the memory held by a list of rows from a sample of them."""
+    if not rows:
+        return 0
+    sample = rows[:32]
+    chars = sum(len(value) for row in sample for value in row)
+    fields = sum(len(row) for row in sample)
+    per_row = (chars + _FIELD_OVERHEAD * fields) / len(sample) + _ROW_OVERHEAD
+    return int(per_row * len(rows))
+
+
+def spill_batch_rows(memory_budget: int, streams: int, row_bytes: float) -> int:
+    """
+    Rows per pickled record of a spill file, sized from a memory budget.
+
+    A merge holds one record of every file it reads, so records are sized
+    for streams of them to fit in memory_budget together.
+
+    Args:
+        memory_budget: Bytes the records read at once may take
+        streams: Spill files read at the same time
+        row_bytes: Estimated in-memory bytes of one row
+    """
+    rows = int(memory_budget / (max(1, streams) * max(1.0, row_bytes)))
+    return max(Config.SPILL_MIN_BATCH_ROWS, min(Config.SPILL_BATCH_ROWS, rows))
+
+
+class MemoryGovernor:
+    """Tracks the memory of one run against a budget and picks its strategy."""
+
+    def __init__(
+        self,
+        max_memory: int,
+        flush_fraction: float = Config.MEMORY_FLUSH_FRACTION,
+        spill_fraction: float = Config.MEMORY_SPILL_FRACTION,
+        rss_interval: float = Config.MEMORY_RSS_INTERVAL,
+        rss_reader: Callable[[], Optional[int]] = current_rss_bytes
+    ):
+        """
+        Initialize memory governor.
+
+        Args:
+            max_memory: Budget in bytes for the memory a run adds to the process
+            flush_fraction: Share of the budget at which buffers are flushed
+            spill_fraction: Share of the budget at which state is spilled to disk
+            rss_interval: Seconds between RSS readings
+            rss_reader: Function returning the current RSS, or None where
+                unavailable; only the estimates are used then
+        """
+        self.max_memory = max_memory
+        self.flush_bytes = int(max_memory * flush_fraction)
+        self.spill_bytes = int(max_memory * spill_fraction)
+        self.rss_interval = rss_interval
+        self.strategy = MEMORY_STRATEGIES[0]
+        self.estimated_bytes = 0
+        self.rss_growth = 0
+        self.peak_usage = 0
+        self.logger = logging.getLogger(__name__)
+        self._rss_reader = rss_reader
+        self._baseline_rss = rss_reader()
+        self._next_rss = time.monotonic() + rss_interval
+        self._sources: List[Callable[[], int]] = []
+        self._listeners: List[Callable[[str], None]] = []
+        # Writer threads check while merging sorted partitions
+        self._lock = threading.RLock()
+
+    @property
+    def spill_budget(self) -> int:
+        """Bytes left to components that spill to disk once spilling starts."""
+        return max(1, self.max_memory - self.spill_bytes)
+
+    @property
+    def usage(self) -> int:
+        """Larger of the estimated bytes and the RSS growth at the last check."""
+        return max(self.estimated_bytes, self.rss_growth)
+
+    def track(self, source: Callable[[], int]) -> None:
+        """Add a function returning the estimated bytes some component holds."""
+        self._sources.append(source)
+
+    def on_switch(self, callback: Callable[[str], None]) -> None:
+        """Call callback with each strategy the governor escalates to."""
+        self._listeners.append(callback)
+
+    def check(self) -> str:
+        """
+        Compare the current usage with the budget, escalating if needed.
+
+        Returns:
+            The strategy in effect after the check
+        """
+        with self._lock:
+            return self._check()
+
+    def _check(self) -> str:
+        """Check under the lock, so listeners see each strategy once."""
+        self.estimated_bytes = sum(source() for source in self._sources)
+        if self._baseline_rss is not None and time.monotonic() >= self._next_rss:
+            rss = self._rss_reader()
+            if rss is not None:
+                self.rss_growth = max(0, rss - self._baseline_rss)
+            self._next_rss = time.monotonic() + self.rss_interval
+        usage = self.usage
+        self.peak_usage = max(self.peak_usage, usage)
+
+        if usage >= self.spill_bytes:
+            target = "spill"
+        elif usage >= self.flush_bytes:
+            target = "flush"
+        else:
+            return self.strategy
+        # Pass through every strategy in between, so buffers are flushed before state is spilled
+        level = MEMORY_STRATEGIES.index(self.strategy)
+        for strategy in MEMORY_STRATEGIES[level + 1:MEMORY_STRATEGIES.index(target) + 1]:
+            self.logger.info(
+                f"Memory use about {usage:,} of {self.max_memory:,} bytes; switching from "
+                f"'{self.strategy}' to '{strategy}'"
+            )
+            self.strategy = strategy
+            for listener in self._listeners:
+                listener(strategy)
+        return self.strategy
@@ -0,0 +1,247 @@
+"""
+Streaming concatenation and k-way merge of CSV files into one file.
+
+Columns are aligned by header name: the output header is the union of the
+input headers in order of first appearance, or a chosen list of fields,
+and columns an input lacks are written empty. Inputs are read in batches
+and the output is written in encoded blocks through a large buffer.
+
+With sort columns the inputs, each already sorted, are combined with a
+heap merge that holds one batch per input, so memory grows with the
+number of inputs rather than their size. Beyond Config.MERGE_FAN_IN
+inputs, groups of inputs are first merged into temporary files.
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+from operator import itemgetter
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from .backends import read_header, select_backend
+from .config import Config
+from .dialect import CSVDialect, detect_dialect
+from .exceptions import ProcessingError
+from .profiling import NULL_PROFILER
+from .writers import encode_rows
+
+
+class MergeInput:
+    """A CSV file to merge, with its dialect and header."""
+
+    def __init__(
+        self, path: str, dialect: Optional[CSVDialect] = None, header: Optional[List[str]] = None
+    ):
+        """
+        Initialize merge input.
+
+        Args:
+            path: Path to the CSV file
+            dialect: Format of the file; detected when None
+            header: Header row; read from the file when None
+
+        Raises:
+            StopIteration: If the file has no header row
+        """
+        self.path = path
+        self.dialect = dialect or detect_dialect(path)
+        self.header = header if header is not None else read_header(path, self.dialect)
+
+
+def merged_header(headers: Sequence[List[str]]) -> List[str]:
+    """Union of the given headers, in order of first appearance."""
+    seen = set()
+    union = []
+    for header in headers:
+        for name in header:
+            if name not in seen:
+                seen.add(name)
+                union.append(name)
+    return union
+
+
+def _projector(header: List[str], output_header: List[str]) -> Callable[[List[str]], List[str]]:
+    """Build a function laying out a row of header as output_header, padding missing columns."""
+    positions = {}
+    for i, name in enumerate(header):
+        positions.setdefault(name, i)
+    # Columns the input lacks read from a padding field just past its end
+    pad_index = len(header)
+    indices = [positions.get(name, pad_index) for name in output_header]
+    if indices == list(range(len(header))):
+        return lambda row: row
+    padding = [""] * (max(indices) + 1)
+    getter = itemgetter(*indices)
+    single = len(indices) == 1
+
+    def project(row: List[str]) -> List[str]:
+        if len(row) <= pad_index:
+            row = row + padding[len(row):]
+        values = getter(row)
+        return [values] if single else list(values)
+    return project
+
+
+class CSVMerger:
+    """Writes a set of CSV files as one file with a common header."""
+
+    def __init__(
+        self,
+        output_header: List[str],
+        sort_key: Optional[Callable[[Sequence[str]], Tuple]] = None,
+        parser_backend: str = Config.DEFAULT_PARSER_BACKEND,
+        profiler=NULL_PROFILER,
+        on_rows: Optional[Callable[[int], None]] = None,
+        temp_dir: Optional[str] = Config.SPILL_TEMP_DIR
+    ):
+        """
+        Initialize merger.
+
+        Args:
+            output_header: Header of the merged file
+            sort_key: Key of the sort order shared by all inputs; the inputs
+                are concatenated in order when None
+            parser_backend: Parser backend name used to read the inputs
+            profiler: Phase profiler recording parse, projection and write time
+            on_rows: Optional callback with the running row count after each block
+            temp_dir: Directory for intermediate merge files; the system default when None
+        """
+        self.output_header = output_header
+        self.sort_key = sort_key
+        self.parser_backend = parser_backend
+        self.profiler = profiler
+        self.on_rows = on_rows
+        self.temp_dir = temp_dir
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.peak_open_files = 0
+        self._temp_dir_path: Optional[str] = None
+        self._temp_count = 0
+
+    def merge(self, inputs: List[MergeInput], output_path: str) -> None:
+        """
+        Write inputs to output_path, concatenated or heap-merged.
+
+        Raises:
+            ProcessingError: If an input of a sorted merge is out of order
+        """
+        try:
+            if self.sort_key is None:
+                self.peak_open_files = 2
+                batches = self._concat_batches(inputs)
+            else:
+                fan_in = max(2, Config.MERGE_FAN_IN)
+                while len(inputs) > fan_in:
+                    inputs = [
+                        self._merge_to_temp(inputs[start:start + fan_in])
+                        for start in range(0, len(inputs), fan_in)
+                    ]
+                batches = self._merged_batches(inputs)
+            self.rows_written, self.bytes_written = self._write(output_path, batches, self.on_rows)
+        finally:
+            if self._temp_dir_path is not None:
+                shutil.rmtree(self._temp_dir_path, ignore_errors=True)
+                self._temp_dir_path = None
+
+    def _read_batches(self, source: MergeInput, batch_size: int) -> Iterator[List[List[str]]]:
+        """Stream batches of an input's rows laid out as the output header."""
+        profiler = self.profiler
+        with profiler.phase("open"):
+            backend = select_backend(
+                self.parser_backend, os.path.getsize(source.path), source.dialect
+            )
+            _, batches = backend.read_batches(source.path, source.dialect, batch_size)
+        project = _projector(source.header, self.output_header)
+        while True:
+            with profiler.phase("parse"):
+                batch = next(batches, None)
+            if batch is None:
+                return
+            with profiler.phase("projection"):
+                yield list(map(project, batch))
+
+    def _concat_batches(self, inputs: List[MergeInput]) -> Iterator[List[List[str]]]:
+        for source in inputs:
+            yield from self._read_batches(source, Config.PARSE_BATCH_SIZE)
+
+    def _keyed_rows(self, source: MergeInput) -> Iterator[Tuple[Tuple, List[str]]]:
+        """Yield (sort key, row) pairs of an input, checking that it is sorted."""
+        sort_key = self.sort_key
+        previous = None
+        line = 0
+        for batch in self._read_batches(source, Config.MERGE_READ_BATCH_ROWS):
+            for row in batch:
+                key = sort_key(row)
+                line += 1
+                if previous is not None and key < previous:
+                    raise ProcessingError(
+                        f"{source.path} is not sorted by the merge columns at data row {line}"
+                    )
+                previous = key
+                yield key, row
+
+    def _merged_batches(self, inputs: List[MergeInput]) -> Iterator[List[List[str]]]:
+        """Heap-merge the inputs; rows with equal keys keep the order of the inputs."""
+        self.peak_open_files = max(self.peak_open_files, len(inputs) + 1)
+        merged = heapq.merge(*(self._keyed_rows(source) for source in inputs), key=itemgetter(0))
+        block_rows = Config.WRITE_BLOCK_ROWS
+        while True:
+            block = []
+            for _, row in merged:
+                block.append(row)
+                if len(block) >= block_rows:
+                    break
+            if not block:
+                return
+            yield block
+
+    def _merge_to_temp(self, inputs: List[MergeInput]) -> MergeInput:
+        """Merge a group of inputs into an intermediate file in the output layout."""
+        if len(inputs) == 1:
+            return inputs[0]
+        if self._temp_dir_path is None:
+            self._temp_dir_path = tempfile.mkdtemp(prefix="csv-merge-", dir=self.temp_dir)
+        self._temp_count += 1
+        path = os.path.join(
+            self._temp_dir_path, f"merge{self._temp_count:06d}{Config.CSV_EXTENSION}"
+        )
+        self._write(path, self._merged_batches(inputs), None)
+        for source in inputs:
+            if os.path.dirname(source.path) == self._temp_dir_path:
+                os.unlink(source.path)
+        return MergeInput(path, CSVDialect(), self.output_header)
+
+    def _write(
+        self,
+        path: str,
+        batches: Iterator[List[List[str]]],
+        on_rows: Optional[Callable[[int], None]]
+    ) -> Tuple[int, int]:
+        """
+        Write the header and every batch to path through a large buffer.
+
+        Returns:
+            Data rows and bytes written
+        """
+        profiler = self.profiler
+        rows = 0
+        size = 0
+        with open(path, 'wb', buffering=Config.MERGE_WRITE_BUFFER_SIZE) as f:
+            with profiler.phase("encoding"):
+                data = encode_rows([self.output_header])
+            with profiler.phase("write"):
+                f.write(data)
+            size += len(data)
+            for batch in batches:
+                with profiler.phase("encoding"):
+                    data = encode_rows(batch)
+                with profiler.phase("write"):
+                    f.write(data)
+                size += len(data)
+                rows += len(batch)
+                if on_rows:
+                    on_rows(rows)
+            with profiler.phase("close"):
+                f.flush()
+        return rows, size
@@ -0,0 +1,277 @@
+"""
+Processing metrics with an OpenMetrics/Prometheus text-file exporter.
+
+ProcessingMetrics accumulates counters and histograms across runs of a
+CSVProcessor. TextfileExporter writes them atomically in the Prometheus
+text format on a timer, for a node-exporter textfile collector to pick up.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .exceptions import FileOperationError
+
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class for a metric family with optional labels."""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.metric_type}']
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    metric_type = 'counter'
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.label_names:
+            items = [((), 0)]
+        return [
+            f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}'
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can be set to anything."""
+
+    metric_type = 'gauge'
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    metric_type = 'histogram'
+
+    def __init__(
+        self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str] = ()
+    ):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            counts, total, count = self._series.get(
+                label_values, ([0] * (len(self.buckets) + 1), 0.0, 0)
+            )
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[label_values] = (counts, total + value, count + 1)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total, count))
+                           for labels, (counts, total, count) in self._series.items())
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                bucket_labels = _format_labels(self.label_names, labels, le)
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            series_labels = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{series_labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{series_labels} {count}')
+        return lines
+
+
+class ProcessingMetrics:
+    """Counters and histograms describing CSVProcessor runs."""
+
+    PREFIX = 'csv_processor'
+    PHASE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+    RUN_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+
+    def __init__(self):
+        p = self.PREFIX
+        self.runs = Counter(f'{p}_runs_total', 'Processing runs by outcome.', ('status',))
+        self.rows_processed = Counter(
+            f'{p}_rows_processed_total', 'Data rows read from source files.'
+        )
+        self.bytes_read = Counter(f'{p}_bytes_read_total', 'Bytes read from source files.')
+        self.bytes_written = Counter(
+            f'{p}_bytes_written_total', 'Bytes written to output partitions.'
+        )
+        self.partitions_created = Counter(
+            f'{p}_partitions_created_total', 'Output partitions created.'
+        )
+        self.errors = Counter(f'{p}_errors_total', 'Failed runs by exception type.', ('type',))
+        self.phase_seconds = Histogram(
+            f'{p}_phase_duration_seconds', 'Wall time per processing phase per run.',
+            self.PHASE_BUCKETS, ('phase',)
+        )
+        self.run_seconds = Histogram(
+            f'{p}_run_duration_seconds', 'Wall time per run.', self.RUN_BUCKETS
+        )
+        self.last_rows_per_second = Gauge(
+            f'{p}_last_run_rows_per_second', 'Throughput of the last successful run.'
+        )
+        self.last_success = Gauge(
+            f'{p}_last_success_timestamp_seconds', 'Unix time of the last successful run.'
+        )
+        self._metrics: List[_Metric] = [
+            self.runs, self.rows_processed, self.bytes_read, self.bytes_written,
+            self.partitions_created, self.errors, self.phase_seconds, self.run_seconds,
+            self.last_rows_per_second, self.last_success,
+        ]
+
+    def record_result(
+        self, result, phase_timings: Optional[Dict[str, Dict[str, float]]] = None
+    ) -> None:
+        """
+        Record a finished run.
+
+        Args:
+            result: ProcessingResult of the run
+            phase_timings: Optional PhaseProfiler report for the run
+        """
+        self.runs.inc(1, 'success' if result.success else 'failure')
+        self.rows_processed.inc(result.total_rows)
+        self.bytes_read.inc(result.bytes_read)
+        self.bytes_written.inc(result.bytes_written)
+        self.partitions_created.inc(result.files_created)
+        if result.wall_time:
+            self.run_seconds.observe(result.wall_time)
+        if result.success:
+            self.last_rows_per_second.set(result.rows_per_second)
+            self.last_success.set(time.time())
+        for phase, timing in (phase_timings or {}).items():
+            if timing['calls']:
+                self.phase_seconds.observe(timing['wall_s'], phase)
+
+    def record_error(self, error_type: str) -> None:
+        """Count a failed run by exception type name."""
+        self.errors.inc(1, error_type)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class TextfileExporter:
+    """Writes ProcessingMetrics to a .prom file atomically, on a timer."""
+
+    def __init__(
+        self,
+        metrics: ProcessingMetrics,
+        path: str,
+        interval: float = Config.METRICS_EXPORT_INTERVAL
+    ):
+        """
+        Initialize text-file exporter.
+
+        Args:
+            metrics: Metrics to export
+            path: Target file, normally ending in .prom inside the collector directory
+            interval: Seconds between writes while started
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        """Write the current metrics, replacing the file atomically."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        # The collector only reads *.prom files, so the temporary name is ignored
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.metrics.render())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            raise FileOperationError(f"Error writing metrics file {self.path}: {str(e)}")
+
+    def start(self) -> 'TextfileExporter':
+        """Start writing in a background thread every interval seconds."""
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='metrics-exporter', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background thread and write a final snapshot."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.write()
+            except FileOperationError as e:
+                # Keep exporting; the next tick may succeed (e.g. disk full)
+                logging.getLogger(__name__).warning(str(e))
+
+    def __enter__(self) -> 'TextfileExporter':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
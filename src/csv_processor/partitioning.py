@@ -0,0 +1,169 @@
+"""
+Partitioning schemes mapping split keys to output partitions.
+"""
+
+import os
+import zlib
+from typing import Dict, List, Sequence, Set, Tuple
+
+from .exceptions import FileOperationError
+
+
+OUTPUT_LAYOUTS: Tuple[str, ...] = ("flat", "hive")
+
+# Separates key values before hashing so ("a", "bc") and ("ab", "c") differ
+_KEY_SEPARATOR = "\x1f"
+
+# Directory name of empty values, as written by Hive and Spark
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Characters Hive percent-encodes in partition paths, plus those Windows rejects
+_HIVE_ESCAPED = frozenset('"#%\'*/:=?\\\x7f{[]^<>|') | frozenset(chr(code) for code in range(0x20))
+
+
+def stable_bucket(split_key: Sequence[str], buckets: int) -> int:
+    """
+    Assign a split key to one of a fixed number of buckets.
+
+    The hash is CRC-32 of the UTF-8 key values, so the same key lands in
+    the same bucket in every process and on every platform (unlike hash(),
+    which is salted per process).
+
+    Args:
+        split_key: Split field values of a row
+        buckets: Number of buckets
+
+    Returns:
+        Bucket number in range(buckets)
+    """
+    data = _KEY_SEPARATOR.join(split_key).encode("utf-8", "surrogatepass")
+    return zlib.crc32(data) % buckets
+
+
+class KeyBucketer:
+    """Maps split keys to bucket partition keys, remembering every key seen."""
+
+    def __init__(self, buckets: int):
+        """
+        Initialize bucketer.
+
+        Args:
+            buckets: Number of buckets
+        """
+        self.buckets = buckets
+        self.width = len(str(buckets - 1))
+        self._partition_keys = [(str(bucket),) for bucket in range(buckets)]
+        self._assigned: Dict[Tuple, Tuple[str]] = {}
+
+    def map_keys(self, keys: List[Tuple]) -> List[Tuple[str]]:
+        """Replace each split key of a batch with its bucket's partition key."""
+        assigned = self._assigned
+        result = []
+        for split_key in keys:
+            partition_key = assigned.get(split_key)
+            if partition_key is None:
+                bucket = stable_bucket(split_key, self.buckets)
+                partition_key = assigned[split_key] = self._partition_keys[bucket]
+            result.append(partition_key)
+        return result
+
+    def partition_keys(self) -> List[Tuple[str]]:
+        """Partition keys of all buckets, in bucket order."""
+        return list(self._partition_keys)
+
+    def key_counts(self) -> Dict[int, int]:
+        """Number of distinct split keys assigned to each bucket."""
+        counts = dict.fromkeys(range(self.buckets), 0)
+        for (bucket,) in self._assigned.values():
+            counts[int(bucket)] += 1
+        return counts
+
+    def filename(self, bucket: str, source_stem: str, extension: str) -> str:
+        """Output filename of a bucket, e.g. bucket-07_sales.csv with 16 buckets."""
+        return f"bucket-{int(bucket):0{self.width}d}_{source_stem}{extension}"
+
+
+def hive_escape(value: str) -> str:
+    """
+    Encode a field name or value as one Hive partition path component.
+
+    Reserved characters are percent-encoded as in Hive, including "%"
+    itself, so distinct values always give distinct components and Hive
+    or Spark decode them back to the original value. Empty values map to
+    HIVE_DEFAULT_PARTITION, and a trailing dot or space is encoded too, so
+    no component is ".", ".." or altered by Windows.
+    """
+    if not value:
+        return HIVE_DEFAULT_PARTITION
+    if value == HIVE_DEFAULT_PARTITION:
+        return "%5F" + value[1:]
+    escaped = "".join(f"%{ord(c):02X}" if c in _HIVE_ESCAPED else c for c in value)
+    if escaped[-1] in ". ":
+        escaped = f"{escaped[:-1]}%{ord(escaped[-1]):02X}"
+    return escaped
+
+
+class HiveLayout:
+    """
+    Maps split keys to nested field=value directories, creating each directory once.
+
+    Values that differ only in case, such as North and north, get distinct
+    directories on case-sensitive file systems but share one on Windows and
+    macOS, where their rows would be read back under the wrong value. Such
+    a clash is detected when the second directory is created and raises
+    FileOperationError.
+    """
+
+    def __init__(self, output_dir: str, fields: Sequence[str], filename: str):
+        """
+        Initialize Hive layout.
+
+        Args:
+            output_dir: Root directory of the partition tree
+            fields: Field name of each split key value, outermost first
+            filename: Name of the file written in each partition directory
+        """
+        self.output_dir = output_dir
+        self.filename = filename
+        self._prefixes = [hive_escape(field) + "=" for field in fields]
+        self._created: Set[str] = set()
+        # First directory created for each case-folded directory path
+        self._folded: Dict[str, str] = {}
+
+    @property
+    def directories_created(self) -> int:
+        return len(self._created)
+
+    def directory(self, split_key: Sequence[str]) -> str:
+        """Partition directory of a key, e.g. output/REGION=North/YEAR=2024."""
+        return os.path.join(self.output_dir, *(
+            prefix + hive_escape(str(value)) for prefix, value in zip(self._prefixes, split_key)
+        ))
+
+    def path_for(self, split_key: Sequence[str]) -> str:
+        """
+        Output file path of a key, creating its directory on first use.
+
+        Raises:
+            FileOperationError: If the directory is the same as that of a
+                value differing only in case
+        """
+        directory = self.directory(split_key)
+        if directory not in self._created:
+            os.makedirs(directory, exist_ok=True)
+            self._check_case(directory)
+            self._created.add(directory)
+        return os.path.join(directory, self.filename)
+
+    def _check_case(self, directory: str) -> None:
+        """Compare each level of a new directory with earlier ones equal to it but for case."""
+        parts = os.path.relpath(directory, self.output_dir).split(os.sep)
+        path = self.output_dir
+        for part in parts:
+            path = os.path.join(path, part)
+            first = self._folded.setdefault(path.casefold(), path)
+            if first != path and os.path.samefile(first, path):
+                raise FileOperationError(
+                    f"Partition directories {first} and {path} differ only in case and are "
+                    f"the same directory on this file system"
+                )
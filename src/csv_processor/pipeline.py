@@ -0,0 +1,217 @@
+"""
+Pipelined split execution with dedicated writer threads.
+
+The reader stage parses, projects and routes rows on the calling thread
+and hands per-writer batches to writer threads through bounded queues.
+Each writer thread owns a disjoint set of partitions (chosen by key
+hash) and does all encoding and file I/O for them, so parsing continues
+while writes wait on a slow disk, and every key's rows are still written
+in source order.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .config import Config
+from .exceptions import FileOperationError
+from .writers import PartitionFileWriter
+
+
+RoutedBatch = Tuple[List[Tuple], List[Sequence[str]]]
+
+_STOP = object()
+# Sent instead of _STOP when the reader stage failed
+_ABORT = object()
+
+
+class StageStats:
+    """Busy and waiting time of one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.busy = 0.0
+        self.waiting = 0.0
+        self.batches = 0
+
+    @property
+    def utilization(self) -> float:
+        """Share of the stage's lifetime spent working."""
+        total = self.busy + self.waiting
+        return self.busy / total if total > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for reporting."""
+        return {
+            'busy_s': self.busy,
+            'waiting_s': self.waiting,
+            'batches': self.batches,
+            'utilization': self.utilization,
+        }
+
+
+class _WriterThread(threading.Thread):
+    """Consumes routed batches and appends them to the partitions it owns."""
+
+    def __init__(self, index: int, writer: PartitionFileWriter, queue_size: int):
+        super().__init__(name=f"csv-writer-{index}", daemon=True)
+        self.writer = writer
+        self.queue: 'queue.Queue[Any]' = queue.Queue(maxsize=queue_size)
+        self.stats = StageStats(f"writer-{index}")
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        stats = self.stats
+        aborted = False
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                item = self.queue.get()
+                work_start = time.perf_counter()
+                stats.waiting += work_start - wait_start
+                if item is _STOP:
+                    break
+                if item is _ABORT:
+                    aborted = True
+                    break
+                if self.error is not None:
+                    # Keep draining so the reader never blocks on a dead writer
+                    continue
+                try:
+                    for split_key, rows in item.items():
+                        self.writer.append(split_key, rows)
+                except BaseException as e:
+                    self.error = e
+                stats.batches += 1
+                stats.busy += time.perf_counter() - work_start
+        finally:
+            try:
+                if aborted or self.error is not None:
+                    # Finishing the output of a failed run would only waste time on partial files
+                    self.writer.abort()
+                else:
+                    self.writer.close_all()
+            except BaseException as e:
+                if self.error is None:
+                    self.error = e
+
+
+class PipelinedSplitter:
+    """Runs the reader stage on the calling thread and writes on writer threads."""
+
+    def __init__(
+        self,
+        writer_count: int,
+        make_writer: Callable[[int], PartitionFileWriter],
+        queue_size: int = Config.PIPELINE_QUEUE_SIZE,
+        on_new_key: Optional[Callable[[Tuple], None]] = None
+    ):
+        """
+        Initialize pipelined splitter.
+
+        Args:
+            writer_count: Number of writer threads
+            make_writer: Function building the partition writer owned by
+                the writer thread with the given index
+            queue_size: Batches each writer queue holds before the reader blocks
+            on_new_key: Optional callback on the reader thread with every key
+                in order of first appearance, before its rows reach a writer
+        """
+        self.writer_count = max(1, writer_count)
+        self.make_writer = make_writer
+        self.queue_size = queue_size
+        self.on_new_key = on_new_key
+        self.reader_stats = StageStats("reader")
+        self.writers: List[PartitionFileWriter] = []
+        self._threads: List[_WriterThread] = []
+
+    @property
+    def stage_stats(self) -> List[StageStats]:
+        return [self.reader_stats] + [thread.stats for thread in self._threads]
+
+    def run(self, batches: Iterator[RoutedBatch]) -> List[PartitionFileWriter]:
+        """
+        Route every batch to its writer threads and wait for them to finish.
+
+        Args:
+            batches: Iterator of (keys, rows) batches from the reader stage
+
+        Returns:
+            The partition writers, one per writer thread
+
+        Raises:
+            FileOperationError: If a writer thread failed
+            Any exception raised by the reader stage
+        """
+        count = self.writer_count
+        self._threads = [
+            _WriterThread(index, self.make_writer(index), self.queue_size) for index in range(count)
+        ]
+        self.writers = [thread.writer for thread in self._threads]
+        for thread in self._threads:
+            thread.start()
+
+        stats = self.reader_stats
+        on_new_key = self.on_new_key
+        seen: Set[Tuple] = set()
+        run_start = time.perf_counter()
+        completed = False
+        try:
+            for keys, rows in batches:
+                routed: List[Dict[Tuple, List[Sequence[str]]]] = [{} for _ in range(count)]
+                if count == 1:
+                    groups = routed[0]
+                    for split_key, row in zip(keys, rows):
+                        group = groups.get(split_key)
+                        if group is None:
+                            group = groups[split_key] = []
+                            if on_new_key is not None and split_key not in seen:
+                                seen.add(split_key)
+                                on_new_key(split_key)
+                        group.append(row)
+                else:
+                    for split_key, row in zip(keys, rows):
+                        groups = routed[hash(split_key) % count]
+                        group = groups.get(split_key)
+                        if group is None:
+                            group = groups[split_key] = []
+                            if on_new_key is not None and split_key not in seen:
+                                seen.add(split_key)
+                                on_new_key(split_key)
+                        group.append(row)
+
+                put_start = time.perf_counter()
+                for thread, groups in zip(self._threads, routed):
+                    if groups:
+                        thread.queue.put(groups)
+                stats.waiting += time.perf_counter() - put_start
+                stats.batches += 1
+                self._raise_writer_error()
+            completed = True
+        finally:
+            for thread in self._threads:
+                thread.queue.put(_STOP if completed else _ABORT)
+            stop_start = time.perf_counter()
+            for thread in self._threads:
+                thread.join()
+            stats.waiting += time.perf_counter() - stop_start
+            stats.busy = time.perf_counter() - run_start - stats.waiting
+
+        self._raise_writer_error()
+        return self.writers
+
+    def _raise_writer_error(self) -> None:
+        for thread in self._threads:
+            if thread.error is not None:
+                raise FileOperationError(
+                    f"Error writing output file: {str(thread.error)}"
+                ) from thread.error
+
+    def format_stats(self) -> str:
+        """Format per-stage busy time for logging."""
+        return ", ".join(
+            f"{stage.name} busy {stage.busy:.2f}s / waiting {stage.waiting:.2f}s "
+            f"({stage.utilization:.0%})"
+            for stage in self.stage_stats
+        )
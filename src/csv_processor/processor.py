@@ -3,175 +3,1721 @@ CSV processing logic for splitting files based on field values.
 """
 
 import csv
+import json
 import os
 import logging
-from typing import List, Dict, Tuple, Any, Optional, Callable
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from operator import itemgetter
+from typing import List, Dict, Tuple, Any, Optional, Callable, Sequence, Iterator, Set, Union
 from pathlib import Path
 
+from .archive_sink import ArchiveSink, archive_format_for, validate_archive_options
+from .backends import ParserBackend, read_header, select_backend
+from .chunking import ChunkPlanner, ChunkRange, copy_chunks
 from .config import Config
-from .exceptions import ProcessingError, FileOperationError, ValidationError
+from .dedupe import DedupePolicy, Deduplicator, estimate_row_count
+from .dialect import CSVDialect, detect_dialect
+from .enrichment import Enricher, LookupJoin
+from .exceptions import CSVProcessorException, ProcessingError, FileOperationError, ValidationError
+from .ingest_cache import IngestCache
+from .logger import ProgressAggregator
+from .memory import MemoryGovernor, estimate_rows_bytes
+from .merging import CSVMerger, MergeInput, merged_header
+from .metrics import ProcessingMetrics
+from .partitioning import OUTPUT_LAYOUTS, HiveLayout, KeyBucketer, hive_escape
+from .pipeline import PipelinedSplitter
+from .profiling import NULL_PROFILER, PhaseProfiler, ProcessingHooks
+from .resources import ResourceSampler
+from .sorting import SortColumn, SortingWriter, build_sort_key, normalize_sort_columns
+from .sqlite_sink import SQLiteSink
+from .streams import StreamSource
+from .writers import PartitionFileWriter, PartitionInfo, RollingPolicy, UniquePaths
 
 
 class ProcessingResult:
     """Data class for processing results."""
     
-    def __init__(self, success: bool, files_created: int = 0, total_rows: int = 0, error: Optional[str] = None):
+    def __init__(
+        self,
+        success: bool,
+        files_created: int = 0,
+        total_rows: int = 0,
+        error: Optional[str] = None,
+        bytes_read: int = 0,
+        bytes_written: int = 0,
+        wall_time: float = 0.0,
+        rss_growth: Optional[int] = None,
+        max_open_fds: Optional[int] = None,
+        engine: Optional[str] = None,
+        partitions: Optional[List[PartitionInfo]] = None,
+        stages: Optional[Dict[str, Dict[str, Any]]] = None,
+        bucket_keys: Optional[Dict[int, int]] = None,
+        duplicates_removed: int = 0,
+        unmatched_rows: int = 0,
+        memory_strategy: Optional[str] = None
+    ):
         self.success = success
         self.files_created = files_created
         self.total_rows = total_rows
         self.error = error
+        self.bytes_read = bytes_read
+        self.bytes_written = bytes_written
+        self.wall_time = wall_time
+        # Resources the run added to the process: largest sampled RSS growth,
+        # and most descriptors it held open at once
+        self.rss_growth = rss_growth
+        self.max_open_fds = max_open_fds
+        self.engine = engine
+        self.partitions = partitions if partitions is not None else []
+        self.stages = stages if stages is not None else {}
+        self.bucket_keys = bucket_keys if bucket_keys is not None else {}
+        self.duplicates_removed = duplicates_removed
+        self.unmatched_rows = unmatched_rows
+        self.memory_strategy = memory_strategy
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for backward compatibility."""
-        return {
+    @property
+    def rows_per_second(self) -> float:
+        """Rows processed per second of wall time."""
+        return self.total_rows / self.wall_time if self.wall_time > 0 else 0.0
+    
+    def to_dict(self, include_partitions: bool = True) -> Dict[str, Any]:
+        """
+        Convert to dictionary for backward compatibility and reporting.
+        
+        Args:
+            include_partitions: Whether to include the per-partition table
+        """
+        result = {
             'success': self.success,
             'files_created': self.files_created,
             'total_rows': self.total_rows,
-            'error': self.error
+            'error': self.error,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'wall_time': self.wall_time,
+            'rows_per_second': self.rows_per_second,
+            'rss_growth': self.rss_growth,
+            'max_open_fds': self.max_open_fds,
+            'engine': self.engine,
+            'stages': self.stages,
+            'bucket_keys': {str(bucket): count for bucket, count in self.bucket_keys.items()},
+            'duplicates_removed': self.duplicates_removed,
+            'unmatched_rows': self.unmatched_rows,
+            'memory_strategy': self.memory_strategy,
         }
+        if include_partitions:
+            result['partitions'] = [partition.to_dict() for partition in self.partitions]
+        return result
+
+
+class PartitionIterator:
+    """
+    Rows of a source with split keys and projection applied, read lazily.
+    
+    Iterating yields (split key, row) pairs, or (split key, rows) groups
+    when grouped. result counts the rows read so far and is complete
+    once iteration ends.
+    """
+    
+    def __init__(
+        self, header: List[str], items: Iterator[Tuple[Tuple, Any]], result: 'ProcessingResult'
+    ):
+        self.header = header
+        self.result = result
+        self._items = items
+    
+    def __iter__(self) -> Iterator[Tuple[Tuple, Any]]:
+        return self._items
+    
+    def __next__(self) -> Tuple[Tuple, Any]:
+        return next(self._items)
+    
+    def close(self) -> None:
+        """Stop reading and release the source file."""
+        self._items.close()
+    
+    def __enter__(self) -> 'PartitionIterator':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _tuple_getter(indices: List[int]) -> Callable[[Sequence[str]], Tuple[str, ...]]:
+    """Return a fast function picking the given indices of a row as a tuple."""
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda row: (row[index],)
+    return itemgetter(*indices)
+
+
+def _root_error_type(error: BaseException) -> str:
+    """
+    Name the exception type that caused a failure.
+    
+    Errors raised while processing are re-wrapped in ProcessingError; the
+    innermost application exception in the chain is the one that matters.
+    """
+    root_type = type(error).__name__
+    current: Optional[BaseException] = error
+    while current is not None:
+        if isinstance(current, CSVProcessorException):
+            root_type = type(current).__name__
+        current = current.__context__
+    return root_type
 
 
 class CSVProcessor:
     """Handles CSV file processing and splitting operations."""
     
-    def __init__(self, progress_callback: Optional[Callable[[str], None]] = None):
+    def __init__(
+        self,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        parser_backend: str = Config.DEFAULT_PARSER_BACKEND,
+        profiler: Optional[PhaseProfiler] = None,
+        hooks: Optional[ProcessingHooks] = None,
+        metrics: Optional[ProcessingMetrics] = None,
+        writer_threads: int = Config.DEFAULT_WRITER_THREADS,
+        ingest_cache: Optional[IngestCache] = None,
+        max_memory: Optional[int] = None
+    ):
         """
         Initialize CSV processor.
         
         Args:
             progress_callback: Optional callback function for progress updates
+            parser_backend: Parser backend name ("csv", "pyarrow", "polars"),
+                or "auto" to choose one from file size and installed libraries
+            profiler: Optional PhaseProfiler; when given, per-phase timings are
+                recorded and logged after each run
+            hooks: Optional callbacks invoked per chunk, partition open and flush
+            metrics: Optional ProcessingMetrics sink updated after every run;
+                phase durations are recorded with an internal profiler
+                when no profiler is given
+            writer_threads: Number of dedicated writer threads. 0 groups all
+                rows in memory and writes each partition once parsing ends;
+                N > 0 streams batches to N writer threads through bounded
+                queues so parsing and writing overlap. Sorted splits always
+                stream, through at least one writer thread
+            ingest_cache: Optional IngestCache; the first split of a source
+                stores it as binary columns, and later splits of the same,
+                unchanged source read only the columns they use from there
+            max_memory: Optional budget in bytes for the memory a run adds
+                to the process. Estimates of the grouped rows, sort buffers
+                and dedupe state are checked every batch, and RSS growth
+                now and then; nearing the budget, in-memory grouping
+                switches to writing every batch as it is read, and then
+                sort buffers and dedupe state spill to disk.
+                result.memory_strategy names the last strategy used
         """
         self.logger = logging.getLogger(__name__)
         self.progress_callback = progress_callback
+        self.parser_backend = parser_backend
+        self.hooks = hooks or ProcessingHooks()
+        self.metrics = metrics
+        self.writer_threads = writer_threads
+        self.ingest_cache = ingest_cache
+        self.max_memory = max_memory
+        self._log_phase_timings = profiler is not None
+        if profiler is None and metrics is not None:
+            profiler = PhaseProfiler()
+        self.profiler = profiler or NULL_PROFILER
     
     def split_csv_by_fields(
         self, 
-        source_file: str, 
+        source_file: Union[str, StreamSource], 
         output_dir: str, 
         split_by_fields: List[str], 
-        included_fields: List[str]
+        included_fields: List[str],
+        run_report: bool = False,
+        manifest: bool = False,
+        buckets: Optional[int] = None,
+        max_rows_per_file: Optional[int] = None,
+        max_bytes_per_file: Optional[int] = None,
+        sort_by: Optional[Sequence[Union[str, SortColumn]]] = None,
+        sort_memory: int = Config.SORT_MEMORY_BUDGET,
+        dedupe: Union[bool, DedupePolicy] = False,
+        join: Optional[LookupJoin] = None,
+        layout: str = "flat"
     ) -> ProcessingResult:
         """
         Split CSV file based on split_by fields and include only specified fields.
         
         Args:
-            source_file: Path to the source CSV file
+            source_file: Path to the source CSV file, or a StreamSource
+                parsed as its data arrives (always with the csv backend
+                and without the ingest cache)
             output_dir: Directory where output files will be created
             split_by_fields: List of field names to split by
             included_fields: List of field names to include in output files
+            run_report: Write the run metrics as JSON to
+                Config.RUN_REPORT_FILENAME in output_dir
+            manifest: Write every partition's key, file, row count and size
+                to Config.MANIFEST_FILENAME in output_dir
+            buckets: Write exactly this many files, assigning each row to a
+                bucket by a stable hash of its split_by field values, instead
+                of one file per distinct value. All rows of a key share a
+                bucket; result.bucket_keys counts the keys in each bucket
+            max_rows_per_file: Roll each partition over to a new part file,
+                named <key>_<source>_part0001.csv and so on, every this many rows
+            max_bytes_per_file: Roll each partition over to a new part file
+                before it grows past this many bytes, header included
+            sort_by: Sort the rows of every partition by these included
+                fields, given as names (compared as strings) or SortColumn
+                objects with a numeric or date type and direction
+            sort_memory: Approximate bytes of rows held in memory while
+                sorting; beyond it sorted runs are spilled to temporary files
+                and merged at the end
+            dedupe: Drop repeated rows, keeping the first. True compares all
+                included fields exactly; a DedupePolicy selects the fields,
+                exact or approximate (Bloom filter) mode and the memory
+                budget. result.duplicates_removed counts the dropped rows
+            join: Enrich every row with columns of a lookup CSV, loaded once
+                into a hash index. Joined columns can be used as split,
+                included, sort and dedupe fields; result.unmatched_rows counts
+                the rows without a lookup entry
+            layout: "flat" writes every partition file to output_dir;
+                "hive" writes nested field=value directories, e.g.
+                REGION=North/YEAR=2024/<source>.csv, with reserved
+                characters in names and values percent-encoded
             
         Returns:
             ProcessingResult object containing operation results
         """
         try:
-            self._validate_inputs(source_file, output_dir, split_by_fields, included_fields)
-            return self._process_csv_file(source_file, output_dir, split_by_fields, included_fields)
+            self._validate_inputs(
+                source_file, output_dir, split_by_fields, included_fields, buckets
+            )
+            self._validate_layout(layout)
+            self._validate_limits(
+                ('Maximum rows per file', max_rows_per_file),
+                ('Maximum bytes per file', max_bytes_per_file)
+            )
+            bucketer, dedupe_policy = self._resolve_partitioning(included_fields, buckets, dedupe)
+            rolling = None
+            if max_rows_per_file is not None or max_bytes_per_file is not None:
+                rolling = RollingPolicy(max_rows_per_file, max_bytes_per_file)
+            sort_columns = self._validate_sort(sort_by, sort_memory, included_fields)
+            governor = self._memory_governor()
+            self.profiler.reset()
+            with self.profiler.capture():
+                result = self._process_csv_file(
+                    source_file, output_dir, split_by_fields, included_fields, bucketer, rolling,
+                    sort_columns, sort_memory, dedupe_policy, join, layout, governor
+                )
+            self._finish_run(
+                result, source_file, output_dir, split_by_fields, included_fields,
+                self._partition_fields(split_by_fields, bucketer), run_report, manifest
+            )
+            return result
         
         except (ValidationError, ProcessingError, FileOperationError) as e:
             self.logger.error(f"CSV processing failed: {e}")
-            return ProcessingResult(success=False, error=str(e))
+            return self._failed_result(e, str(e))
         except Exception as e:
             self.logger.error(f"Unexpected error during CSV processing: {e}")
-            return ProcessingResult(success=False, error=f"Unexpected error: {str(e)}")
+            return self._failed_result(e, f"Unexpected error: {str(e)}")
+    
+    def iter_partitions(
+        self,
+        source_file: Union[str, StreamSource],
+        split_by_fields: List[str],
+        included_fields: List[str],
+        grouped: bool = False,
+        buckets: Optional[int] = None,
+        dedupe: Union[bool, DedupePolicy] = False,
+        join: Optional[LookupJoin] = None
+    ) -> PartitionIterator:
+        """
+        Split a CSV file lazily, handing rows to the caller instead of writing files.
+        
+        The source is opened and its header validated at once; rows are
+        then parsed a batch at a time as the iterator is consumed.
+        
+        Args:
+            source_file: Path to the source CSV file, or a StreamSource
+            split_by_fields: List of field names to split by
+            included_fields: List of field names in every yielded row
+            grouped: Yield (split key, rows) for the rows of each key
+                within a parsed batch, instead of one (split key, row)
+                pair per row; a key appears in many groups over a file
+            buckets: Yield bucket partition keys, as split_csv_by_fields does
+            dedupe: Leave out repeated rows, as split_csv_by_fields does
+            join: Enrich rows from a lookup CSV, as split_csv_by_fields does
+            
+        Returns:
+            PartitionIterator with the output header and the result metrics
+            
+        Raises:
+            ValidationError: If the inputs are invalid or fields are missing
+            FileOperationError: If the source file cannot be read
+            ProcessingError: If the source file cannot be parsed
+        """
+        self._validate_source(source_file)
+        self._validate_fields(split_by_fields, included_fields, buckets)
+        bucketer, dedupe_policy = self._resolve_partitioning(included_fields, buckets, dedupe)
+        governor = self._memory_governor()
+        self.profiler.reset()
+        return self._open_partitions(
+            source_file, split_by_fields, included_fields, grouped, bucketer, dedupe_policy, join,
+            governor, record_metrics=True
+        )
+    
+    def _open_partitions(
+        self,
+        source_file: Union[str, StreamSource],
+        split_by_fields: List[str],
+        included_fields: List[str],
+        grouped: bool,
+        bucketer: Optional[KeyBucketer] = None,
+        dedupe_policy: Optional[DedupePolicy] = None,
+        join: Optional[LookupJoin] = None,
+        governor: Optional[MemoryGovernor] = None,
+        record_metrics: bool = False
+    ) -> PartitionIterator:
+        """Open the source and return its keyed rows, read lazily."""
+        start_time = time.perf_counter()
+        # Sampled with every batch, since the caller decides how long iteration takes
+        sampler = ResourceSampler()
+        result = ProcessingResult(success=True)
+        with self._reading(source_file):
+            header, batches = self._read_source(
+                source_file, split_by_fields, included_fields, result, bucketer, dedupe_policy,
+                join, governor
+            )
+        items = self._iter_partition_items(
+            source_file, batches, grouped, result, start_time, sampler, record_metrics
+        )
+        return PartitionIterator(header, items, result)
+    
+    def _iter_partition_items(
+        self,
+        source_file: Union[str, StreamSource],
+        batches: Iterator[Tuple[List[Tuple], List[Sequence[str]]]],
+        grouped: bool,
+        result: ProcessingResult,
+        start_time: float,
+        sampler: ResourceSampler,
+        record_metrics: bool
+    ) -> Iterator[Tuple[Tuple, Any]]:
+        """Yield keyed rows or per-batch groups, then complete the result."""
+        profiler = self.profiler
+        try:
+            with self._reading(source_file):
+                for keys, new_rows in batches:
+                    sampler.sample()
+                    if not grouped:
+                        yield from zip(keys, new_rows)
+                        continue
+                    groups: Dict[Tuple, List[Sequence[str]]] = {}
+                    with profiler.phase("routing"):
+                        for split_key, new_row in zip(keys, new_rows):
+                            group = groups.get(split_key)
+                            if group is None:
+                                group = groups[split_key] = []
+                            group.append(new_row)
+                    yield from groups.items()
+        except csv.Error as e:
+            raise ProcessingError(f"Error parsing CSV file: {str(e)}")
+        finally:
+            batches.close()
+        
+        if isinstance(source_file, StreamSource):
+            result.bytes_read = source_file.bytes_read
+        else:
+            result.bytes_read = os.path.getsize(source_file)
+        result.wall_time = time.perf_counter() - start_time
+        self._record_resources(result, sampler)
+        if record_metrics and self.metrics is not None:
+            self.metrics.record_result(result, self.profiler.report())
+    
+    def split_csv_to_sqlite(
+        self,
+        source_file: Union[str, StreamSource],
+        database: str,
+        split_by_fields: List[str],
+        included_fields: List[str],
+        table: str = Config.SQLITE_TABLE_NAME,
+        table_per_key: bool = False,
+        index_fields: Optional[List[str]] = None,
+        buckets: Optional[int] = None,
+        dedupe: Union[bool, DedupePolicy] = False,
+        join: Optional[LookupJoin] = None
+    ) -> ProcessingResult:
+        """
+        Split a CSV file into a SQLite database instead of separate files.
+        
+        Args:
+            source_file: Path to the source CSV file, or a StreamSource
+            database: Path of the SQLite database to write; an existing file
+                is replaced when the load completes
+            split_by_fields: List of field names to split by
+            included_fields: List of field names stored for every row
+            table: Table holding all rows, with the split fields as indexed
+                leading columns; with table_per_key, the prefix of the
+                per-key table names
+            table_per_key: Create one table per split key instead, listed
+                with its row count in the <table>_partitions table
+            index_fields: Included fields indexed after the load
+            buckets: Partition by bucket, as split_csv_by_fields does
+            dedupe: Leave out repeated rows, as split_csv_by_fields does
+            join: Enrich rows from a lookup CSV, as split_csv_by_fields does
+            
+        Returns:
+            ProcessingResult object containing operation results; every
+            partition's path is the name of the table holding its rows
+        """
+        try:
+            self._validate_source(source_file)
+            if not database:
+                raise ValidationError("Output database is not specified")
+            self._validate_fields(split_by_fields, included_fields, buckets)
+            bucketer, dedupe_policy = self._resolve_partitioning(included_fields, buckets, dedupe)
+            governor = self._memory_governor()
+            self.profiler.reset()
+            with self.profiler.capture():
+                result = self._process_sqlite(
+                    source_file, database, split_by_fields, included_fields, table, table_per_key,
+                    index_fields, bucketer, dedupe_policy, join, governor
+                )
+            self._finish_run(
+                result, source_file, os.path.dirname(os.path.abspath(database)), split_by_fields,
+                included_fields, self._partition_fields(split_by_fields, bucketer), False, False
+            )
+            return result
+        
+        except (ValidationError, ProcessingError, FileOperationError) as e:
+            self.logger.error(f"SQLite split failed: {e}")
+            return self._failed_result(e, str(e))
+        except Exception as e:
+            self.logger.error(f"Unexpected error during SQLite split: {e}")
+            return self._failed_result(e, f"Unexpected error: {str(e)}")
+    
+    def _process_sqlite(
+        self,
+        source_file: Union[str, StreamSource],
+        database: str,
+        split_by_fields: List[str],
+        included_fields: List[str],
+        table: str,
+        table_per_key: bool,
+        index_fields: Optional[List[str]],
+        bucketer: Optional[KeyBucketer],
+        dedupe_policy: Optional[DedupePolicy],
+        join: Optional[LookupJoin],
+        governor: Optional[MemoryGovernor] = None
+    ) -> ProcessingResult:
+        """Load the keyed rows of the source into the database in batches."""
+        sampler = ResourceSampler().start()
+        try:
+            start_time = time.perf_counter()
+            partitions = self._open_partitions(
+                source_file, split_by_fields, included_fields, True, bucketer, dedupe_policy, join,
+                governor
+            )
+            sink = SQLiteSink(
+                database, partitions.header, self._partition_fields(split_by_fields, bucketer),
+                table, "per_key" if table_per_key else "single", index_fields,
+                profiler=self.profiler
+            )
+            try:
+                with partitions:
+                    for split_key, rows in partitions:
+                        sink.write(split_key, rows)
+                bytes_written = sink.close()
+            except BaseException:
+                sink.abort()
+                raise
+            
+            result = partitions.result
+            result.engine = f"sqlite ({result.engine})"
+            result.partitions = [
+                PartitionInfo(split_key, sink.key_tables[split_key], rows)
+                for split_key, rows in sink.key_rows.items()
+            ]
+            if bucketer:
+                result.bucket_keys = bucketer.key_counts()
+            result.files_created = 1
+            result.bytes_written = bytes_written
+            result.wall_time = time.perf_counter() - start_time
+            self._record_resources(result, sampler)
+            
+            self.logger.info(
+                f"SQLite load completed: {result.total_rows} rows, {len(sink.key_rows)} partitions "
+                f"in {database} in {result.wall_time:.2f}s ({result.rows_per_second:,.0f} rows/s)"
+            )
+            return result
+            
+        except Exception as e:
+            raise ProcessingError(f"Error writing SQLite database: {str(e)}")
+        finally:
+            sampler.stop()
+    
+    def split_csv_to_archive(
+        self,
+        source_file: Union[str, StreamSource],
+        archive: str,
+        split_by_fields: List[str],
+        included_fields: List[str],
+        archive_format: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        member_bytes: int = Config.ARCHIVE_MEMBER_BYTES,
+        buckets: Optional[int] = None,
+        dedupe: Union[bool, DedupePolicy] = False,
+        join: Optional[LookupJoin] = None,
+        layout: str = "flat"
+    ) -> ProcessingResult:
+        """
+        Split a CSV file into members of one zip or tar archive instead of separate files.
+        
+        Args:
+            source_file: Path to the source CSV file, or a StreamSource
+            archive: Path of the archive to write; an existing file is
+                replaced when every member has been written
+            split_by_fields: List of field names to split by
+            included_fields: List of field names to include in every member
+            archive_format: "zip" or "tar"; taken from the archive suffix
+                (.zip, .tar, .tar.gz, .tgz) when None
+            compression_level: Deflate level 0-9 of every zip member, or of
+                the gzip stream wrapping a tar archive; None stores the
+                members uncompressed, except that .tar.gz and .tgz
+                archives are gzipped at Config.ARCHIVE_GZIP_LEVEL
+            member_bytes: Bytes of a partition buffered in memory before
+                they are written as a member. A partition larger than this
+                is written as members named like rolled part files,
+                <key>_<source>_part0001.csv and so on
+            buckets: Partition by bucket, as split_csv_by_fields does
+            dedupe: Leave out repeated rows, as split_csv_by_fields does
+            join: Enrich rows from a lookup CSV, as split_csv_by_fields does
+            layout: Member names as split_csv_by_fields names files: "flat"
+                or "hive" field=value directories
+            
+        Returns:
+            ProcessingResult object containing operation results; every
+            partition's path is its member name
+        """
+        try:
+            self._validate_source(source_file)
+            if not archive:
+                raise ValidationError("Output archive is not specified")
+            self._validate_fields(split_by_fields, included_fields, buckets)
+            self._validate_layout(layout)
+            if archive_format is None:
+                archive_format = archive_format_for(archive)
+                if archive_format is None:
+                    raise ValidationError(
+                        f"Cannot tell the archive format of {archive}; pass archive_format"
+                    )
+            validate_archive_options(archive_format, compression_level)
+            self._validate_limits(('Archive member bytes', member_bytes))
+            bucketer, dedupe_policy = self._resolve_partitioning(included_fields, buckets, dedupe)
+            governor = self._memory_governor()
+            self.profiler.reset()
+            with self.profiler.capture():
+                result = self._process_archive(
+                    source_file, archive, split_by_fields, included_fields, archive_format,
+                    compression_level, member_bytes, bucketer, dedupe_policy, join, layout, governor
+                )
+            self._finish_run(
+                result, source_file, os.path.dirname(os.path.abspath(archive)), split_by_fields,
+                included_fields, self._partition_fields(split_by_fields, bucketer), False, False
+            )
+            return result
+        
+        except (ValidationError, ProcessingError, FileOperationError) as e:
+            self.logger.error(f"Archive split failed: {e}")
+            return self._failed_result(e, str(e))
+        except Exception as e:
+            self.logger.error(f"Unexpected error during archive split: {e}")
+            return self._failed_result(e, f"Unexpected error: {str(e)}")
+    
+    def _process_archive(
+        self,
+        source_file: Union[str, StreamSource],
+        archive: str,
+        split_by_fields: List[str],
+        included_fields: List[str],
+        archive_format: str,
+        compression_level: Optional[int],
+        member_bytes: int,
+        bucketer: Optional[KeyBucketer],
+        dedupe_policy: Optional[DedupePolicy],
+        join: Optional[LookupJoin],
+        layout: str,
+        governor: Optional[MemoryGovernor] = None
+    ) -> ProcessingResult:
+        """Buffer the keyed rows of the source per partition and write them as archive members."""
+        sampler = ResourceSampler().start()
+        try:
+            start_time = time.perf_counter()
+            partitions = self._open_partitions(
+                source_file, split_by_fields, included_fields, True, bucketer, dedupe_policy, join,
+                governor
+            )
+            sink = ArchiveSink(
+                archive, partitions.header,
+                self._member_name_for(source_file, split_by_fields, bucketer, layout),
+                archive_format, compression_level, member_bytes, profiler=self.profiler
+            )
+            if governor is not None:
+                def flush_members(strategy: str) -> None:
+                    if strategy == "flush":
+                        # Write every buffer out and keep later buffering within the budget
+                        sink.buffer_bytes = min(sink.buffer_bytes, governor.spill_budget)
+                        sink.flush_largest(0)
+                
+                governor.track(lambda: sink.buffered_bytes)
+                governor.on_switch(flush_members)
+            try:
+                with partitions:
+                    for split_key, rows in partitions:
+                        sink.write(split_key, rows)
+                if bucketer:
+                    for partition_key in bucketer.partition_keys():
+                        if partition_key not in sink.key_rows:
+                            sink.write(partition_key, [])
+                bytes_written = sink.close()
+            except BaseException:
+                sink.abort()
+                raise
+            
+            result = partitions.result
+            result.engine = f"{archive_format} ({result.engine})"
+            result.partitions = sink.members
+            if bucketer:
+                # Stable sort keeps the parts of each bucket in order
+                result.partitions = sorted(sink.members, key=lambda info: int(info.split_key[0]))
+                result.bucket_keys = bucketer.key_counts()
+            result.files_created = 1
+            result.bytes_written = bytes_written
+            result.wall_time = time.perf_counter() - start_time
+            self._record_resources(result, sampler)
+            
+            self.logger.info(
+                f"Archive written: {result.total_rows} rows in {len(sink.members)} members "
+                f"of {archive} in {result.wall_time:.2f}s ({result.rows_per_second:,.0f} rows/s); "
+                f"at most {sink.peak_buffered_bytes:,} bytes buffered"
+            )
+            return result
+            
+        except Exception as e:
+            raise ProcessingError(f"Error writing archive: {str(e)}")
+        finally:
+            sampler.stop()
+    
+    def split_csv_into_chunks(
+        self,
+        source_file: str,
+        output_dir: str,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        workers: int = 1,
+        run_report: bool = False,
+        manifest: bool = False
+    ) -> ProcessingResult:
+        """
+        Split CSV file into parts of at most max_rows rows and/or max_bytes bytes.
+        
+        Every part repeats the header. Records are copied byte for byte, so
+        the parts keep the source's format and encoding, and parts are
+        written concurrently from independent byte ranges of the source.
+        
+        Args:
+            source_file: Path to the source CSV file
+            output_dir: Directory where part files will be created
+            max_rows: Maximum data rows per part
+            max_bytes: Maximum size of each part in bytes, header included;
+                a single record larger than this gets a part of its own
+            workers: Number of parts written in parallel
+            run_report: Write the run metrics as JSON to
+                Config.RUN_REPORT_FILENAME in output_dir
+            manifest: Write every part's number, file, row count and size
+                to Config.MANIFEST_FILENAME in output_dir
+            
+        Returns:
+            ProcessingResult object containing operation results
+        """
+        try:
+            self._validate_chunk_inputs(source_file, output_dir, max_rows, max_bytes, workers)
+            self.profiler.reset()
+            with self.profiler.capture():
+                result = self._process_chunks(source_file, output_dir, max_rows, max_bytes, workers)
+            self._finish_run(
+                result, source_file, output_dir, [], [], ['part'], run_report, manifest
+            )
+            return result
+        
+        except (ValidationError, ProcessingError, FileOperationError) as e:
+            self.logger.error(f"CSV chunking failed: {e}")
+            return self._failed_result(e, str(e))
+        except Exception as e:
+            self.logger.error(f"Unexpected error during CSV chunking: {e}")
+            return self._failed_result(e, f"Unexpected error: {str(e)}")
+    
+    def merge_csv_files(
+        self,
+        source_files: Sequence[str],
+        output_file: str,
+        fields: Optional[List[str]] = None,
+        sort_by: Optional[Sequence[Union[str, SortColumn]]] = None
+    ) -> ProcessingResult:
+        """
+        Merge CSV files, such as the outputs of an earlier split, into one file.
+        
+        Columns are matched by header name and columns missing from an input
+        are written empty. Inputs are streamed in batches, so memory depends
+        on the number of inputs and not on their size.
+        
+        Args:
+            source_files: Paths of the CSV files to merge
+            output_file: Path of the merged CSV file
+            fields: Output columns; the union of the input headers, in order
+                of first appearance, when None
+            sort_by: Columns every input is already sorted by, given as names
+                or SortColumn objects; the inputs are then combined with a
+                k-way heap merge instead of being concatenated in order
+            
+        Returns:
+            ProcessingResult object containing operation results
+        """
+        try:
+            self._validate_merge_inputs(source_files, output_file, fields)
+            sort_columns = normalize_sort_columns(sort_by) if sort_by else None
+            self.profiler.reset()
+            with self.profiler.capture():
+                result = self._process_merge(list(source_files), output_file, fields, sort_columns)
+            self._finish_run(
+                result, source_files[0], os.path.dirname(os.path.abspath(output_file)), [],
+                fields or [], [], False, False
+            )
+            return result
+        
+        except (ValidationError, ProcessingError, FileOperationError) as e:
+            self.logger.error(f"CSV merge failed: {e}")
+            return self._failed_result(e, str(e))
+        except Exception as e:
+            self.logger.error(f"Unexpected error during CSV merge: {e}")
+            return self._failed_result(e, f"Unexpected error: {str(e)}")
+    
+    def _finish_run(
+        self,
+        result: ProcessingResult,
+        source_file: str,
+        output_dir: str,
+        split_by_fields: List[str],
+        included_fields: List[str],
+        manifest_fields: List[str],
+        run_report: bool,
+        manifest: bool
+    ) -> None:
+        """Log phase timings, write the requested reports and record metrics."""
+        if self._log_phase_timings:
+            self.logger.info(f"Phase timings:\n{self.profiler.format_report()}")
+        if run_report:
+            self._write_run_report(
+                result, source_file, output_dir, split_by_fields, included_fields
+            )
+        if manifest:
+            self._write_manifest(result, output_dir, manifest_fields)
+        if self.metrics is not None:
+            self.metrics.record_result(result, self.profiler.report())
+    
+    def _failed_result(self, error: Exception, message: str) -> ProcessingResult:
+        """Build a failed result, recording the error in the metrics sink."""
+        result = ProcessingResult(success=False, error=message)
+        if self.metrics is not None:
+            self.metrics.record_error(_root_error_type(error))
+            self.metrics.record_result(result)
+        return result
     
     def _validate_inputs(
         self, 
         source_file: str, 
         output_dir: str, 
         split_by_fields: List[str], 
-        included_fields: List[str]
+        included_fields: List[str],
+        buckets: Optional[int] = None
     ) -> None:
         """Validate input parameters."""
-        if not source_file or not os.path.exists(source_file):
-            raise ValidationError("Source file does not exist or is not specified")
+        self._validate_source(source_file)
         
         if not output_dir:
             raise ValidationError("Output directory is not specified")
         
+        self._validate_fields(split_by_fields, included_fields, buckets)
+    
+    def _validate_layout(self, layout: str) -> None:
+        """Check that the output layout is one of OUTPUT_LAYOUTS."""
+        if layout not in OUTPUT_LAYOUTS:
+            raise ValidationError(
+                f"Unknown output layout '{layout}'. Choose one of: {', '.join(OUTPUT_LAYOUTS)}"
+            )
+    
+    def _validate_source(self, source_file: Union[str, StreamSource]) -> None:
+        """Check that the source is a stream or an existing file."""
+        if isinstance(source_file, StreamSource):
+            return
+        if not source_file or not os.path.exists(source_file):
+            raise ValidationError("Source file does not exist or is not specified")
+    
+    def _validate_fields(
+        self,
+        split_by_fields: List[str],
+        included_fields: List[str],
+        buckets: Optional[int] = None
+    ) -> None:
+        """Validate the split and included fields and the bucket count."""
         if not split_by_fields:
             raise ValidationError("At least one split_by field must be specified")
         
         if not included_fields:
             raise ValidationError("At least one field must be included in output")
+        
+        if buckets is not None and (
+            isinstance(buckets, bool) or not isinstance(buckets, int) or buckets < 1
+        ):
+            raise ValidationError("Bucket count must be a positive integer")
+    
+    def _resolve_partitioning(
+        self,
+        included_fields: List[str],
+        buckets: Optional[int],
+        dedupe: Union[bool, DedupePolicy]
+    ) -> Tuple[Optional[KeyBucketer], Optional[DedupePolicy]]:
+        """
+        Resolve the bucket and dedupe options every split API shares.
+        
+        Returns:
+            Tuple of the bucketer, or None without buckets, and the dedupe
+            policy, or None without dedupe
+            
+        Raises:
+            ValidationError: If an included field clashes with the bucket
+                key or the dedupe memory budget is invalid
+        """
+        if buckets is not None and 'bucket' in included_fields:
+            raise ValidationError(
+                "A field named 'bucket' cannot be included together with bucket keys"
+            )
+        bucketer = KeyBucketer(buckets) if buckets is not None else None
+        dedupe_policy = DedupePolicy() if dedupe is True else dedupe or None
+        if dedupe_policy is not None:
+            self._validate_limits(('Dedupe memory', dedupe_policy.memory_budget))
+        return bucketer, dedupe_policy
+    
+    @staticmethod
+    def _partition_fields(split_by_fields: List[str], bucketer: Optional[KeyBucketer]) -> List[str]:
+        """Names of the partition key fields: the split fields, or 'bucket' with bucket keys."""
+        return ['bucket'] if bucketer else split_by_fields
+    
+    def _validate_chunk_inputs(
+        self,
+        source_file: str,
+        output_dir: str,
+        max_rows: Optional[int],
+        max_bytes: Optional[int],
+        workers: int
+    ) -> None:
+        """Validate chunking parameters."""
+        if not source_file or not os.path.exists(source_file):
+            raise ValidationError("Source file does not exist or is not specified")
+        
+        if not output_dir:
+            raise ValidationError("Output directory is not specified")
+        
+        if max_rows is None and max_bytes is None:
+            raise ValidationError("A maximum row count or byte size per part must be specified")
+        
+        self._validate_limits(
+            ('Maximum rows', max_rows), ('Maximum bytes', max_bytes), ('Worker count', workers)
+        )
+    
+    def _validate_merge_inputs(
+        self,
+        source_files: Sequence[str],
+        output_file: str,
+        fields: Optional[List[str]]
+    ) -> None:
+        """Validate merge parameters."""
+        if not source_files:
+            raise ValidationError("At least one source file must be specified")
+        
+        missing = [path for path in source_files if not path or not os.path.exists(path)]
+        if missing:
+            raise ValidationError(f"Source files do not exist: {', '.join(map(str, missing))}")
+        
+        if not output_file:
+            raise ValidationError("Output file is not specified")
+        
+        if os.path.exists(output_file) and any(
+            os.path.samefile(path, output_file) for path in source_files
+        ):
+            raise ValidationError("Output file must not be one of the source files")
+        
+        if fields is not None and not fields:
+            raise ValidationError("At least one field must be included in output")
+    
+    def _validate_sort(
+        self,
+        sort_by: Optional[Sequence[Union[str, SortColumn]]],
+        sort_memory: int,
+        included_fields: List[str]
+    ) -> Optional[List[SortColumn]]:
+        """Validate sort options, returning the sort columns if sorting is requested."""
+        if not sort_by:
+            return None
+        sort_columns = normalize_sort_columns(sort_by)
+        missing = [column.field for column in sort_columns if column.field not in included_fields]
+        if missing:
+            raise ValidationError(
+                f"Sort fields must be included in the output: {', '.join(missing)}"
+            )
+        self._validate_limits(('Sort memory', sort_memory))
+        return sort_columns
+    
+    def _validate_limits(self, *limits: Tuple[str, Optional[int]]) -> None:
+        """Validate that each named limit is unset or a positive integer."""
+        for name, value in limits:
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, int) or value < 1
+            ):
+                raise ValidationError(f"{name} must be a positive integer")
+    
+    def _record_resources(
+        self, result: ProcessingResult, sampler: ResourceSampler, engine_fds: Optional[int] = None
+    ) -> None:
+        """
+        Stop a run's resource sampler and store what the run added to the process.
+
+        Args:
+            result: Result of the run
+            sampler: Sampler started with the run
+            engine_fds: Most files the engine held open at once, where it
+                counts them; a short-lived peak may fall between samples
+        """
+        sampler.stop()
+        result.rss_growth = sampler.rss_growth
+        fd_growth = sampler.fd_growth
+        if engine_fds is None or (fd_growth is not None and fd_growth > engine_fds):
+            result.max_open_fds = fd_growth
+        else:
+            result.max_open_fds = engine_fds
+    
+    def _memory_governor(self) -> Optional[MemoryGovernor]:
+        """Create the memory governor of a run when a memory budget is set."""
+        if self.max_memory is None:
+            return None
+        self._validate_limits(('Maximum memory', self.max_memory))
+        return MemoryGovernor(self.max_memory)
+    
+    def _process_chunks(
+        self,
+        source_file: str,
+        output_dir: str,
+        max_rows: Optional[int],
+        max_bytes: Optional[int],
+        workers: int
+    ) -> ProcessingResult:
+        """Plan the byte ranges of all parts, then copy them to part files."""
+        sampler = ResourceSampler().start()
+        try:
+            start_time = time.perf_counter()
+            result = ProcessingResult(success=True, engine="byte-range")
+            profiler = self.profiler
+            
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            
+            with self._reading(source_file):
+                with profiler.phase("open"):
+                    planner = ChunkPlanner(detect_dialect(source_file), max_rows, max_bytes)
+                with profiler.phase("parse"):
+                    header, chunks = planner.plan(source_file)
+            if not header:
+                raise ProcessingError("CSV file is empty or has no headers")
+            self.logger.info(f"Planned {len(chunks)} parts of {source_file}")
+            
+            stem = self._clean_stem(source_file)
+            width = max(4, len(str(len(chunks))))
+            
+            def path_for(chunk: ChunkRange) -> str:
+                return os.path.join(
+                    output_dir, f"{stem}_part{chunk.index + 1:0{width}d}{Config.CSV_EXTENSION}"
+                )
+            
+            progress = ProgressAggregator(self._report_progress)
+            progress_lock = threading.Lock()
+            
+            def on_written(chunk: ChunkRange, path: str, size: int) -> None:
+                part_key = (str(chunk.index + 1),)
+                with progress_lock:
+                    if self.hooks.on_partition_open:
+                        self.hooks.on_partition_open(part_key, path)
+                    if self.hooks.on_flush:
+                        self.hooks.on_flush(part_key, chunk.rows, size)
+                    progress.add(lambda: f"Created part {chunk.index + 1} with {chunk.rows} rows")
+            
+            try:
+                sizes = copy_chunks(
+                    source_file, header, chunks, path_for, workers, profiler, on_written
+                )
+            except OSError as e:
+                raise FileOperationError(f"Error writing output file: {str(e)}")
+            progress.flush()
+            
+            result.partitions = [
+                PartitionInfo((str(chunk.index + 1),), path_for(chunk), chunk.rows, size)
+                for chunk, size in zip(chunks, sizes)
+            ]
+            result.files_created = len(chunks)
+            result.total_rows = sum(chunk.rows for chunk in chunks)
+            result.bytes_read = os.path.getsize(source_file)
+            result.bytes_written = sum(sizes)
+            result.wall_time = time.perf_counter() - start_time
+            # Each worker holds its source range and its part file open
+            self._record_resources(result, sampler, 2 * max(1, min(workers, len(chunks))))
+            
+            self.logger.info(
+                f"Chunking completed: {result.files_created} files created, "
+                f"{result.total_rows} rows processed in {result.wall_time:.2f}s "
+                f"({result.rows_per_second:,.0f} rows/s)"
+            )
+            return result
+            
+        except Exception as e:
+            raise ProcessingError(f"Error processing CSV file: {str(e)}")
+        finally:
+            sampler.stop()
+    
+    def _process_merge(
+        self,
+        source_files: List[str],
+        output_file: str,
+        fields: Optional[List[str]],
+        sort_columns: Optional[List[SortColumn]]
+    ) -> ProcessingResult:
+        """Read every input header, then stream the inputs into the output file."""
+        sampler = ResourceSampler().start()
+        try:
+            start_time = time.perf_counter()
+            result = ProcessingResult(
+                success=True, engine="k-way merge" if sort_columns else "concat"
+            )
+            profiler = self.profiler
+            
+            inputs = []
+            for path in source_files:
+                with self._reading(path), profiler.phase("open"):
+                    inputs.append(MergeInput(path))
+            header = fields or merged_header([source.header for source in inputs])
+            unknown = [
+                field for field in header if not any(field in source.header for source in inputs)
+            ]
+            if unknown:
+                raise ValidationError(
+                    f"Fields not found in any source header: {', '.join(unknown)}"
+                )
+            sort_key = build_sort_key(sort_columns, header) if sort_columns else None
+            
+            output_dir = os.path.dirname(os.path.abspath(output_file))
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            
+            interval = Config.PROGRESS_UPDATE_INTERVAL
+            reported = 0
+            
+            def on_rows(rows: int) -> None:
+                nonlocal reported
+                if rows // interval > reported // interval:
+                    self._report_progress(f"Merged {rows} rows...")
+                reported = rows
+            
+            merger = CSVMerger(header, sort_key, self.parser_backend, profiler, on_rows)
+            try:
+                merger.merge(inputs, output_file)
+            except OSError as e:
+                raise FileOperationError(f"Error writing output file: {str(e)}")
+            
+            result.partitions = [
+                PartitionInfo((), output_file, merger.rows_written, merger.bytes_written)
+            ]
+            result.files_created = 1
+            result.total_rows = merger.rows_written
+            result.bytes_read = sum(os.path.getsize(path) for path in source_files)
+            result.bytes_written = merger.bytes_written
+            result.wall_time = time.perf_counter() - start_time
+            self._record_resources(result, sampler, merger.peak_open_files)
+            
+            self.logger.info(
+                f"Merge completed: {len(inputs)} files merged into {output_file}, "
+                f"{result.total_rows} rows in {result.wall_time:.2f}s "
+                f"({result.rows_per_second:,.0f} rows/s)"
+            )
+            return result
+            
+        except Exception as e:
+            raise ProcessingError(f"Error merging CSV files: {str(e)}")
+        finally:
+            sampler.stop()
     
     def _process_csv_file(
         self, 
         source_file: str, 
         output_dir: str, 
         split_by_fields: List[str], 
-        included_fields: List[str]
+        included_fields: List[str],
+        bucketer: Optional[KeyBucketer] = None,
+        rolling: Optional[RollingPolicy] = None,
+        sort_columns: Optional[List[SortColumn]] = None,
+        sort_memory: int = Config.SORT_MEMORY_BUDGET,
+        dedupe_policy: Optional[DedupePolicy] = None,
+        join: Optional[LookupJoin] = None,
+        layout: str = "flat",
+        governor: Optional[MemoryGovernor] = None
     ) -> ProcessingResult:
         """Process the CSV file and create split output files."""
+        sampler = ResourceSampler().start()
         try:
+            start_time = time.perf_counter()
+            result = ProcessingResult(success=True)
+            
             # Ensure output directory exists
             Path(output_dir).mkdir(parents=True, exist_ok=True)
             
-            # Read and process CSV file
-            split_data, header = self._read_and_split_csv(source_file, split_by_fields, included_fields)
-            
-            # Write split data to files
-            files_created = self._write_split_files(source_file, output_dir, split_data, header, split_by_fields)
+            if self.writer_threads > 0 or sort_columns:
+                # Sorting streams rows to the writer stage so memory stays within sort_memory
+                writers = self._split_pipelined(
+                    source_file, output_dir, split_by_fields, included_fields, result, bucketer,
+                    rolling, sort_columns, sort_memory, dedupe_policy, join, layout, governor
+                )
+            elif governor is not None:
+                writers = [self._split_governed(
+                    source_file, output_dir, split_by_fields, included_fields, result, governor,
+                    bucketer, rolling, dedupe_policy, join, layout
+                )]
+            else:
+                # Read and process CSV file
+                split_data, header = self._read_and_split_csv(
+                    source_file, split_by_fields, included_fields, result, bucketer, dedupe_policy,
+                    join
+                )
+                
+                # Write split data to files
+                writers = [self._write_split_files(
+                    source_file, output_dir, split_data, header, split_by_fields, bucketer, rolling,
+                    layout
+                )]
             
-            total_rows = sum(len(rows) for rows in split_data.values())
+            if bucketer:
+                self._complete_buckets(writers, bucketer, result)
+            else:
+                result.partitions = [info for writer in writers for info in writer.files]
+            result.files_created = len(result.partitions)
+            if isinstance(source_file, StreamSource):
+                result.bytes_read = source_file.bytes_read
+            else:
+                result.bytes_read = os.path.getsize(source_file)
+            result.bytes_written = sum(writer.bytes_written for writer in writers)
+            result.wall_time = time.perf_counter() - start_time
+            # The source file stays open while partitions are written
+            self._record_resources(
+                result, sampler, 1 + sum(writer.peak_open_files for writer in writers)
+            )
             
-            self.logger.info(f"Processing completed: {files_created} files created, {total_rows} rows processed")
-            return ProcessingResult(success=True, files_created=files_created, total_rows=total_rows)
+            self.logger.info(
+                f"Processing completed: {result.files_created} files created, "
+                f"{result.total_rows} rows processed in {result.wall_time:.2f}s "
+                f"({result.rows_per_second:,.0f} rows/s)"
+            )
+            return result
             
         except Exception as e:
             raise ProcessingError(f"Error processing CSV file: {str(e)}")
+        finally:
+            sampler.stop()
     
     def _read_and_split_csv(
         self, 
         source_file: str, 
         split_by_fields: List[str], 
-        included_fields: List[str]
-    ) -> Tuple[Dict[Tuple, List[List[str]]], List[str]]:
+        included_fields: List[str],
+        result: ProcessingResult,
+        bucketer: Optional[KeyBucketer] = None,
+        dedupe_policy: Optional[DedupePolicy] = None,
+        join: Optional[LookupJoin] = None
+    ) -> Tuple[Dict[Tuple, List[Sequence[str]]], List[str]]:
         """Read CSV file and split data by specified fields."""
-        split_data: Dict[Tuple, List[List[str]]] = {}
+        split_data: Dict[Tuple, List[Sequence[str]]] = {}
+        profiler = self.profiler
+        
+        with self._reading(source_file):
+            new_header, batches = self._read_source(
+                source_file, split_by_fields, included_fields, result, bucketer, dedupe_policy, join
+            )
+            for keys, new_rows in batches:
+                with profiler.phase("routing"):
+                    for split_key, new_row in zip(keys, new_rows):
+                        group = split_data.get(split_key)
+                        if group is None:
+                            group = split_data[split_key] = []
+                        group.append(new_row)
+        
+        return split_data, new_header
+    
+    def _split_governed(
+        self,
+        source_file: str,
+        output_dir: str,
+        split_by_fields: List[str],
+        included_fields: List[str],
+        result: ProcessingResult,
+        governor: MemoryGovernor,
+        bucketer: Optional[KeyBucketer] = None,
+        rolling: Optional[RollingPolicy] = None,
+        dedupe_policy: Optional[DedupePolicy] = None,
+        join: Optional[LookupJoin] = None,
+        layout: str = "flat"
+    ) -> PartitionFileWriter:
+        """
+        Group rows in memory while the memory budget allows, then write them as they are read.
+        
+        Once the governor leaves the "group" strategy, the grouped rows are
+        appended to their files and every later batch is appended as soon
+        as it is routed. Either way each file holds its rows in source order.
+        """
+        partition_fields = self._partition_fields(split_by_fields, bucketer)
+        progress = ProgressAggregator(self._report_progress)
+        profiler = self.profiler
+        split_data: Dict[Tuple, List[Sequence[str]]] = {}
+        grouped_bytes = 0
+        writer: Optional[PartitionFileWriter] = None
+        
+        def on_new_partition(split_key: Tuple) -> None:
+            progress.add(lambda: (
+                f"Created file for {self._format_split_display(split_key, partition_fields)}"
+            ))
+        
+        def write_groups(groups: Dict[Tuple, List[Sequence[str]]], close: bool = False) -> None:
+            try:
+                for split_key, rows in groups.items():
+                    writer.append(split_key, rows)
+                    if close:
+                        writer.close(split_key)
+            except OSError as e:
+                raise FileOperationError(f"Error writing output file: {str(e)}")
+        
+        def flush_groups(strategy: str) -> None:
+            nonlocal grouped_bytes
+            if strategy == "flush":
+                write_groups(split_data)
+                split_data.clear()
+                grouped_bytes = 0
+        
+        governor.track(lambda: grouped_bytes)
+        governor.on_switch(flush_groups)
+        try:
+            with self._reading(source_file):
+                new_header, batches = self._read_source(
+                    source_file, split_by_fields, included_fields, result, bucketer, dedupe_policy,
+                    join, governor
+                )
+                writer = PartitionFileWriter(
+                    new_header,
+                    self._partition_path_for(
+                        source_file, output_dir, split_by_fields, bucketer, layout
+                    ),
+                    profiler=profiler,
+                    hooks=self.hooks,
+                    on_new_partition=on_new_partition,
+                    rolling=rolling
+                )
+                for keys, new_rows in batches:
+                    grouping = governor.strategy == "group"
+                    groups = split_data if grouping else {}
+                    with profiler.phase("routing"):
+                        for split_key, new_row in zip(keys, new_rows):
+                            group = groups.get(split_key)
+                            if group is None:
+                                group = groups[split_key] = []
+                            group.append(new_row)
+                    if grouping:
+                        grouped_bytes += estimate_rows_bytes(new_rows)
+                    else:
+                        write_groups(groups)
+            write_groups(split_data, close=True)
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        writer.close_all()
+        
+        progress.flush()
+        return writer
+    
+    def _split_pipelined(
+        self,
+        source_file: str,
+        output_dir: str,
+        split_by_fields: List[str],
+        included_fields: List[str],
+        result: ProcessingResult,
+        bucketer: Optional[KeyBucketer] = None,
+        rolling: Optional[RollingPolicy] = None,
+        sort_columns: Optional[List[SortColumn]] = None,
+        sort_memory: int = Config.SORT_MEMORY_BUDGET,
+        dedupe_policy: Optional[DedupePolicy] = None,
+        join: Optional[LookupJoin] = None,
+        layout: str = "flat",
+        governor: Optional[MemoryGovernor] = None
+    ) -> List[Union[PartitionFileWriter, SortingWriter]]:
+        """Split the file with the reader and writer stages running concurrently."""
+        writer_count = max(1, self.writer_threads)
+        progress = ProgressAggregator(self._report_progress)
+        progress_lock = threading.Lock()
+        
+        partition_fields = self._partition_fields(split_by_fields, bucketer)
+        # Shared by all writers so each directory is created once
+        path_for = self._partition_path_for(
+            source_file, output_dir, split_by_fields, bucketer, layout
+        )
+        
+        def on_new_partition(split_key: Tuple) -> None:
+            with progress_lock:
+                progress.add(lambda: (
+                    f"Created file for {self._format_split_display(split_key, partition_fields)}"
+                ))
+        
+        def make_writer(index: int) -> Union[PartitionFileWriter, SortingWriter]:
+            writer = PartitionFileWriter(
+                new_header,
+                path_for,
+                profiler=self.profiler,
+                hooks=self.hooks,
+                max_open_files=max(1, Config.MAX_OPEN_FILES // writer_count),
+                on_new_partition=on_new_partition,
+                rolling=rolling
+            )
+            if not sort_columns:
+                return writer
+            sorting = SortingWriter(
+                writer, build_sort_key(sort_columns, new_header), sort_memory // writer_count,
+                profiler=self.profiler,
+                memory_check=governor.check if governor is not None else None
+            )
+            if governor is not None:
+                def spill_sorted(strategy: str) -> None:
+                    if strategy == "spill":
+                        # The writer thread spills on its next append once over the lowered budget
+                        sorting.memory_budget = min(
+                            sorting.memory_budget, governor.spill_budget // writer_count
+                        )
+                
+                governor.track(lambda: sorting.buffered_bytes)
+                governor.on_switch(spill_sorted)
+            return sorting
+        
+        # Reserving paths as the reader first meets each key keeps names
+        # independent of writer timing
+        splitter = PipelinedSplitter(writer_count, make_writer, on_new_key=path_for)
+        with self._reading(source_file):
+            new_header, batches = self._read_source(
+                source_file, split_by_fields, included_fields, result, bucketer, dedupe_policy,
+                join, governor
+            )
+            writers = splitter.run(batches)
+        if governor is not None:
+            # Sorted partitions are merged after the input ends, and may have escalated further
+            result.memory_strategy = governor.strategy
+        progress.flush()
+        
+        result.stages = {stage.name: stage.to_dict() for stage in splitter.stage_stats}
+        self.logger.info(f"Pipeline stages: {splitter.format_stats()}")
+        if sort_columns:
+            runs = sum(writer.runs_spilled for writer in writers)
+            self.logger.info(
+                f"Sorted partitions by {', '.join(c.field for c in sort_columns)}; "
+                f"{runs} runs spilled"
+            )
+        return writers
+    
+    def _read_source(
+        self,
+        source_file: Union[str, StreamSource],
+        split_by_fields: List[str],
+        included_fields: List[str],
+        result: ProcessingResult,
+        bucketer: Optional[KeyBucketer] = None,
+        dedupe_policy: Optional[DedupePolicy] = None,
+        join: Optional[LookupJoin] = None,
+        governor: Optional[MemoryGovernor] = None
+    ) -> Tuple[List[str], Iterator[Tuple[List[Tuple], List[Sequence[str]]]]]:
+        """
+        Open the source file and validate its header.
+        
+        Returns:
+            Output header and an iterator of (split keys, projected rows)
+            batches; with a bucketer, the keys are bucket partition keys,
+            with a dedupe policy, repeated rows are left out, and with a
+            join, fields are resolved against the source header followed
+            by the joined columns; with a governor, memory is checked
+            after every batch
+        """
+        profiler = self.profiler
+        
+        if isinstance(source_file, StreamSource):
+            with profiler.phase("open"):
+                dialect = source_file.detect_dialect()
+                header, batches = source_file.read_batches()
+            result.engine = "csv-stream"
+            self.logger.info(
+                f"Detected CSV format: {dialect}; parsing {source_file.name} as it streams in"
+            )
+            return self._prepare_batches(
+                header, batches, split_by_fields, included_fields, result, bucketer, dedupe_policy,
+                join, governor
+            )
+        
+        expected_rows = None
+        if dedupe_policy is not None and dedupe_policy.mode == "approximate":
+            expected_rows = estimate_row_count(source_file)
+        with profiler.phase("open"):
+            dialect = detect_dialect(source_file)
+            backend = select_backend(self.parser_backend, os.path.getsize(source_file), dialect)
+        result.engine = backend.name
+        self.logger.info(f"Detected CSV format: {dialect}; using '{backend.name}' parser backend")
+        
+        # Read and validate header
+        if self.ingest_cache is not None:
+            needed = set(split_by_fields) | set(included_fields)
+            if dedupe_policy is not None and dedupe_policy.fields:
+                needed.update(dedupe_policy.fields)
+            if join is not None:
+                needed.update(join.on)
+            header, batches = self._read_cached(source_file, dialect, backend, result, needed)
+        else:
+            with profiler.phase("open"):
+                header, batches = backend.read_batches(source_file, dialect)
+        return self._prepare_batches(
+            header, batches, split_by_fields, included_fields, result, bucketer, dedupe_policy,
+            join, governor, expected_rows
+        )
+    
+    def _prepare_batches(
+        self,
+        header: List[str],
+        batches: Iterator[List[List[str]]],
+        split_by_fields: List[str],
+        included_fields: List[str],
+        result: ProcessingResult,
+        bucketer: Optional[KeyBucketer] = None,
+        dedupe_policy: Optional[DedupePolicy] = None,
+        join: Optional[LookupJoin] = None,
+        governor: Optional[MemoryGovernor] = None,
+        expected_rows: Optional[int] = None
+    ) -> Tuple[List[str], Iterator[Tuple[List[Tuple], List[Sequence[str]]]]]:
+        """
+        Validate the source header and wrap its batches in the key, join and dedupe stages.
+        
+        expected_rows, the estimated rows of the source where known, sizes
+        the Bloom filter of approximate dedupe.
+        """
+        profiler = self.profiler
+        
+        enricher = None
+        if join is not None:
+            with profiler.phase("join"):
+                enricher = Enricher(join, header)
+            header = enricher.header
+            if join.duplicate_keys:
+                self.logger.warning(
+                    f"Lookup file {join.lookup_file} repeats {join.duplicate_keys} keys; "
+                    f"the first entries are used"
+                )
+        self._validate_fields_in_header(header, split_by_fields, included_fields)
+        
+        # Get field indices
+        split_by_indices = [header.index(field) for field in split_by_fields]
+        included_indices = [header.index(field) for field in included_fields]
+        
+        # Create new header with only included fields
+        new_header = [header[i] for i in included_indices]
+        
+        deduplicator = None
+        dedupe_key = None
+        if dedupe_policy is not None:
+            dedupe_fields = dedupe_policy.fields or included_fields
+            missing = [field for field in dedupe_fields if field not in header]
+            if missing:
+                raise ValidationError(
+                    f"Dedupe fields not found in CSV header: {', '.join(missing)}"
+                )
+            dedupe_key = _tuple_getter([header.index(field) for field in dedupe_fields])
+            filter_bytes = None
+            if governor is not None and dedupe_policy.mode == "approximate":
+                # The filter is allocated up front and never shrinks, so keep it well
+                # inside the budget
+                filter_bytes = min(
+                    dedupe_policy.memory_budget,
+                    int(governor.max_memory * Config.MEMORY_DEDUPE_FILTER_FRACTION)
+                )
+            deduplicator = Deduplicator(
+                dedupe_policy, filter_bytes=filter_bytes, expected_rows=expected_rows
+            )
+            if governor is not None:
+                def spill_dedupe(strategy: str) -> None:
+                    if strategy == "spill":
+                        deduplicator.memory_budget = min(
+                            deduplicator.memory_budget, governor.spill_budget
+                        )
+                        deduplicator.start_spilling()
+                
+                governor.track(lambda: deduplicator.memory_bytes)
+                governor.on_switch(spill_dedupe)
+        
+        return new_header, self._key_batches(
+            batches, _tuple_getter(split_by_indices), _tuple_getter(included_indices), result,
+            bucketer, deduplicator, dedupe_key, enricher, governor
+        )
+    
+    def _read_cached(
+        self,
+        source_file: str,
+        dialect: CSVDialect,
+        backend: ParserBackend,
+        result: ProcessingResult,
+        fields: Set[str]
+    ) -> Tuple[List[str], Iterator[List[List[str]]]]:
+        """
+        Read the given fields from the ingest cache, building its entry on first use.
+        
+        Returns:
+            The source header reduced to the cached fields in use, and
+            batches of rows holding only those fields
+        """
+        with self.profiler.phase("ingest"):
+            cached, built = self.ingest_cache.open(
+                source_file, lambda: backend.read_batches(source_file, dialect)
+            )
+        if built:
+            self.logger.info(
+                f"Built ingest cache entry for {source_file}: {cached.rows} rows, "
+                f"{cached.size_bytes:,} bytes"
+            )
+        else:
+            self.logger.info(f"Reading {source_file} from the ingest cache")
+        result.engine = "columnar-cache"
+        header = [field for field in dict.fromkeys(cached.header) if field in fields]
+        return header, cached.read_batches(header)
+    
+    def _key_batches(
+        self,
+        batches: Iterator[List[List[str]]],
+        build_key: Callable[[Sequence[str]], Tuple],
+        project: Callable[[Sequence[str]], Tuple],
+        result: ProcessingResult,
+        bucketer: Optional[KeyBucketer] = None,
+        deduplicator: Optional[Deduplicator] = None,
+        dedupe_key: Optional[Callable[[Sequence[str]], Tuple]] = None,
+        enricher: Optional[Enricher] = None,
+        governor: Optional[MemoryGovernor] = None
+    ) -> Iterator[Tuple[List[Tuple], List[Sequence[str]]]]:
+        """Build split keys and projected rows a batch at a time, counting rows into result."""
+        profiler = self.profiler
+        on_chunk = self.hooks.on_chunk
         total_rows = 0
         
         try:
-            with open(source_file, 'r', newline='', encoding=Config.DEFAULT_ENCODING) as csvfile:
-                reader = csv.reader(csvfile, quotechar='"', quoting=csv.QUOTE_ALL)
+            # Process rows a batch at a time so each phase runs as one tight loop
+            while True:
+                with profiler.phase("parse"):
+                    batch = next(batches, None)
+                if batch is None:
+                    break
+                read_rows = len(batch)
+                
+                if enricher:
+                    with profiler.phase("join"):
+                        batch = enricher.apply(batch)
+                
+                with profiler.phase("key_build"):
+                    keys = list(map(build_key, batch))
+                    if bucketer:
+                        keys = bucketer.map_keys(keys)
                 
-                # Read and validate header
-                header = next(reader)
-                self._validate_fields_in_header(header, split_by_fields, included_fields)
+                with profiler.phase("projection"):
+                    new_rows = list(map(project, batch))
                 
-                # Get field indices
-                split_by_indices = [header.index(field) for field in split_by_fields]
-                included_indices = [header.index(field) for field in included_fields]
+                if deduplicator:
+                    with profiler.phase("dedupe"):
+                        keys, new_rows = deduplicator.filter(
+                            list(map(dedupe_key, batch)), keys, new_rows
+                        )
                 
-                # Create new header with only included fields
-                new_header = [header[i] for i in included_indices]
+                if new_rows:
+                    yield keys, new_rows
                 
-                # Process each row
-                for row in reader:
-                    total_rows += 1
-                    
-                    # Create split key from split_by field values
-                    split_key = tuple(row[i] for i in split_by_indices)
-                    
-                    # Initialize split group if not exists
-                    if split_key not in split_data:
-                        split_data[split_key] = []
-                    
-                    # Create new row with only included fields
-                    new_row = [row[i] for i in included_indices]
-                    split_data[split_key].append(new_row)
-                    
-                    # Report progress periodically
-                    if total_rows % Config.PROGRESS_UPDATE_INTERVAL == 0:
-                        self._report_progress(f"Processed {total_rows} rows...")
+                if governor:
+                    # Runs once the consumer has taken in the batch
+                    governor.check()
                 
-                return split_data, new_header
+                previous_total = total_rows
+                total_rows += read_rows
+                result.total_rows = total_rows
+                if on_chunk:
+                    on_chunk(read_rows, total_rows)
                 
+                # Report progress periodically
+                interval = Config.PROGRESS_UPDATE_INTERVAL
+                if total_rows // interval > previous_total // interval:
+                    self._report_progress(f"Processed {total_rows} rows...")
+            
+            if enricher:
+                result.unmatched_rows = enricher.unmatched
+                self.logger.info(
+                    f"Joined {enricher.matched} rows; {enricher.unmatched} had no lookup entry"
+                )
+            
+            if deduplicator:
+                # Rows spilled by exact dedupe follow every row already yielded
+                spilled = deduplicator.drain()
+                while True:
+                    with profiler.phase("dedupe"):
+                        item = next(spilled, None)
+                    if item is None:
+                        break
+                    yield item
+                    if governor:
+                        governor.check()
+                result.duplicates_removed = deduplicator.duplicates
+                self.logger.info(
+                    f"Removed {deduplicator.duplicates} duplicate rows "
+                    f"({deduplicator.spilled_rows} rows spilled to disk)"
+                )
+            
+            if governor:
+                result.memory_strategy = governor.strategy
+        finally:
+            if deduplicator:
+                deduplicator.close()
+    
+    @contextmanager
+    def _reading(self, source_file: str) -> Iterator[None]:
+        """Translate errors raised while reading the source file."""
+        try:
+            yield
+        except StopIteration:
+            raise ProcessingError("CSV file is empty or has no headers")
         except FileNotFoundError:
             raise FileOperationError(f"Source file not found: {source_file}")
         except PermissionError:
             raise FileOperationError(f"Permission denied accessing file: {source_file}")
         except UnicodeDecodeError:
-            raise ProcessingError(f"Unable to decode file {source_file}. Please ensure it's a valid CSV file with UTF-8 encoding.")
+            raise ProcessingError(
+                f"Unable to decode file {self._source_name(source_file)} as "
+                f"{self._source_dialect(source_file).encoding}. "
+                f"Please ensure it's a valid CSV file."
+            )
     
     def _validate_fields_in_header(
         self, 
@@ -192,39 +1738,170 @@ class CSVProcessor:
         self, 
         source_file: str,
         output_dir: str, 
-        split_data: Dict[Tuple, List[List[str]]], 
+        split_data: Dict[Tuple, List[Sequence[str]]], 
         header: List[str], 
-        split_by_fields: List[str]
-    ) -> int:
+        split_by_fields: List[str],
+        bucketer: Optional[KeyBucketer] = None,
+        rolling: Optional[RollingPolicy] = None,
+        layout: str = "flat"
+    ) -> PartitionFileWriter:
         """Write split data to separate CSV files."""
-        files_created = 0
+        partition_fields = self._partition_fields(split_by_fields, bucketer)
+        writer = PartitionFileWriter(
+            header,
+            self._partition_path_for(source_file, output_dir, split_by_fields, bucketer, layout),
+            profiler=self.profiler,
+            hooks=self.hooks,
+            rolling=rolling
+        )
+        progress = ProgressAggregator(self._report_progress)
         
         for split_key, rows in split_data.items():
             try:
-                filename = self._generate_filename(source_file, split_key, split_by_fields)
-                output_file = os.path.join(output_dir, filename)
-                
-                with open(output_file, 'w', newline='', encoding=Config.DEFAULT_ENCODING) as csvfile:
-                    writer = csv.writer(csvfile, quotechar='"', quoting=csv.QUOTE_ALL)
-                    writer.writerow(header)
-                    writer.writerows(rows)
-                
-                files_created += 1
+                writer.write_partition(split_key, rows)
                 
                 # Report file creation
-                split_display = self._format_split_display(split_key, split_by_fields)
-                self._report_progress(f"Created file for {split_display} with {len(rows)} rows")
+                progress.add(lambda: (
+                    f"Created file for {self._format_split_display(split_key, partition_fields)} "
+                    f"with {len(rows)} rows"
+                ))
                 
             except Exception as e:
                 raise FileOperationError(f"Error writing output file: {str(e)}")
         
-        return files_created
+        progress.flush()
+        return writer
+    
+    def _complete_buckets(
+        self,
+        writers: List[PartitionFileWriter],
+        bucketer: KeyBucketer,
+        result: ProcessingResult
+    ) -> None:
+        """Create header-only files for empty buckets and list partitions in bucket order."""
+        written: Dict[Tuple, List[PartitionInfo]] = {}
+        for writer in writers:
+            for info in writer.files:
+                written.setdefault(info.split_key, []).append(info)
+        for partition_key in bucketer.partition_keys():
+            if partition_key not in written:
+                writers[0].write_partition(partition_key, [])
+                written[partition_key] = [writers[0].partitions[partition_key]]
+        result.partitions = [
+            info for partition_key in bucketer.partition_keys() for info in written[partition_key]
+        ]
+        result.bucket_keys = bucketer.key_counts()
+    
+    def _write_run_report(
+        self,
+        result: ProcessingResult,
+        source_file: str,
+        output_dir: str,
+        split_by_fields: List[str],
+        included_fields: List[str]
+    ) -> None:
+        """Write the run metrics as a JSON report next to the outputs."""
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'source_file': self._source_name(source_file),
+            'output_dir': os.path.abspath(output_dir),
+            'split_by_fields': split_by_fields,
+            'included_fields': included_fields,
+            'dialect': self._source_dialect(source_file).to_dict(),
+            'result': result.to_dict(),
+        }
+        report_path = os.path.join(output_dir, Config.RUN_REPORT_FILENAME)
+        temp_path = report_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding=Config.DEFAULT_ENCODING) as f:
+                json.dump(report, f, indent=2)
+            os.replace(temp_path, report_path)
+        except OSError as e:
+            raise FileOperationError(f"Error writing run report: {str(e)}")
+        self.logger.info(f"Run report written to {report_path}")
+    
+    def _write_manifest(
+        self, result: ProcessingResult, output_dir: str, split_by_fields: List[str]
+    ) -> None:
+        """Write the per-partition manifest as CSV in a single bulk write."""
+        manifest_path = os.path.join(output_dir, Config.MANIFEST_FILENAME)
+        temp_path = manifest_path + '.tmp'
+        columns = ['file', 'rows', 'bytes']
+        rows = [
+            list(partition.split_key) + [
+                os.path.relpath(partition.path, output_dir), partition.rows, partition.bytes_written
+            ]
+            for partition in result.partitions
+        ]
+        if any(partition.part is not None for partition in result.partitions):
+            columns.append('part')
+            for row, partition in zip(rows, result.partitions):
+                row.append(partition.part)
+        if result.bucket_keys:
+            columns.append('keys')
+            for row, partition in zip(rows, result.partitions):
+                row.append(result.bucket_keys[int(partition.split_key[0])])
+        try:
+            with open(temp_path, 'w', newline='', encoding=Config.DEFAULT_ENCODING) as f:
+                writer = csv.writer(f)
+                writer.writerow(list(split_by_fields) + columns)
+                writer.writerows(rows)
+            os.replace(temp_path, manifest_path)
+        except OSError as e:
+            raise FileOperationError(f"Error writing manifest: {str(e)}")
+        self.logger.info(f"Manifest of {len(rows)} partitions written to {manifest_path}")
+    
+    def _partition_path_for(
+        self,
+        source_file: str,
+        output_dir: str,
+        split_by_fields: List[str],
+        bucketer: Optional[KeyBucketer] = None,
+        layout: str = "flat"
+    ) -> Callable[[Tuple], str]:
+        """Return the function mapping a partition key to its own output file path."""
+        if layout == "hive":
+            fields = self._partition_fields(split_by_fields, bucketer)
+            filename = f"{self._clean_stem(source_file)}{Config.CSV_EXTENSION}"
+            return UniquePaths(HiveLayout(output_dir, fields, filename).path_for)
+        if bucketer:
+            stem = self._clean_stem(source_file)
+            return UniquePaths(lambda split_key: os.path.join(
+                output_dir, bucketer.filename(split_key[0], stem, Config.CSV_EXTENSION)
+            ))
+        return UniquePaths(lambda split_key: os.path.join(
+            output_dir, self._generate_filename(source_file, split_key, split_by_fields)
+        ))
+    
+    def _member_name_for(
+        self,
+        source_file: Union[str, StreamSource],
+        split_by_fields: List[str],
+        bucketer: Optional[KeyBucketer] = None,
+        layout: str = "flat"
+    ) -> Callable[[Tuple], str]:
+        """Return the function mapping a partition key to its archive member name."""
+        filename = f"{self._clean_stem(source_file)}{Config.CSV_EXTENSION}"
+        if layout == "hive":
+            fields = self._partition_fields(split_by_fields, bucketer)
+            prefixes = [hive_escape(field) + "=" for field in fields]
+            return lambda split_key: "/".join(
+                [prefix + hive_escape(str(value)) for prefix, value in zip(prefixes, split_key)]
+                + [filename]
+            )
+        if bucketer:
+            stem = self._clean_stem(source_file)
+            return lambda split_key: bucketer.filename(split_key[0], stem, Config.CSV_EXTENSION)
+        return lambda split_key: self._generate_filename(source_file, split_key, split_by_fields)
     
     def _generate_filename(self, source_file: str, split_key: Tuple, split_by_fields: List[str]) -> str:
-        """Generate a clean filename from split key values and original filename."""
-        # Extract original filename without extension
-        original_filename = Path(source_file).stem
-        
+        """
+        Generate a clean filename from split key values and original filename.
+
+        Different keys can clean to the same name (a/b and ab) or to names
+        differing only in case; the UniquePaths wrapped around this numbers
+        every later one, so each key still gets a file of its own.
+        """
         # Create split value parts (concatenated with dashes)
         split_values = []
         for i, value in enumerate(split_key):
@@ -234,13 +1911,29 @@ class CSVProcessor:
         # Join split values with dashes
         split_part = "-".join(split_values)
         
-        # Clean original filename
-        clean_original = "".join(c for c in original_filename if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        clean_original = clean_original if clean_original else "file"
+        clean_original = self._clean_stem(source_file)
         
         # Combine: SplitByValue1-SplitByValue2_OriginalFileName.csv
         return f"{split_part}_{clean_original}{Config.CSV_EXTENSION}"
     
+    def _source_name(self, source_file: Union[str, StreamSource]) -> str:
+        """Absolute path of a source file, or the name of a stream source."""
+        if isinstance(source_file, StreamSource):
+            return source_file.name
+        return os.path.abspath(source_file)
+    
+    def _source_dialect(self, source_file: Union[str, StreamSource]) -> CSVDialect:
+        """Dialect of a source file or an already opened stream source."""
+        if isinstance(source_file, StreamSource):
+            return source_file.detect_dialect()
+        return detect_dialect(source_file)
+    
+    def _clean_stem(self, source_file: Union[str, StreamSource]) -> str:
+        """Return the source filename without extension, reduced to safe characters."""
+        original_filename = Path(self._source_name(source_file)).stem
+        clean_original = "".join(c for c in original_filename if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        return clean_original if clean_original else "file"
+    
     def _format_split_display(self, split_key: Tuple, split_by_fields: List[str]) -> str:
         """Format split key for display purposes."""
         return " + ".join([f"{split_by_fields[i]}='{split_key[i]}'" for i in range(len(split_key))])
@@ -255,7 +1948,7 @@ class CSVProcessor:
     @staticmethod
     def get_csv_headers(file_path: str) -> List[str]:
         """
-        Extract headers from CSV file.
+        Extract headers from CSV file using its detected dialect.
         
         Args:
             file_path: Path to the CSV file
@@ -268,10 +1961,9 @@ class CSVProcessor:
             ProcessingError: If CSV format is invalid
         """
         try:
-            with open(file_path, 'r', newline='', encoding=Config.DEFAULT_ENCODING) as csvfile:
-                reader = csv.reader(csvfile)
-                headers = next(reader)
-                return headers
+            return read_header(file_path, detect_dialect(file_path))
+        except FileOperationError:
+            raise
         except FileNotFoundError:
             raise FileOperationError(f"File not found: {file_path}")
         except PermissionError:
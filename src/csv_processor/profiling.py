@@ -0,0 +1,192 @@
+"""
+Phase profiling and instrumentation hooks for CSV processing.
+
+The processor always runs through these hooks. When profiling is off it
+uses NULL_PROFILER, whose phases are a shared no-op context manager
+entered once per batch or partition, so the hooks can stay in place in
+production at negligible cost.
+"""
+
+import contextlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .exceptions import ValidationError
+
+
+PHASES: Tuple[str, ...] = (
+    "open",        # Format detection, opening the source and reading the header
+    "parse",       # Decoding and parsing row batches
+    "key_build",   # Building split keys from each row
+    "projection",  # Selecting the included fields
+    "routing",     # Appending rows to their partition
+    "encoding",    # Formatting rows as CSV and encoding to bytes
+    "write",       # Opening output files and writing bytes
+    "close",       # Closing output files
+)
+
+CAPTURE_MODES: Tuple[str, ...] = ("cprofile", "tracemalloc")
+
+
+class ProcessingHooks:
+    """
+    Optional callbacks invoked from the processing hot path.
+
+    Args:
+        on_chunk: Called after each parsed batch as ``on_chunk(batch_rows, total_rows)``
+        on_partition_open: Called when an output partition is opened as
+            ``on_partition_open(split_key, path)``
+        on_flush: Called after rows are written to a partition as
+            ``on_flush(split_key, rows, bytes_written)``
+    """
+
+    def __init__(
+        self,
+        on_chunk: Optional[Callable[[int, int], None]] = None,
+        on_partition_open: Optional[Callable[[Tuple, str], None]] = None,
+        on_flush: Optional[Callable[[Tuple, int, int], None]] = None
+    ):
+        self.on_chunk = on_chunk
+        self.on_partition_open = on_partition_open
+        self.on_flush = on_flush
+
+
+class _NullPhase:
+    """Reusable no-op context manager."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+class NullProfiler:
+    """Profiler used when profiling is off; every operation is a no-op."""
+
+    enabled = False
+    _phase = _NullPhase()
+
+    def phase(self, name: str) -> _NullPhase:
+        return self._phase
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator[None]:
+        yield
+
+    def reset(self) -> None:
+        pass
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class PhaseProfiler:
+    """
+    Records wall and CPU time spent in each processing phase.
+
+    CPU time is measured per thread, so phases running on writer threads
+    are attributed correctly. An optional cProfile or tracemalloc capture
+    of the whole run can be written to capture_file.
+    """
+
+    enabled = True
+
+    def __init__(self, capture: Optional[str] = None, capture_file: Optional[str] = None):
+        """
+        Initialize phase profiler.
+
+        Args:
+            capture: Optional "cprofile" or "tracemalloc" capture of the whole run
+            capture_file: File the capture is written to (required with capture)
+        """
+        if capture is not None and capture not in CAPTURE_MODES:
+            raise ValidationError(
+                f"Unknown profile capture '{capture}'. Choose one of: {', '.join(CAPTURE_MODES)}"
+            )
+        if capture is not None and not capture_file:
+            raise ValidationError("A capture file is required for profile capture")
+
+        self.capture_mode = capture
+        self.capture_file = capture_file
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded timings."""
+        with self._lock:
+            self._wall: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+            self._cpu: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+            self._calls: Dict[str, int] = dict.fromkeys(PHASES, 0)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as part of the named phase."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            with self._lock:
+                self._wall[name] = self._wall.get(name, 0.0) + wall
+                self._cpu[name] = self._cpu.get(name, 0.0) + cpu
+                self._calls[name] = self._calls.get(name, 0) + 1
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator[None]:
+        """Run the enclosed block under the configured cProfile or tracemalloc capture."""
+        if self.capture_mode == "cprofile":
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                profile.dump_stats(self.capture_file)
+        elif self.capture_mode == "tracemalloc":
+            import tracemalloc
+            already_tracing = tracemalloc.is_tracing()
+            if not already_tracing:
+                tracemalloc.start()
+            try:
+                yield
+            finally:
+                tracemalloc.take_snapshot().dump(self.capture_file)
+                if not already_tracing:
+                    tracemalloc.stop()
+        else:
+            yield
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return recorded timings.
+
+        Returns:
+            Mapping of phase name to ``wall_s``, ``cpu_s`` and ``calls``
+        """
+        with self._lock:
+            return {
+                name: {
+                    'wall_s': self._wall[name], 'cpu_s': self._cpu[name], 'calls': self._calls[name]
+                }
+                for name in self._wall
+            }
+
+    def format_report(self) -> str:
+        """Format recorded timings as a table for logging."""
+        report = self.report()
+        total = sum(entry['wall_s'] for entry in report.values()) or 1.0
+        lines = [f"{'phase':<12} {'wall s':>10} {'cpu s':>10} {'share':>7} {'calls':>9}"]
+        for name, entry in report.items():
+            lines.append(
+                f"{name:<12} {entry['wall_s']:>10.3f} {entry['cpu_s']:>10.3f} "
+                f"{entry['wall_s'] / total:>7.1%} {entry['calls']:>9}"
+            )
+        return "\n".join(lines)
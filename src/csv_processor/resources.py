@@ -0,0 +1,109 @@
+"""
+Process resource measurements used in run metrics.
+
+The resident set size and the open descriptors belong to the whole
+process, which may run many splits over its lifetime, as the service and
+the job runner do. A ResourceSampler therefore reads them when a run
+starts and samples them while it goes on, so run metrics report how much
+a run added rather than process-wide totals.
+"""
+
+import os
+import threading
+from typing import Optional
+
+from .config import Config
+
+
+def current_rss_bytes() -> Optional[int]:
+    """
+    Return the current resident set size of this process in bytes.
+
+    Returns:
+        Current RSS, or None where it cannot be read cheaply
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def open_fd_count() -> Optional[int]:
+    """
+    Return the number of file descriptors open in this process.
+
+    Returns:
+        Open descriptor count, or None where it cannot be listed cheaply
+    """
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(fd_dir))
+        except OSError:
+            continue
+    return None
+
+
+class ResourceSampler:
+    """Samples RSS and open descriptors during one run, relative to their level when it started."""
+
+    def __init__(self, interval: float = Config.RESOURCE_SAMPLE_INTERVAL):
+        """
+        Initialize resource sampler and take the baseline readings.
+
+        Args:
+            interval: Seconds between samples taken by the background thread
+        """
+        self.interval = interval
+        self.baseline_rss = current_rss_bytes()
+        self.baseline_fds = open_fd_count()
+        self.peak_rss = self.baseline_rss
+        self.peak_fds = self.baseline_fds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def rss_growth(self) -> Optional[int]:
+        """Largest sampled growth of the RSS over the baseline, or None where RSS is unavailable."""
+        if self.baseline_rss is None:
+            return None
+        return self.peak_rss - self.baseline_rss
+
+    @property
+    def fd_growth(self) -> Optional[int]:
+        """Largest sampled growth of open descriptors over the baseline, or None if unavailable."""
+        if self.baseline_fds is None:
+            return None
+        return self.peak_fds - self.baseline_fds
+
+    def sample(self) -> None:
+        """Take one reading of both measurements."""
+        if self.baseline_rss is not None:
+            rss = current_rss_bytes()
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss, rss)
+        if self.baseline_fds is not None:
+            fds = open_fd_count()
+            if fds is not None:
+                self.peak_fds = max(self.peak_fds, fds)
+
+    def start(self) -> "ResourceSampler":
+        """Start sampling in a background thread until stop() is called."""
+        if self.baseline_rss is not None or self.baseline_fds is not None:
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background thread, if any, and take a final reading."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.sample()
+
+    def _run(self) -> None:
+        """Sample until stop() is called."""
+        while not self._stop.wait(self.interval):
+            self.sample()
@@ -0,0 +1,370 @@
+"""
+Local HTTP service accepting split jobs, built on the stdlib http.server.
+
+A long-running service avoids paying interpreter start-up and imports
+for every split. Jobs naming a local source file are put on the
+persistent JobQueue and run by a JobRunner; uploaded CSV data, sent with
+a Content-Length or chunked transfer encoding, is split as it arrives
+without being written to disk first.
+
+Endpoints:
+    POST   /jobs                  Queue a split of a local file (JSON body)
+    GET    /jobs[?status=S]       List jobs
+    GET    /jobs/<id>             Status, progress and ProcessingResult metrics of a job
+    DELETE /jobs/<id>             Cancel a queued job
+    POST   /uploads?name=...      Split the request body; returns the finished job
+
+The service has no authentication and writes wherever a request asks, so
+it binds to localhost by default.
+
+Usage:
+    python -m csv_processor.service [--host HOST] [--port PORT] [--queue jobs.db]
+"""
+
+import argparse
+import io
+import json
+import logging
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .config import Config
+from .exceptions import FileOperationError, ProcessingError, ValidationError
+from .jobs import JOB_STATUSES, JobQueue, JobRunner, decode_options, progress_recorder
+from .processor import CSVProcessor, ProcessingResult
+from .streams import StreamSource
+
+
+class _LengthReader(io.RawIOBase):
+    """Request body of a known length."""
+
+    def __init__(self, rfile: Any, length: int):
+        self._rfile = rfile
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        data = self._rfile.read(min(len(buffer), self._remaining))
+        if not data:
+            raise ProcessingError("Upload ended before its Content-Length")
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class _ChunkedReader(io.RawIOBase):
+    """Request body sent with Transfer-Encoding: chunked, decoded as it is read."""
+
+    def __init__(self, rfile: Any):
+        self._rfile = rfile
+        self._remaining = 0
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._done:
+            return 0
+        if self._remaining == 0:
+            line = self._rfile.readline(Config.SERVICE_MAX_LINE)
+            try:
+                size = int(line.split(b';', 1)[0].strip(), 16)
+            except ValueError:
+                raise ProcessingError(f"Invalid chunk size line in upload: {line[:40]!r}")
+            if size == 0:
+                # Skip trailer headers up to the blank line
+                while self._rfile.readline(Config.SERVICE_MAX_LINE) not in (b'\r\n', b'\n', b''):
+                    pass
+                self._done = True
+                return 0
+            self._remaining = size
+        data = self._rfile.read(min(len(buffer), self._remaining))
+        if not data:
+            raise ProcessingError("Upload ended inside a chunk")
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        if self._remaining == 0:
+            self._rfile.readline(Config.SERVICE_MAX_LINE)
+        return len(data)
+
+
+def _field_list(values: List[str]) -> List[str]:
+    """Query parameter values, each possibly comma-separated, as one list."""
+    return [field for value in values for field in value.split(',') if field]
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the JobService owning the server."""
+
+    server_version = "csv-processor"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> 'JobService':
+        return self.server.service
+
+    def log_message(self, format: str, *args: Any) -> None:
+        self.service.logger.info(f"{self.address_string()} {format % args}")
+
+    def do_GET(self) -> None:
+        self._dispatch(self._get)
+
+    def do_POST(self) -> None:
+        self._dispatch(self._post)
+
+    def do_DELETE(self) -> None:
+        self._dispatch(self._delete)
+
+    def _dispatch(self, handler) -> None:
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = parse_qs(url.query)
+        try:
+            status, body = handler(parts, query)
+        except ValidationError as e:
+            status, body = 400, {'error': str(e)}
+        except (FileOperationError, ProcessingError) as e:
+            status, body = 500, {'error': str(e)}
+        except Exception as e:
+            # Always answer; the request body may be only partly read
+            self.service.logger.exception(f"Unexpected error handling {self.command} {self.path}")
+            self.close_connection = True
+            status, body = 500, {'error': f"Unexpected error: {str(e)}"}
+        self._send_json(status, body)
+
+    def _send_json(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _content_length(self) -> Optional[int]:
+        """Content-Length of the request, or None if it has none."""
+        value = self.headers.get('Content-Length')
+        if value is None:
+            return None
+        try:
+            length = int(value)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be delimited, so the connection cannot be reused
+            self.close_connection = True
+            raise ValidationError(f"Invalid Content-Length header: {value!r}")
+        return length
+
+    def _job_id(self, parts: List[str]) -> Optional[int]:
+        if len(parts) == 2 and parts[0] == 'jobs' and parts[1].isdigit():
+            return int(parts[1])
+        return None
+
+    def _get(self, parts: List[str], query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        if parts == ['jobs']:
+            status = query.get('status', [None])[0]
+            if status is not None and status not in JOB_STATUSES:
+                raise ValidationError(
+                    f"Unknown job status '{status}'. Choose one of: {', '.join(JOB_STATUSES)}"
+                )
+            return 200, [job.to_dict() for job in self.service.queue.list_jobs(status)]
+        job_id = self._job_id(parts)
+        job = self.service.queue.get(job_id) if job_id is not None else None
+        if job is None:
+            return 404, {'error': f"No such resource: {self.path}"}
+        return 200, job.to_dict()
+
+    def _delete(self, parts: List[str], query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        job_id = self._job_id(parts)
+        if job_id is None or self.service.queue.get(job_id) is None:
+            return 404, {'error': f"No such resource: {self.path}"}
+        if not self.service.queue.cancel(job_id):
+            return 409, {'error': f"Job {job_id} has already started"}
+        return 200, self.service.queue.get(job_id).to_dict()
+
+    def _post(self, parts: List[str], query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        if parts == ['jobs']:
+            return self._submit()
+        if parts == ['uploads']:
+            return self._upload(query)
+        self.close_connection = True
+        return 404, {'error': f"No such resource: {self.path}"}
+
+    def _submit(self) -> Tuple[int, Any]:
+        length = self._content_length() or 0
+        if length > Config.SERVICE_MAX_JSON_BYTES:
+            self.close_connection = True
+            raise ValidationError(
+                f"Job description larger than {Config.SERVICE_MAX_JSON_BYTES} bytes"
+            )
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+            job_id = self.service.queue.submit(
+                request['source_file'], request['output_dir'], request['split_by_fields'],
+                request['included_fields'], request.get('priority', 0), **request.get('options', {})
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValidationError(f"Invalid job description: {e}")
+        self.service.runner.wake()
+        return 202, self.service.queue.get(job_id).to_dict()
+
+    def _upload(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        # The body is only partly read if the split fails early
+        self.close_connection = True
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = _ChunkedReader(self.rfile)
+        else:
+            length = self._content_length()
+            if length is None:
+                raise ValidationError("Uploads need a Content-Length or chunked transfer encoding")
+            body = _LengthReader(self.rfile, length)
+        try:
+            options = json.loads(query['options'][0]) if 'options' in query else {}
+            output_dir = query['output_dir'][0]
+        except (ValueError, KeyError) as e:
+            raise ValidationError(f"Invalid upload parameters: {e}")
+        name = query.get('name', ['upload.csv'])[0]
+        job = self.service.run_upload(
+            StreamSource(body, name), output_dir, _field_list(query.get('split_by', [])),
+            _field_list(query.get('include', [])), options
+        )
+        return (200 if job['status'] == 'succeeded' else 422), job
+
+
+class JobService:
+    """HTTP front end to a JobQueue, with a JobRunner running its jobs."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        host: str = Config.SERVICE_HOST,
+        port: int = Config.SERVICE_PORT,
+        workers: int = Config.JOB_WORKERS,
+        processor_factory=CSVProcessor
+    ):
+        """
+        Initialize job service.
+
+        Args:
+            queue: Job queue storing submitted and uploaded jobs
+            host: Address to listen on
+            port: Port to listen on; 0 picks a free port
+            workers: Queued jobs run at once
+            processor_factory: Creates the CSVProcessor of each job
+
+        Raises:
+            FileOperationError: If the address cannot be bound
+        """
+        self.queue = queue
+        self.processor_factory = processor_factory
+        self.runner = JobRunner(queue, workers=workers, processor_factory=processor_factory)
+        self.logger = logging.getLogger(__name__)
+        try:
+            self.server = ThreadingHTTPServer((host, port), _JobRequestHandler)
+        except OSError as e:
+            raise FileOperationError(f"Cannot listen on {host}:{port}: {e}")
+        self.server.daemon_threads = True
+        self.server.service = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Host and port the service listens on."""
+        return self.server.server_address[:2]
+
+    def start(self) -> None:
+        """Start the job runner and serve requests on a background thread."""
+        self.runner.start()
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="job-service", daemon=True
+        )
+        self._thread.start()
+        self.logger.info(f"Job service listening on http://{self.address[0]}:{self.address[1]}")
+
+    def serve_forever(self) -> None:
+        """Start the job runner and serve requests until interrupted."""
+        self.runner.start()
+        self.logger.info(f"Job service listening on http://{self.address[0]}:{self.address[1]}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """Stop serving, wait for running jobs and close the socket."""
+        self.server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.close()
+
+    def close(self) -> None:
+        self.runner.stop()
+        self.server.server_close()
+
+    def run_upload(
+        self,
+        source: StreamSource,
+        output_dir: str,
+        split_by_fields: Sequence[str],
+        included_fields: Sequence[str],
+        options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Split an uploaded stream on the calling thread, recording it as a job.
+
+        Returns:
+            The finished job as a dictionary
+        """
+        job_id = self.queue.begin(
+            f"upload:{source.name}", output_dir, split_by_fields, included_fields,
+            self.runner.runner_id, **options
+        )
+        try:
+            processor_kwargs, split_kwargs = decode_options(self.queue.get(job_id).options)
+            processor = self.processor_factory(
+                progress_callback=progress_recorder(self.queue, job_id), **processor_kwargs
+            )
+            result = processor.split_csv_by_fields(
+                source, output_dir, list(split_by_fields), list(included_fields), **split_kwargs
+            )
+        except Exception as e:
+            result = ProcessingResult(success=False, error=f"Unexpected error: {str(e)}")
+        self.queue.finish(job_id, result, self.runner.runner_id)
+        return self.queue.get(job_id).to_dict()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point of the job service."""
+    parser = argparse.ArgumentParser(description="Serve split jobs over HTTP.")
+    parser.add_argument('--host', default=Config.SERVICE_HOST, help="Address to listen on")
+    parser.add_argument('--port', type=int, default=Config.SERVICE_PORT, help="Port to listen on")
+    parser.add_argument('--queue', default=Config.JOB_QUEUE_PATH,
+                        help="Job database (default: per-user cache)")
+    parser.add_argument('--workers', type=int, default=Config.JOB_WORKERS,
+                        help="Queued jobs run at once")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format=Config.LOG_FORMAT, datefmt=Config.LOG_DATE_FORMAT
+    )
+    service = JobService(JobQueue(args.queue), host=args.host, port=args.port, workers=args.workers)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""
+External merge sort of rows within each output partition.
+
+SortingWriter sits in front of a PartitionFileWriter. It buffers each
+partition's rows with their typed sort keys; when the buffered rows
+exceed the memory budget, the largest buffers are sorted and spilled to
+temporary run files. When the input ends, every partition's runs and
+remaining buffer are combined with a k-way heap merge and streamed to
+the partition writer.
+"""
+
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .config import Config
+from .exceptions import ValidationError
+from .memory import estimate_rows_bytes, spill_batch_rows
+from .profiling import NULL_PROFILER
+from .writers import PartitionFileWriter, PartitionInfo
+
+
+SORT_KINDS: Tuple[str, ...] = ("string", "numeric", "date")
+
+SortItem = Tuple[Tuple, Sequence[str]]
+
+
+class SortColumn:
+    """A column to sort by, with the type its values are compared as."""
+
+    def __init__(
+        self,
+        field: str,
+        kind: str = "string",
+        descending: bool = False,
+        date_format: Optional[str] = None
+    ):
+        """
+        Initialize sort column.
+
+        Args:
+            field: Field name
+            kind: "string", "numeric" or "date"
+            descending: Sort largest values first
+            date_format: strptime format for date columns; ISO 8601 when omitted
+
+        Raises:
+            ValidationError: If kind is unknown
+        """
+        if kind not in SORT_KINDS:
+            raise ValidationError(
+                f"Unknown sort type '{kind}'. Choose one of: {', '.join(SORT_KINDS)}"
+            )
+        self.field = field
+        self.kind = kind
+        self.descending = descending
+        self.date_format = date_format
+
+    def __repr__(self) -> str:
+        return f"SortColumn({self.field!r}, kind={self.kind!r}, descending={self.descending})"
+
+
+class _Descending:
+    """Inverts the ordering of a string so it can share a key tuple with ascending columns."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+    def __reduce__(self):
+        return (_Descending, (self.value,))
+
+
+def _date_seconds(value: str, date_format: Optional[str]) -> float:
+    """Parse a date or datetime to seconds since 0001-01-01 (UTC for aware values)."""
+    parsed = datetime.strptime(value, date_format) if date_format else datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return (parsed - datetime.min).total_seconds()
+
+
+def _column_key(column: SortColumn, index: int) -> Callable[[Sequence[str]], Tuple]:
+    """
+    Build the key function of one column.
+
+    Numeric and date values that are empty or fail to parse sort after all
+    valid values, in either direction, ordered by their raw text.
+    """
+    if column.kind == "string":
+        if column.descending:
+            return lambda row: (_Descending(row[index]),)
+        return lambda row: (row[index],)
+
+    if column.kind == "numeric":
+        convert = float
+    else:
+        date_format = column.date_format
+        convert = lambda value: _date_seconds(value, date_format)
+    sign = -1.0 if column.descending else 1.0
+
+    def key(row: Sequence[str]) -> Tuple:
+        value = row[index]
+        try:
+            number = convert(value)
+        except (TypeError, ValueError):
+            return (1, value)
+        if number != number:
+            # NaN compares false with everything; keep it with the invalid values
+            return (1, value)
+        return (0, sign * number)
+    return key
+
+
+def build_sort_key(
+    columns: Sequence[SortColumn], header: List[str]
+) -> Callable[[Sequence[str]], Tuple]:
+    """
+    Build the sort key function for rows laid out as header.
+
+    Raises:
+        ValidationError: If a sort field is not in the header
+    """
+    missing = [column.field for column in columns if column.field not in header]
+    if missing:
+        raise ValidationError(f"Sort fields must be included in the output: {', '.join(missing)}")
+    keys = [_column_key(column, header.index(column.field)) for column in columns]
+    if len(keys) == 1:
+        return keys[0]
+    return lambda row: tuple(part for key in keys for part in key(row))
+
+
+def normalize_sort_columns(sort_by: Sequence[Union[str, SortColumn]]) -> List[SortColumn]:
+    """Accept field names as string columns alongside SortColumn objects."""
+    return [column if isinstance(column, SortColumn) else SortColumn(column) for column in sort_by]
+
+
+class _SpilledRun:
+    """A sorted run of (key, row) items pickled to a temporary file in batches."""
+
+    def __init__(self, path: str, items: int, row_bytes: float):
+        self.path = path
+        self.items = items
+        self.row_bytes = row_bytes
+
+    @classmethod
+    def write(
+        cls, path: str, items: Iterator[SortItem], batch_rows: int, row_bytes: float
+    ) -> "_SpilledRun":
+        count = 0
+        with open(path, 'wb') as f:
+            batch: List[SortItem] = []
+            for item in items:
+                batch.append(item)
+                if len(batch) >= batch_rows:
+                    pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+                count += len(batch)
+        return cls(path, count, row_bytes)
+
+    def read(self) -> Iterator[SortItem]:
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def remove(self) -> None:
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class SortingWriter:
+    """
+    Sorts every partition before handing its rows to a PartitionFileWriter.
+
+    Exposes the append/close_all/abort interface of PartitionFileWriter, so
+    it can be used wherever a streaming partition writer is expected.
+    Nothing is written to the output until close_all(); abort() after a
+    failure discards the buffers and spilled runs without merging them.
+
+    Runs are pickled in batches sized from the memory budget at the time,
+    so that merging SORT_MERGE_FAN_IN of them stays within it.
+    """
+
+    def __init__(
+        self,
+        writer: PartitionFileWriter,
+        sort_key: Callable[[Sequence[str]], Tuple],
+        memory_budget: int = Config.SORT_MEMORY_BUDGET,
+        temp_dir: Optional[str] = Config.SPILL_TEMP_DIR,
+        profiler=NULL_PROFILER,
+        memory_check: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Initialize sorting writer.
+
+        Args:
+            writer: Partition writer receiving the sorted rows
+            sort_key: Function computing a row's sort key
+            memory_budget: Approximate bytes of buffered rows before spilling
+            temp_dir: Directory for spilled runs; the system default when None
+            profiler: Phase profiler recording sort time
+            memory_check: Optional function called after every block the
+                merge writes, such as a memory governor's check
+        """
+        self.writer = writer
+        self.sort_key = sort_key
+        self.memory_budget = memory_budget
+        self.temp_dir = temp_dir
+        self.profiler = profiler
+        self.memory_check = memory_check
+        self.runs_spilled = 0
+        self.peak_merge_files = 0
+        self._buffers: Dict[Tuple, List[SortItem]] = {}
+        self._buffer_bytes: Dict[Tuple, int] = {}
+        self._buffered = 0
+        self._runs: Dict[Tuple, List[_SpilledRun]] = {}
+        self._spill_dir: Optional[str] = None
+        self._run_count = 0
+
+    @property
+    def partitions(self) -> Dict[Tuple, PartitionInfo]:
+        return self.writer.partitions
+
+    @property
+    def files(self) -> List[PartitionInfo]:
+        return self.writer.files
+
+    @property
+    def bytes_written(self) -> int:
+        return self.writer.bytes_written
+
+    @property
+    def peak_open_files(self) -> int:
+        return self.writer.peak_open_files + self.peak_merge_files
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Approximate bytes of rows buffered in memory."""
+        return self._buffered
+
+    def write_partition(self, split_key: Tuple, rows: Sequence[Sequence[str]]) -> str:
+        """Sort and write a complete partition directly, bypassing the buffers."""
+        sort_key = self.sort_key
+        with self.profiler.phase("sort"):
+            ordered = sorted(rows, key=sort_key)
+        return self.writer.write_partition(split_key, ordered)
+
+    def append(self, split_key: Tuple, rows: Sequence[Sequence[str]]) -> None:
+        """Buffer rows of a partition, spilling sorted runs when over budget."""
+        if not rows:
+            if split_key not in self._buffers:
+                self._buffers[split_key] = []
+                self._buffer_bytes[split_key] = 0
+            return
+        with self.profiler.phase("sort"):
+            sort_key = self.sort_key
+            items = [(sort_key(row), row) for row in rows]
+        buffer = self._buffers.get(split_key)
+        if buffer is None:
+            buffer = self._buffers[split_key] = []
+            self._buffer_bytes[split_key] = 0
+        buffer.extend(items)
+        size = estimate_rows_bytes(rows)
+        self._buffer_bytes[split_key] += size
+        self._buffered += size
+        if self._buffered > self.memory_budget:
+            self._spill()
+
+    def close_all(self) -> None:
+        """Merge and write every partition, then close the partition writer."""
+        try:
+            for split_key in list(self._buffers):
+                self._merge_partition(split_key)
+        finally:
+            self.writer.close_all()
+            self._cleanup()
+
+    def abort(self) -> None:
+        """Discard buffered rows and spilled runs after a failed run and close the writer."""
+        self._buffers.clear()
+        self._buffer_bytes.clear()
+        self._buffered = 0
+        try:
+            self.writer.abort()
+        finally:
+            self._cleanup()
+
+    def _spill(self) -> None:
+        """Spill the largest buffers as sorted runs until under half the budget."""
+        target = self.memory_budget // 2
+        for split_key in sorted(self._buffer_bytes, key=self._buffer_bytes.get, reverse=True):
+            if self._buffered <= target:
+                break
+            buffer = self._buffers[split_key]
+            if not buffer:
+                continue
+            row_bytes = self._buffer_bytes[split_key] / len(buffer)
+            batch_rows = spill_batch_rows(self.memory_budget, Config.SORT_MERGE_FAN_IN, row_bytes)
+            with self.profiler.phase("sort"):
+                buffer.sort(key=itemgetter(0))
+                run = _SpilledRun.write(self._run_path(), iter(buffer), batch_rows, row_bytes)
+                self._runs.setdefault(split_key, []).append(run)
+            self.runs_spilled += 1
+            self._buffered -= self._buffer_bytes[split_key]
+            self._buffers[split_key] = []
+            self._buffer_bytes[split_key] = 0
+
+    def _merge_partition(self, split_key: Tuple) -> None:
+        """Merge a partition's spilled runs and buffer and write the result."""
+        buffer = self._buffers.pop(split_key)
+        self._buffered -= self._buffer_bytes.pop(split_key)
+        runs = self._runs.pop(split_key, [])
+        with self.profiler.phase("sort"):
+            buffer.sort(key=itemgetter(0))
+            # Merge consecutive runs in passes to bound the files open at once
+            fan_in = max(2, Config.SORT_MERGE_FAN_IN)
+            while len(runs) >= fan_in:
+                runs = [
+                    self._merge_runs(runs[start:start + fan_in])
+                    for start in range(0, len(runs), fan_in)
+                ]
+        self.peak_merge_files = max(self.peak_merge_files, len(runs))
+
+        # Earlier runs come first so that equal keys keep their source order
+        sources = [run.read() for run in runs] + [iter(buffer)]
+        merged_items = heapq.merge(*sources, key=itemgetter(0)) if runs else iter(buffer)
+
+        block_rows = Config.WRITE_BLOCK_ROWS
+        block: List[Sequence[str]] = []
+        wrote = False
+        memory_check = self.memory_check
+        for _, row in merged_items:
+            block.append(row)
+            if len(block) >= block_rows:
+                self.writer.append(split_key, block)
+                block = []
+                wrote = True
+                if memory_check is not None:
+                    memory_check()
+        if block or not wrote:
+            self.writer.append(split_key, block)
+        self.writer.close(split_key)
+        for run in runs:
+            run.remove()
+
+    def _merge_runs(self, runs: List[_SpilledRun]) -> _SpilledRun:
+        """Merge consecutive runs into one run file."""
+        if len(runs) == 1:
+            return runs[0]
+        self.peak_merge_files = max(self.peak_merge_files, len(runs) + 1)
+        row_bytes = max(run.row_bytes for run in runs)
+        batch_rows = spill_batch_rows(self.memory_budget, Config.SORT_MERGE_FAN_IN, row_bytes)
+        items = heapq.merge(*(run.read() for run in runs), key=itemgetter(0))
+        merged = _SpilledRun.write(self._run_path(), items, batch_rows, row_bytes)
+        if self.memory_check is not None:
+            self.memory_check()
+        for run in runs:
+            run.remove()
+        return merged
+
+    def _run_path(self) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="csv-sort-", dir=self.temp_dir)
+        self._run_count += 1
+        return os.path.join(self._spill_dir, f"run{self._run_count:06d}.pkl")
+
+    def _cleanup(self) -> None:
+        for runs in self._runs.values():
+            for run in runs:
+                run.remove()
+        self._runs.clear()
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
@@ -0,0 +1,243 @@
+"""
+SQLite output sink: partitions loaded into one database file.
+
+With many distinct split keys, one database is far cheaper to write and
+to query than a small CSV file per key. The database is built in a
+temporary file with journaling and syncing turned off, rows are inserted
+with executemany in large transactions, indexes are created after the
+load, and the finished file then replaces the target.
+"""
+
+import os
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .config import Config
+from .exceptions import FileOperationError, ValidationError
+from .profiling import NULL_PROFILER
+
+
+SQLITE_TABLE_MODES: Tuple[str, ...] = ("single", "per_key")
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLiteSink:
+    """Writes keyed rows into one table with key columns, or one table per key."""
+
+    def __init__(
+        self,
+        database: str,
+        columns: Sequence[str],
+        key_fields: Sequence[str],
+        table: str = Config.SQLITE_TABLE_NAME,
+        mode: str = "single",
+        index_fields: Optional[Sequence[str]] = None,
+        batch_rows: int = Config.SQLITE_BATCH_ROWS,
+        transaction_rows: int = Config.SQLITE_TRANSACTION_ROWS,
+        profiler=NULL_PROFILER
+    ):
+        """
+        Initialize SQLite sink and start building the database.
+
+        Args:
+            database: Path of the SQLite database file to create; an
+                existing file is replaced once the load has finished
+            columns: Names of the row columns
+            key_fields: Names of the split key values
+            table: Table name, or the prefix of the per-key table names
+            mode: "single" writes every row to table, with the key fields
+                as indexed leading columns; "per_key" creates one table per
+                key and lists them in a <table>_partitions table
+            index_fields: Row columns indexed after the load
+            batch_rows: Rows buffered before an executemany call
+            transaction_rows: Rows inserted per transaction
+            profiler: Phase profiler recording write time
+
+        Raises:
+            ValidationError: If the mode or a column name is invalid
+            FileOperationError: If the database cannot be created
+        """
+        if mode not in SQLITE_TABLE_MODES:
+            raise ValidationError(
+                f"Unknown SQLite table mode '{mode}'. "
+                f"Choose one of: {', '.join(SQLITE_TABLE_MODES)}"
+            )
+        self.database = database
+        self.columns = list(columns)
+        self.key_fields = list(key_fields)
+        self.table = table
+        self.mode = mode
+        self.index_fields = list(index_fields or [])
+        self.batch_rows = max(1, batch_rows)
+        self.transaction_rows = max(self.batch_rows, transaction_rows)
+        self.profiler = profiler
+        self.rows_written = 0
+        # Rows and table name of every key, in order of first appearance
+        self.key_rows: Dict[Tuple, int] = {}
+        self.key_tables: Dict[Tuple, str] = {}
+
+        missing = [field for field in self.index_fields if field not in self.columns]
+        if missing:
+            raise ValidationError(
+                f"Index fields not found in the output columns: {', '.join(missing)}"
+            )
+        if mode == "single":
+            # Key fields that are also row columns hold the same value; store them once
+            self._row_positions = [
+                i for i, column in enumerate(self.columns) if column not in self.key_fields
+            ]
+            self._table_columns = self.key_fields + [self.columns[i] for i in self._row_positions]
+        else:
+            self._table_columns = list(self.columns)
+        if len({column.lower() for column in self._table_columns}) != len(self._table_columns):
+            raise ValidationError(
+                "Output column names must be unique, ignoring case, in a SQLite table"
+            )
+
+        self._temp_path = database + '.building'
+        self._pending: Dict[str, List[Tuple]] = {}
+        self._pending_rows = 0
+        self._transaction_rows = 0
+        # Tables and indexes share one namespace, compared ignoring case
+        self._used_names: Set[str] = set()
+        try:
+            directory = os.path.dirname(os.path.abspath(database))
+            os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self._temp_path):
+                os.unlink(self._temp_path)
+            self._conn = sqlite3.connect(self._temp_path, isolation_level=None)
+            # Safe to skip journaling and fsync: the file is discarded unless the load completes
+            self._conn.execute("PRAGMA journal_mode=OFF")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+            self._conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn.execute(f"PRAGMA cache_size=-{Config.SQLITE_CACHE_KIB}")
+            if mode == "single":
+                self._create_table(self._unique_name(table))
+            else:
+                columns_sql = ", ".join(
+                    f"{quote_identifier(field)} TEXT" for field in self.key_fields
+                )
+                self._conn.execute(
+                    f"CREATE TABLE {quote_identifier(self._unique_name(table + '_partitions'))} "
+                    f"({columns_sql}, table_name TEXT NOT NULL, row_count INTEGER NOT NULL)"
+                )
+            self._conn.execute("BEGIN")
+        except (OSError, sqlite3.Error) as e:
+            raise FileOperationError(f"Cannot create SQLite database {database}: {e}")
+
+    def write(self, split_key: Tuple, rows: Sequence[Sequence[str]]) -> None:
+        """Buffer the rows of one key, inserting them once enough rows are buffered."""
+        table = self.key_tables.get(split_key)
+        if table is None:
+            table = self.table if self.mode == "single" else self._new_key_table(split_key)
+            self.key_tables[split_key] = table
+            self.key_rows[split_key] = 0
+        if self.mode == "single":
+            positions = self._row_positions
+            values = [split_key + tuple([row[i] for i in positions]) for row in rows]
+        else:
+            values = [tuple(row) for row in rows]
+        self._pending.setdefault(table, []).extend(values)
+        self.key_rows[split_key] += len(values)
+        self._pending_rows += len(values)
+        if self._pending_rows >= self.batch_rows:
+            self._flush()
+
+    def close(self) -> int:
+        """
+        Insert the remaining rows, build indexes and move the database into place.
+
+        Returns:
+            Size of the database file in bytes
+        """
+        try:
+            self._flush()
+            with self.profiler.phase("write"):
+                if self.mode == "per_key":
+                    placeholders = ", ".join("?" * (len(self.key_fields) + 2))
+                    partitions_table = quote_identifier(self.table + '_partitions')
+                    self._conn.executemany(
+                        f"INSERT INTO {partitions_table} VALUES ({placeholders})",
+                        [key + (self.key_tables[key], rows) for key, rows in self.key_rows.items()]
+                    )
+                self._conn.execute("COMMIT")
+            with self.profiler.phase("close"):
+                self._create_indexes()
+                self._conn.close()
+            os.replace(self._temp_path, self.database)
+        except (OSError, sqlite3.Error) as e:
+            self.abort()
+            raise FileOperationError(f"Error writing SQLite database {self.database}: {e}")
+        return os.path.getsize(self.database)
+
+    def abort(self) -> None:
+        """Discard the partly built database."""
+        try:
+            self._conn.close()
+        except sqlite3.Error:
+            pass
+        if os.path.exists(self._temp_path):
+            os.unlink(self._temp_path)
+
+    def _create_table(self, name: str) -> None:
+        columns_sql = ", ".join(
+            f"{quote_identifier(column)} TEXT" for column in self._table_columns
+        )
+        self._conn.execute(f"CREATE TABLE {quote_identifier(name)} ({columns_sql})")
+
+    def _new_key_table(self, split_key: Tuple) -> str:
+        """Create the table of a new key, named after its values and unique ignoring case."""
+        values = "_".join(
+            "".join(c for c in str(value) if c.isalnum() or c in ('-', '_')) or "empty"
+            for value in split_key
+        )
+        name = self._unique_name(f"{self.table}_{values}")
+        self._create_table(name)
+        return name
+
+    def _unique_name(self, base: str) -> str:
+        """Reserve base, or base with the first free numeric suffix."""
+        name = base
+        suffix = 1
+        while name.lower() in self._used_names:
+            suffix += 1
+            name = f"{base}_{suffix}"
+        self._used_names.add(name.lower())
+        return name
+
+    def _flush(self) -> None:
+        """Insert every buffered row, committing every transaction_rows rows."""
+        if not self._pending_rows:
+            return
+        placeholders = ", ".join("?" * len(self._table_columns))
+        with self.profiler.phase("write"):
+            for table, values in self._pending.items():
+                self._conn.executemany(
+                    f"INSERT INTO {quote_identifier(table)} VALUES ({placeholders})", values
+                )
+            self.rows_written += self._pending_rows
+            self._transaction_rows += self._pending_rows
+            if self._transaction_rows >= self.transaction_rows:
+                self._conn.execute("COMMIT")
+                self._conn.execute("BEGIN")
+                self._transaction_rows = 0
+        self._pending = {}
+        self._pending_rows = 0
+
+    def _create_indexes(self) -> None:
+        """Index the key columns and index_fields once all rows are in place."""
+        tables = [self.table] if self.mode == "single" else list(self.key_tables.values())
+        for table in tables:
+            indexes = [("key", self.key_fields)] if self.mode == "single" else []
+            indexes += [(field, [field]) for field in self.index_fields]
+            for suffix, fields in indexes:
+                index = self._unique_name(f"{table}_{suffix}_idx")
+                self._conn.execute(
+                    f"CREATE INDEX {quote_identifier(index)} ON {quote_identifier(table)} "
+                    f"({', '.join(quote_identifier(field) for field in fields)})"
+                )
@@ -0,0 +1,98 @@
+"""
+CSV sources read once from a binary stream instead of a file.
+
+A StreamSource lets the processor split data as it arrives, for example
+an HTTP upload, without first buffering it to disk. The dialect is
+detected from the leading bytes, which are then replayed to the parser.
+"""
+
+import csv
+import io
+from typing import Any, List, Optional, Tuple
+
+from .backends import Batches, CsvModuleBackend
+from .config import Config
+from .dialect import CSVDialect, detect_dialect_from_sample
+
+
+class _PrefixedStream(io.RawIOBase):
+    """Raw stream replaying already-read bytes before reading on, counting bytes."""
+
+    def __init__(self, prefix: bytes, stream: Any):
+        self._prefix = prefix
+        self._stream = stream
+        self.bytes_read = len(prefix)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        if not data:
+            return 0
+        buffer[:len(data)] = data
+        self.bytes_read += len(data)
+        return len(data)
+
+
+class StreamSource:
+    """A CSV source that can be read once, front to back, from a binary stream."""
+
+    def __init__(self, stream: Any, name: str):
+        """
+        Initialize stream source.
+
+        Args:
+            stream: Binary file-like object with a read(size) method
+            name: File name the data stands for; its stem names the
+                output files as a source file's would
+        """
+        self.stream = stream
+        self.name = name
+        self._dialect: Optional[CSVDialect] = None
+        self._raw: Optional[_PrefixedStream] = None
+
+    @property
+    def bytes_read(self) -> int:
+        """Bytes consumed from the stream so far."""
+        return self._raw.bytes_read if self._raw is not None else 0
+
+    def detect_dialect(self) -> CSVDialect:
+        """Detect the dialect from up to Config.DIALECT_SAMPLE_SIZE leading bytes."""
+        if self._dialect is None:
+            parts: List[bytes] = []
+            size = 0
+            eof = False
+            while size < Config.DIALECT_SAMPLE_SIZE:
+                data = self.stream.read(Config.DIALECT_SAMPLE_SIZE - size)
+                if not data:
+                    eof = True
+                    break
+                parts.append(data)
+                size += len(data)
+            sample = b''.join(parts)
+            self._raw = _PrefixedStream(sample, self.stream)
+            self._dialect = detect_dialect_from_sample(sample, truncated=not eof)
+        return self._dialect
+
+    def read_batches(self, batch_size: int = Config.PARSE_BATCH_SIZE) -> Tuple[List[str], Batches]:
+        """
+        Start parsing the stream.
+
+        Returns:
+            Tuple of the header row and an iterator of row batches
+
+        Raises:
+            StopIteration: If the stream has no header row
+        """
+        dialect = self.detect_dialect()
+        buffered = io.BufferedReader(self._raw, Config.DIALECT_SAMPLE_SIZE)
+        text = io.TextIOWrapper(buffered, encoding=dialect.encoding, newline='')
+        reader = csv.reader(text, **dialect.reader_kwargs())
+        header = next(reader)
+        return header, CsvModuleBackend._iter_batches(text, reader, len(header), batch_size)
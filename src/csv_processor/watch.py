@@ -0,0 +1,452 @@
+"""
+Watch-folder mode: split every CSV file dropped into a directory.
+
+WatchFolder waits until a dropped file has stopped changing, splits it
+with a saved SplitConfig on a bounded pool of worker threads, then moves
+it to a done (or failed) folder. New files are found through inotify on
+Linux; elsewhere the directory is listed again only when its mtime
+changes, so a drop directory full of old files is not listed every cycle.
+
+Usage:
+    python -m csv_processor.watch DROP_DIR CONFIG.json [--workers N]
+"""
+
+import argparse
+import ctypes
+import fnmatch
+import json
+import logging
+import os
+import select
+import shutil
+import stat
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .exceptions import FileOperationError, ValidationError
+from .jobs import decode_options, encode_options
+from .processor import CSVProcessor, ProcessingResult
+
+
+# inotify event masks (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class SplitConfig:
+    """A saved split: output directory, fields and split options."""
+
+    def __init__(
+        self,
+        output_dir: str,
+        split_by_fields: Sequence[str],
+        included_fields: Sequence[str],
+        **options: Any
+    ):
+        """
+        Initialize split configuration.
+
+        Args:
+            output_dir: Directory where output files will be created
+            split_by_fields: Field names to split by, in order
+            included_fields: Field names written to the output, in order
+            **options: split_csv_by_fields keyword arguments, plus
+                parser_backend, writer_threads and max_memory for the processor
+
+        Raises:
+            ValidationError: If the fields are empty or an option is invalid
+        """
+        if not split_by_fields:
+            raise ValidationError("At least one split_by field must be specified")
+        if not included_fields:
+            raise ValidationError("At least one field must be included in output")
+        self.output_dir = output_dir
+        self.split_by_fields = list(split_by_fields)
+        self.included_fields = list(included_fields)
+        self.options = encode_options(options)
+
+    @classmethod
+    def load(cls, path: str) -> 'SplitConfig':
+        """
+        Read a configuration saved with save().
+
+        Raises:
+            FileOperationError: If the file cannot be read
+            ValidationError: If the file is not a valid configuration
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except OSError as e:
+            raise FileOperationError(f"Cannot read split configuration {path}: {e}")
+        except ValueError as e:
+            raise ValidationError(f"Invalid split configuration {path}: {e}")
+        try:
+            return cls(
+                data['output_dir'], data['split_by_fields'], data['included_fields'],
+                **data.get('options', {})
+            )
+        except (KeyError, TypeError) as e:
+            raise ValidationError(f"Invalid split configuration {path}: missing or bad {e}")
+
+    def save(self, path: str) -> None:
+        """Write the configuration to a JSON file."""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2)
+        except OSError as e:
+            raise FileOperationError(f"Cannot write split configuration {path}: {e}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for saving."""
+        return {
+            'output_dir': self.output_dir,
+            'split_by_fields': self.split_by_fields,
+            'included_fields': self.included_fields,
+            'options': self.options,
+        }
+
+
+class _Inotify:
+    """Minimal non-blocking inotify watch of one directory through libc."""
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> Tuple[List[Tuple[int, str]], bool]:
+        """
+        Wait up to timeout seconds for events.
+
+        Returns:
+            (mask, name) pairs, and whether the kernel queue overflowed
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        events: List[Tuple[int, str]] = []
+        overflow = False
+        while ready:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                elif name:
+                    events.append((mask, name))
+        return events, overflow
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _open_inotify(directory: str) -> Optional[_Inotify]:
+    """Watch directory with inotify, or return None where it is unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return _Inotify(directory)
+    except (OSError, AttributeError):
+        return None
+
+
+class WatchFolder:
+    """Splits files dropped into a directory once they stop changing."""
+
+    def __init__(
+        self,
+        drop_dir: str,
+        config: SplitConfig,
+        workers: int = Config.WATCH_WORKERS,
+        done_dir: Optional[str] = None,
+        failed_dir: Optional[str] = None,
+        pattern: str = Config.WATCH_PATTERN,
+        stable_seconds: float = Config.WATCH_STABLE_SECONDS,
+        poll_interval: float = Config.WATCH_POLL_INTERVAL,
+        use_inotify: bool = True,
+        processor_factory: Callable[..., CSVProcessor] = CSVProcessor,
+        progress_callback: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Initialize watch folder.
+
+        Args:
+            drop_dir: Directory watched for new files
+            config: Split applied to every file
+            workers: Files split at once
+            done_dir: Where split files are moved; drop_dir/done when None
+            failed_dir: Where files that failed to split are moved;
+                drop_dir/failed when None
+            pattern: Glob matched against file names; names starting with
+                "." are ignored as in-progress uploads
+            stable_seconds: Time a file's size and mtime must stay the same
+                before it is split
+            poll_interval: Seconds between checks of the directory
+            use_inotify: Use inotify where available instead of polling
+            processor_factory: Creates the CSVProcessor of each file from
+                progress_callback and the config's processor options
+            progress_callback: Optional callback for progress messages
+
+        Raises:
+            FileOperationError: If a directory cannot be created
+        """
+        self.drop_dir = os.path.abspath(drop_dir)
+        self.config = config
+        self.workers = max(1, workers)
+        self.done_dir = done_dir or os.path.join(self.drop_dir, Config.WATCH_DONE_DIR)
+        self.failed_dir = failed_dir or os.path.join(self.drop_dir, Config.WATCH_FAILED_DIR)
+        self.pattern = pattern
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.processor_factory = processor_factory
+        self.progress_callback = progress_callback
+        self.logger = logging.getLogger(__name__)
+        self.files_done = 0
+        self.files_failed = 0
+        self.listings = 0
+
+        for directory in (self.drop_dir, self.done_dir, self.failed_dir):
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                raise FileOperationError(f"Cannot create directory {directory}: {e}")
+
+        self._processor_kwargs, self._split_kwargs = decode_options(config.options)
+        # name -> [size, mtime_ns, time the signature was first seen], in discovery order
+        self._pending: 'OrderedDict[str, List[Any]]' = OrderedDict()
+        self._running: Dict[Future, str] = {}
+        self._skipped: set = set()
+        self._dir_mtime: Optional[int] = None
+        self._stop = threading.Event()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._inotify = _open_inotify(self.drop_dir) if use_inotify else None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def run(self) -> None:
+        """Watch until stop() is called, then wait for running splits."""
+        self._report(
+            f"Watching {self.drop_dir} for {self.pattern} "
+            f"({'inotify' if self.uses_inotify else 'polling'}, {self.workers} workers)"
+        )
+        try:
+            while not self._stop.is_set():
+                self.poll()
+                self._wait()
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        """Ask run() to return after the running splits finish."""
+        self._stop.set()
+
+    def poll(self) -> None:
+        """Run one cycle: collect finished splits, find new files and start ready ones."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='csv-watch'
+            )
+        for future in [future for future in self._running if future.done()]:
+            self._finish(self._running.pop(future), future)
+        if self._dir_mtime is None or (self._inotify is None and self._directory_changed()):
+            self._list_directory()
+        for name in self._ready_files(self.workers - len(self._running)):
+            del self._pending[name]
+            self._running[self._pool.submit(self._split, name)] = name
+
+    def close(self) -> None:
+        """Wait for running splits and release the pool and inotify watch."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            for future, name in list(self._running.items()):
+                self._finish(name, future)
+            self._running.clear()
+            self._pool = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _report(self, message: str) -> None:
+        if self.progress_callback:
+            self.progress_callback(message)
+        else:
+            self.logger.info(message)
+
+    def _wants(self, name: str) -> bool:
+        return (
+            not name.startswith('.') and fnmatch.fnmatch(name, self.pattern)
+            and name not in self._pending and name not in self._skipped
+            and name not in self._running.values()
+        )
+
+    def _wait(self) -> None:
+        """Sleep until the next cycle, taking in inotify events meanwhile."""
+        if self._inotify is None:
+            self._stop.wait(self.poll_interval)
+            return
+        events, overflow = self._inotify.read(self.poll_interval)
+        if overflow:
+            self._list_directory()
+        for mask, name in events:
+            if mask & (_IN_MOVED_FROM | _IN_DELETE):
+                self._pending.pop(name, None)
+                self._skipped.discard(name)
+            elif self._wants(name):
+                self._pending[name] = [None, None, 0.0]
+
+    def _directory_changed(self) -> bool:
+        """
+        Whether the drop directory must be listed again.
+
+        A directory modified within the last second is always listed again,
+        since a file added in the same mtime tick as the previous listing
+        would otherwise be missed on filesystems with coarse timestamps.
+        """
+        try:
+            mtime = os.stat(self.drop_dir).st_mtime_ns
+        except OSError:
+            return False
+        return mtime != self._dir_mtime or time.time_ns() - mtime < 1_000_000_000
+
+    def _list_directory(self) -> None:
+        """List the drop directory, queueing files not yet known."""
+        try:
+            self._dir_mtime = os.stat(self.drop_dir).st_mtime_ns
+            with os.scandir(self.drop_dir) as entries:
+                for entry in entries:
+                    if self._wants(entry.name) and entry.is_file():
+                        self._pending[entry.name] = [None, None, 0.0]
+        except OSError as e:
+            self.logger.warning(f"Cannot list {self.drop_dir}: {e}")
+        self.listings += 1
+
+    def _ready_files(self, limit: int) -> List[str]:
+        """
+        Return up to limit pending files that have stopped changing.
+
+        Files are checked in discovery order and checking stops once limit
+        files are ready, so a long backlog costs one stat per free worker.
+        """
+        ready: List[str] = []
+        now = time.time()
+        for name in list(self._pending):
+            if len(ready) >= limit:
+                break
+            try:
+                st = os.stat(os.path.join(self.drop_dir, name))
+            except OSError:
+                del self._pending[name]
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                del self._pending[name]
+                self._skipped.add(name)
+                continue
+            state = self._pending[name]
+            signature = [st.st_size, st.st_mtime_ns]
+            if state[:2] != signature:
+                # Files last written long ago are ready when first seen
+                first_seen = now if state[0] is not None else min(now, st.st_mtime)
+                self._pending[name] = signature + [first_seen]
+                if now - first_seen >= self.stable_seconds:
+                    ready.append(name)
+            elif now - state[2] >= self.stable_seconds:
+                ready.append(name)
+        return ready
+
+    def _split(self, name: str) -> ProcessingResult:
+        """Split one file (runs on a worker thread)."""
+        processor = self.processor_factory(
+            progress_callback=self.progress_callback, **self._processor_kwargs
+        )
+        return processor.split_csv_by_fields(
+            os.path.join(self.drop_dir, name), self.config.output_dir,
+            self.config.split_by_fields, self.config.included_fields, **self._split_kwargs
+        )
+
+    def _finish(self, name: str, future: Future) -> None:
+        """Move a split file to the done or failed folder."""
+        try:
+            result = future.result()
+        except Exception as e:
+            result = ProcessingResult(success=False, error=f"Unexpected error: {str(e)}")
+        if result.success:
+            self.files_done += 1
+            target_dir = self.done_dir
+            self._report(f"Split {name}: {result.files_created} files, {result.total_rows} rows")
+        else:
+            self.files_failed += 1
+            target_dir = self.failed_dir
+            self._report(f"Failed to split {name}: {result.error}")
+
+        target = os.path.join(target_dir, name)
+        if os.path.exists(target):
+            stem, ext = os.path.splitext(name)
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            target = os.path.join(target_dir, f"{stem}.{stamp}.{os.getpid()}{ext}")
+        try:
+            shutil.move(os.path.join(self.drop_dir, name), target)
+        except OSError as e:
+            # Leave it in place, but never split it again in this session
+            self._skipped.add(name)
+            self.logger.error(f"Cannot move {name} to {target_dir}: {e}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point of the watch-folder daemon."""
+    parser = argparse.ArgumentParser(description="Split every CSV file dropped into a directory.")
+    parser.add_argument('drop_dir', help="Directory to watch")
+    parser.add_argument('config', help="Split configuration saved as JSON by SplitConfig.save()")
+    parser.add_argument('--workers', type=int, default=Config.WATCH_WORKERS,
+                        help="Files split at once")
+    parser.add_argument('--done-dir', help="Where split files are moved (default: DROP_DIR/done)")
+    parser.add_argument('--failed-dir',
+                        help="Where failed files are moved (default: DROP_DIR/failed)")
+    parser.add_argument('--pattern', default=Config.WATCH_PATTERN, help="File name glob to split")
+    parser.add_argument('--stable-seconds', type=float, default=Config.WATCH_STABLE_SECONDS,
+                        help="Seconds a file must stay unchanged before it is split")
+    parser.add_argument('--poll', action='store_true', help="Poll even where inotify is available")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format=Config.LOG_FORMAT, datefmt=Config.LOG_DATE_FORMAT
+    )
+    watcher = WatchFolder(
+        args.drop_dir, SplitConfig.load(args.config), workers=args.workers, done_dir=args.done_dir,
+        failed_dir=args.failed_dir, pattern=args.pattern, stable_seconds=args.stable_seconds,
+        use_inotify=not args.poll
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
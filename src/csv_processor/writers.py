@@ -0,0 +1,308 @@
+"""
+Output writers for split partitions.
+"""
+
+import csv
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .config import Config
+from .profiling import NULL_PROFILER, ProcessingHooks
+
+
+def encode_rows(rows: Sequence[Sequence[str]], encoding: str = Config.DEFAULT_ENCODING) -> bytes:
+    """Format rows as fully quoted CSV and encode them to bytes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quotechar='"', quoting=csv.QUOTE_ALL)
+    writer.writerows(rows)
+    return buffer.getvalue().encode(encoding)
+
+
+def unique_name(base: str, taken: Set[str]) -> str:
+    """
+    Return base, or base with a numeric suffix, not yet in taken, and add it.
+
+    Names are compared case-folded, since North.csv and north.csv are one
+    file on Windows and macOS; taken holds the case-folded names.
+    """
+    name = base
+    suffix = 1
+    while name.casefold() in taken:
+        suffix += 1
+        stem, extension = os.path.splitext(base)
+        name = f"{stem}-{suffix}{extension}"
+    taken.add(name.casefold())
+    return name
+
+
+class PartitionInfo:
+    """Data class for one written partition file."""
+    
+    def __init__(
+        self,
+        split_key: Tuple,
+        path: str,
+        rows: int = 0,
+        bytes_written: int = 0,
+        part: Optional[int] = None
+    ):
+        self.split_key = split_key
+        self.path = path
+        self.rows = rows
+        self.bytes_written = bytes_written
+        self.part = part
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for reporting."""
+        return {
+            'key': list(self.split_key),
+            'path': self.path,
+            'rows': self.rows,
+            'bytes': self.bytes_written,
+            'part': self.part,
+        }
+
+
+class RollingPolicy:
+    """Limits after which a partition's output rolls over to a new part file."""
+
+    def __init__(self, max_rows: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize rolling policy.
+
+        Args:
+            max_rows: Maximum data rows per part file
+            max_bytes: Maximum size of each part file in bytes, header included;
+                a single row larger than this gets a part of its own
+        """
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def part_path(path: str, part: int) -> str:
+        """Insert a part number before the extension: key_source_part0001.csv."""
+        base, extension = os.path.splitext(path)
+        return f"{base}_part{part:04d}{extension}"
+
+
+class UniquePaths:
+    """
+    Maps split keys to output paths, giving every key a file of its own.
+
+    Keys whose values clean to the same file name, or to names differing
+    only in case, would otherwise write into one file; each later key gets
+    a numeric suffix instead, as archive members do. Paths are handed out
+    in the order keys are first asked for, and one instance can be shared
+    by the writers of a run.
+    """
+
+    def __init__(self, path_for: Callable[[Tuple], str]):
+        """
+        Initialize path reservations.
+
+        Args:
+            path_for: Function mapping a split key to its preferred path
+        """
+        self.path_for = path_for
+        self._paths: Dict[Tuple, str] = {}
+        self._used: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, split_key: Tuple) -> str:
+        """Return the path reserved for a key, reserving one on first use."""
+        with self._lock:
+            path = self._paths.get(split_key)
+            if path is None:
+                path = unique_name(self.path_for(split_key), self._used)
+                self._paths[split_key] = path
+            return path
+
+
+class PartitionFileWriter:
+    """
+    Writes each partition to its own CSV file.
+
+    Partitions can be written whole or appended to in batches. Open files
+    are kept in an LRU cache of at most max_open_files handles; an evicted
+    partition is reopened in append mode when more rows arrive. Rows are
+    encoded and written in blocks of Config.WRITE_BLOCK_ROWS so that the
+    encoded copy of a large partition never sits in memory at once.
+
+    With a rolling policy every partition is written as numbered part
+    files, each with its own header, moving to the next part when the
+    current one reaches the row or byte limit.
+
+    A writer is not thread-safe; concurrent writers must own disjoint
+    sets of partitions.
+    """
+
+    def __init__(
+        self,
+        header: List[str],
+        path_for: Callable[[Tuple], str],
+        profiler=NULL_PROFILER,
+        hooks: Optional[ProcessingHooks] = None,
+        max_open_files: int = Config.MAX_OPEN_FILES,
+        on_new_partition: Optional[Callable[[Tuple], None]] = None,
+        rolling: Optional[RollingPolicy] = None
+    ):
+        """
+        Initialize partition writer.
+
+        Args:
+            header: Header row written at the top of every file
+            path_for: Function mapping a split key to its output file path
+            profiler: Phase profiler recording encoding, write and close time
+            hooks: Optional instrumentation hooks
+            max_open_files: Maximum number of output files held open at once
+            on_new_partition: Optional callback when a partition file is created
+            rolling: Optional limits splitting each partition into part files
+        """
+        self.header = header
+        self.path_for = path_for
+        self.profiler = profiler
+        self.hooks = hooks or ProcessingHooks()
+        self.max_open_files = max(1, max_open_files)
+        self.on_new_partition = on_new_partition
+        self.rolling = rolling
+        # Current file of each partition, and every file in creation order
+        self.partitions: Dict[Tuple, PartitionInfo] = {}
+        self.files: List[PartitionInfo] = []
+        self.bytes_written = 0
+        self.peak_open_files = 0
+        self._handles: 'OrderedDict[Tuple, Any]' = OrderedDict()
+
+    def write_partition(self, split_key: Tuple, rows: Sequence[Sequence[str]]) -> str:
+        """
+        Write a complete partition to its file, replacing any existing file.
+
+        Returns:
+            Path of the written file (the last part when rolling)
+        """
+        self.close(split_key)
+        if self.partitions.pop(split_key, None) is not None:
+            self.files = [info for info in self.files if info.split_key != split_key]
+        self.append(split_key, rows)
+        self.close(split_key)
+        return self.partitions[split_key].path
+
+    def append(self, split_key: Tuple, rows: Sequence[Sequence[str]]) -> None:
+        """Append rows to a partition, creating its file with a header on first use."""
+        profiler = self.profiler
+        handle = self._handles.get(split_key)
+        if handle is None:
+            handle = self._open(split_key)
+        else:
+            self._handles.move_to_end(split_key)
+
+        block_rows = Config.WRITE_BLOCK_ROWS
+        bytes_written = 0
+        if self.rolling is None:
+            info = self.partitions[split_key]
+            for start in range(0, len(rows), block_rows):
+                with profiler.phase("encoding"):
+                    data = encode_rows(rows[start:start + block_rows])
+                with profiler.phase("write"):
+                    handle.write(data)
+                bytes_written += len(data)
+            info.rows += len(rows)
+            info.bytes_written += bytes_written
+        else:
+            max_rows = self.rolling.max_rows
+            start = 0
+            while start < len(rows):
+                block_end = start + block_rows
+                if max_rows is not None:
+                    room = max_rows - self.partitions[split_key].rows
+                    if room <= 0:
+                        self._roll(split_key)
+                        room = max_rows
+                    block_end = min(block_end, start + room)
+                bytes_written += self._write_rolling_block(split_key, rows[start:block_end])
+                start = block_end
+
+        self.bytes_written += bytes_written
+        if self.hooks.on_flush:
+            self.hooks.on_flush(split_key, len(rows), bytes_written)
+
+    def _write_rolling_block(self, split_key: Tuple, rows: Sequence[Sequence[str]]) -> int:
+        """Write a block of rows, halving it to find where it crosses the byte limit."""
+        with self.profiler.phase("encoding"):
+            data = encode_rows(rows)
+        info = self.partitions[split_key]
+        max_bytes = self.rolling.max_bytes
+        if max_bytes is not None and info.bytes_written + len(data) > max_bytes:
+            if len(rows) > 1:
+                middle = len(rows) // 2
+                return (
+                    self._write_rolling_block(split_key, rows[:middle])
+                    + self._write_rolling_block(split_key, rows[middle:])
+                )
+            if info.rows:
+                info = self._roll(split_key)
+        with self.profiler.phase("write"):
+            self._handles[split_key].write(data)
+        info.rows += len(rows)
+        info.bytes_written += len(data)
+        return len(data)
+
+    def _roll(self, split_key: Tuple) -> PartitionInfo:
+        """Close a partition's current part and start the next one."""
+        self.close(split_key)
+        previous = self.partitions.pop(split_key)
+        self._open(split_key, previous.part + 1)
+        return self.partitions[split_key]
+
+    def close(self, split_key: Tuple) -> None:
+        """Close a partition's file if it is open."""
+        handle = self._handles.pop(split_key, None)
+        if handle is not None:
+            with self.profiler.phase("close"):
+                handle.close()
+
+    def close_all(self) -> None:
+        """Close every open partition file."""
+        while self._handles:
+            split_key = next(iter(self._handles))
+            self.close(split_key)
+
+    def abort(self) -> None:
+        """Close every open partition file after a failed run."""
+        self.close_all()
+
+    def _open(self, split_key: Tuple, part: int = 1):
+        """Open a partition's file, evicting the least recently used handle if needed."""
+        while len(self._handles) >= self.max_open_files:
+            self.close(next(iter(self._handles)))
+
+        info = self.partitions.get(split_key)
+        is_new = info is None
+        if is_new:
+            path = self.path_for(split_key)
+            if self.rolling is None:
+                info = PartitionInfo(split_key, path)
+            else:
+                info = PartitionInfo(split_key, RollingPolicy.part_path(path, part), part=part)
+            self.partitions[split_key] = info
+            self.files.append(info)
+
+        with self.profiler.phase("write"):
+            handle = open(info.path, 'wb' if is_new else 'ab')
+        self._handles[split_key] = handle
+        self.peak_open_files = max(self.peak_open_files, len(self._handles))
+
+        if is_new:
+            if self.hooks.on_partition_open:
+                self.hooks.on_partition_open(split_key, info.path)
+            with self.profiler.phase("encoding"):
+                data = encode_rows([self.header])
+            with self.profiler.phase("write"):
+                handle.write(data)
+            info.bytes_written += len(data)
+            self.bytes_written += len(data)
+            if self.on_new_partition:
+                self.on_new_partition(split_key)
+        return handle
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for single-archive (zip/tar) output.
+"""
+
+import csv
+import io
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.archive_sink import ArchiveSink
+from csv_processor.config import Config
+
+
+def create_test_csv(work_dir, rows=3000, keys=300):
+    """Create a test CSV file with many small partitions."""
+    path = os.path.join(work_dir, 'orders.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'CUSTOMER', 'AMOUNT'])
+        for i in range(rows):
+            writer.writerow([str(i), f'C{i % keys:03d}', str(i * 3)])
+    return path
+
+
+def member_rows(data):
+    return list(csv.reader(io.StringIO(data.decode('utf-8'))))
+
+
+def test_zip_matches_split_files():
+    """Every partition becomes one deflated zip member with the split file's content."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = create_test_csv(work_dir)
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        split = processor.split_csv_by_fields(
+            source, os.path.join(work_dir, 'files'), ['CUSTOMER'], ['ID', 'AMOUNT']
+        )
+        archive = os.path.join(work_dir, 'out', 'orders.zip')
+        result = processor.split_csv_to_archive(
+            source, archive, ['CUSTOMER'], ['ID', 'AMOUNT'], compression_level=6
+        )
+        assert result.success, result.error
+        assert result.total_rows == 3000 and result.files_created == 1
+        assert result.bytes_written == os.path.getsize(archive)
+        assert len(result.partitions) == 300
+        assert all(info.part is None for info in result.partitions)
+        assert not os.path.exists(archive + '.building')
+
+        with zipfile.ZipFile(archive) as zf:
+            names = zf.namelist()
+            assert names == sorted(os.listdir(os.path.join(work_dir, 'files')))
+            assert all(info.compress_type == zipfile.ZIP_DEFLATED for info in zf.infolist())
+            for name in names:
+                with open(os.path.join(work_dir, 'files', name), 'rb') as f:
+                    assert zf.read(name) == f.read()
+        assert split.total_rows == result.total_rows
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_tar_parts_and_hive_names():
+    """Partitions beyond member_bytes become part members; tar.gz and hive names work."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        # More rows than one parsed batch, so every key is written more than once
+        rows = Config.PARSE_BATCH_SIZE * 2 + 500
+        source = create_test_csv(work_dir, rows=rows, keys=3)
+        archive = os.path.join(work_dir, 'orders.tar.gz')
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_to_archive(
+            source, archive, ['CUSTOMER'], ['ID'],
+            compression_level=1, member_bytes=4096, layout='hive'
+        )
+        assert result.success, result.error
+        assert result.engine.startswith('tar')
+        with tarfile.open(archive, 'r:gz') as tf:
+            members = tf.getnames()
+            assert members[0] == 'CUSTOMER=C000/orders_part0001.csv'
+            ids = []
+            for name in members:
+                if name.startswith('CUSTOMER=C001/'):
+                    data = member_rows(tf.extractfile(name).read())
+                    assert data[0] == ['ID']
+                    ids.extend(int(row[0]) for row in data[1:])
+            assert ids == list(range(1, rows, 3))
+        parts = [info.part for info in result.partitions if info.split_key == ('C002',)]
+        assert parts == list(range(1, len(parts) + 1)) and len(parts) > 1
+        assert sum(info.rows for info in result.partitions) == rows
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_buffer_limit_and_buckets():
+    """The total buffer stays bounded; empty buckets still get a member."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        archive = os.path.join(work_dir, 'small.zip')
+        sink = ArchiveSink(
+            archive, ['ID'], lambda key: f'{key[0]}.csv', member_bytes=1000, buffer_bytes=2000
+        )
+        for i in range(500):
+            sink.write((str(i % 20),), [(str(i),)])
+            assert sink.buffered_bytes <= 2000
+        sink.close()
+        with zipfile.ZipFile(archive) as zf:
+            rows = sum(len(member_rows(zf.read(name))) - 1 for name in zf.namelist())
+        assert rows == 500
+
+        source = create_test_csv(work_dir, rows=10, keys=1)
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_to_archive(
+            source, os.path.join(work_dir, 'buckets.tar'), ['CUSTOMER'], ['ID'], buckets=4
+        )
+        assert result.success, result.error
+        paths = [info.path for info in result.partitions]
+        assert paths == [f'bucket-{b}_orders.csv' for b in range(4)]
+        assert sorted(info.rows for info in result.partitions) == [0, 0, 0, 10]
+
+        for name in ('default.tar.gz', 'default.tgz'):
+            result = CSVProcessor(progress_callback=lambda msg: None).split_csv_to_archive(
+                source, os.path.join(work_dir, name), ['CUSTOMER'], ['ID']
+            )
+            assert result.success, result.error
+            with open(os.path.join(work_dir, name), 'rb') as f:
+                assert f.read(2) == b'\x1f\x8b'
+            with tarfile.open(os.path.join(work_dir, name), 'r:gz') as tf:
+                assert tf.getnames() == ['C000_orders.csv']
+        with open(os.path.join(work_dir, 'buckets.tar'), 'rb') as f:
+            assert f.read(2) != b'\x1f\x8b'
+
+        failed = CSVProcessor(progress_callback=lambda msg: None).split_csv_to_archive(
+            source, os.path.join(work_dir, 'orders.out'), ['CUSTOMER'], ['ID']
+        )
+        assert not failed.success and 'archive format' in failed.error
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_zip_matches_split_files()
+    test_tar_parts_and_hive_names()
+    test_buffer_limit_and_buckets()
+    print("✓ All archive output tests passed")
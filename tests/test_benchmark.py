@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark suite's regression comparison.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add benchmarks to path
+benchmarks_path = Path(__file__).parent.parent / "benchmarks"
+sys.path.insert(0, str(benchmarks_path))
+
+import benchmark_split
+
+
+def make_report(**cases):
+    """Build a results report with one result per case id."""
+    return {"meta": {}, "results": [{"id": case, **metrics} for case, metrics in cases.items()]}
+
+
+def test_compare_flags_regressions():
+    """Only metrics that got worse beyond the threshold, in their own direction, are reported."""
+    baseline = make_report(
+        a={"rows_per_s": 1000.0, "mb_per_s": 50.0, "peak_rss_mb": 100.0, "max_open_fds": 0},
+        b={"rows_per_s": 1000.0, "time_to_first_output_s": 0.5},
+    )
+    current = make_report(
+        a={"rows_per_s": 800.0, "mb_per_s": 60.0, "peak_rss_mb": 105.0, "max_open_fds": 4},
+        b={"rows_per_s": 950.0, "time_to_first_output_s": 0.8},
+        c={"rows_per_s": 1.0},
+    )
+    regressions = benchmark_split.compare_results(current, baseline, 0.10)
+    assert sorted((case, metric) for case, metric, *_ in regressions) == [
+        ("a", "rows_per_s"), ("b", "time_to_first_output_s")
+    ]
+    case, metric, old, new, change = [r for r in regressions if r[1] == "rows_per_s"][0]
+    assert (old, new) == (1000.0, 800.0) and abs(change + 0.2) < 1e-9
+
+    assert benchmark_split.compare_results(current, baseline, 0.7) == []
+
+
+def test_compare_command_exit_status():
+    """The compare command exits 1 on regressions and 0 without."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        baseline_path = os.path.join(work_dir, 'baseline.json')
+        results_path = os.path.join(work_dir, 'results.json')
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(make_report(a={"rows_per_s": 1000.0}), f)
+        with open(results_path, 'w', encoding='utf-8') as f:
+            json.dump(make_report(a={"rows_per_s": 500.0}), f)
+
+        assert benchmark_split.main(['compare', results_path, '--baseline', baseline_path]) == 1
+        assert benchmark_split.main(
+            ['compare', results_path, '--baseline', baseline_path, '--threshold', '0.6']
+        ) == 0
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_compare_flags_regressions()
+    test_compare_command_exit_status()
+    print("✓ All benchmark comparison tests passed")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for hash-bucket partitioning.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.config import Config
+from csv_processor.exceptions import ValidationError
+from csv_processor.partitioning import stable_bucket
+
+
+def create_test_csv(rows=5000):
+    """Create a test CSV file with 200 customers."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'CUSTOMER', 'REGION'])
+        for i in range(rows):
+            writer.writerow([str(i), f'C{i % 200}', f'R{i % 7}'])
+        return f.name
+
+
+def test_stable_bucket_is_deterministic():
+    """Bucket numbers are fixed values, independent of hash() salting."""
+    assert stable_bucket(('abc',), 1000) == stable_bucket(('abc',), 1000)
+    assert stable_bucket(('a', 'bc'), 2 ** 32) != stable_bucket(('ab', 'c'), 2 ** 32)
+    assert all(0 <= stable_bucket((str(i),), 8) < 8 for i in range(100))
+
+
+def test_bucket_mode_writes_fixed_number_of_files():
+    """Every bucket gets a file, keys never span buckets and key counts are reported."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        result = processor.split_csv_by_fields(
+            test_file, output_dir, ['CUSTOMER'], ['ID', 'CUSTOMER'], manifest=True, buckets=16
+        )
+        assert result.success, result.error
+        assert result.files_created == 16
+        assert sum(result.bucket_keys.values()) == 200
+        split_keys = [partition.split_key for partition in result.partitions]
+        assert split_keys == [(str(b),) for b in range(16)]
+
+        stem = Path(test_file).stem
+        seen = {}
+        for bucket in range(16):
+            with open(os.path.join(output_dir, f'bucket-{bucket:02d}_{stem}.csv'), newline='') as f:
+                rows = list(csv.reader(f))
+            assert rows[0] == ['ID', 'CUSTOMER']
+            customers = {row[1] for row in rows[1:]}
+            assert len(customers) == result.bucket_keys[bucket]
+            for customer in customers:
+                assert customer not in seen
+                seen[customer] = bucket
+                assert stable_bucket((customer,), 16) == bucket
+        assert len(seen) == 200
+
+        with open(os.path.join(output_dir, Config.MANIFEST_FILENAME), newline='') as f:
+            manifest = list(csv.DictReader(f))
+        assert [row['bucket'] for row in manifest] == [str(b) for b in range(16)]
+        assert sum(int(row['keys']) for row in manifest) == 200
+        assert sum(int(row['rows']) for row in manifest) == 5000
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_bucket_mode_pipelined_and_empty_buckets():
+    """Pipelined bucket runs match in-memory runs and still create empty buckets."""
+    test_file = create_test_csv(rows=30)
+    memory_dir = tempfile.mkdtemp()
+    pipelined_dir = tempfile.mkdtemp()
+    try:
+        memory = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, memory_dir, ['REGION'], ['ID'], buckets=32
+        )
+        pipelined = CSVProcessor(
+            progress_callback=lambda msg: None, writer_threads=2
+        ).split_csv_by_fields(test_file, pipelined_dir, ['REGION'], ['ID'], buckets=32)
+        assert memory.success and pipelined.success
+        assert memory.files_created == pipelined.files_created == 32
+        assert memory.bucket_keys == pipelined.bucket_keys
+        for name in os.listdir(memory_dir):
+            with open(os.path.join(memory_dir, name), 'rb') as a, \
+                    open(os.path.join(pipelined_dir, name), 'rb') as b:
+                assert a.read() == b.read()
+
+        invalid = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, memory_dir, ['REGION'], ['ID'], buckets=0
+        )
+        assert not invalid.success
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(memory_dir)
+        shutil.rmtree(pipelined_dir)
+
+
+def test_bucket_field_clash_rejected_everywhere():
+    """Every split API rejects an included field named like the bucket key."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'bucket', 'REGION'])
+        writer.writerow(['1', 'x', 'North'])
+        test_file = f.name
+    output_dir = tempfile.mkdtemp()
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        fields = (['REGION'], ['ID', 'bucket'])
+        results = [
+            processor.split_csv_by_fields(test_file, output_dir, *fields, buckets=4),
+            processor.split_csv_to_sqlite(
+                test_file, os.path.join(output_dir, 'out.db'), *fields, buckets=4
+            ),
+            processor.split_csv_to_archive(
+                test_file, os.path.join(output_dir, 'out.zip'), *fields, buckets=4
+            ),
+        ]
+        for result in results:
+            assert not result.success
+            assert "'bucket'" in result.error
+        try:
+            processor.iter_partitions(test_file, *fields, buckets=4)
+            assert False, "iter_partitions should reject the clash"
+        except ValidationError:
+            pass
+        assert os.listdir(output_dir) == []
+        assert processor.split_csv_by_fields(test_file, output_dir, *fields).success
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    test_stable_bucket_is_deterministic()
+    test_bucket_mode_writes_fixed_number_of_files()
+    test_bucket_mode_pipelined_and_empty_buckets()
+    test_bucket_field_clash_rejected_everywhere()
+    print("✓ All bucket tests passed")
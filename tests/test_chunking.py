@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for row-count and byte-size chunked splitting.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.chunking import ChunkPlanner
+from csv_processor.dialect import CSVDialect
+
+
+def create_test_csv(rows=1000, trailing_newline=True):
+    """Create a CSV file with quoted fields containing newlines, commas and quotes."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'NOTE'])
+        for i in range(rows):
+            note = f'line one\nline "two", {i}' if i % 10 == 0 else f'note {i}'
+            writer.writerow([str(i), note])
+            if i % 250 == 0:
+                f.write('\r\n')
+        if not trailing_newline:
+            f.seek(f.tell() - 2)
+            f.truncate()
+        return f.name
+
+
+def read_parts(output_dir, stem):
+    """Return header and data rows of every part, in part order."""
+    parts = []
+    for name in sorted(os.listdir(output_dir)):
+        if name.startswith(f'{stem}_part'):
+            with open(os.path.join(output_dir, name), newline='') as f:
+                parts.append([row for row in csv.reader(f) if row])
+    return parts
+
+
+def test_row_chunks_respect_quoted_newlines():
+    """Parts hold N rows each, repeat the header and never split a quoted field."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_into_chunks(
+            test_file, output_dir, max_rows=300, workers=3, manifest=True
+        )
+        assert result.success, result.error
+        assert result.files_created == 4
+        assert [partition.rows for partition in result.partitions] == [300, 300, 300, 100]
+        assert result.bytes_written == sum(os.path.getsize(p.path) for p in result.partitions)
+
+        parts = read_parts(output_dir, Path(test_file).stem)
+        assert [len(part) - 1 for part in parts] == [300, 300, 300, 100]
+        assert all(part[0] == ['ID', 'NOTE'] for part in parts)
+        ids = [int(row[0]) for part in parts for row in part[1:]]
+        assert ids == list(range(1000))
+        assert parts[0][1] == ['0', 'line one\nline "two", 0']
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_byte_chunks_stay_under_limit():
+    """Parts never exceed max_bytes and parallel output matches sequential output."""
+    test_file = create_test_csv(trailing_newline=False)
+    sequential_dir = tempfile.mkdtemp()
+    parallel_dir = tempfile.mkdtemp()
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        sequential = processor.split_csv_into_chunks(test_file, sequential_dir, max_bytes=2048)
+        parallel = processor.split_csv_into_chunks(
+            test_file, parallel_dir, max_bytes=2048, workers=4
+        )
+        assert sequential.success and parallel.success
+        assert sequential.total_rows == parallel.total_rows == 1000
+        assert all(partition.bytes_written <= 2048 for partition in parallel.partitions)
+        for a, b in zip(sequential.partitions, parallel.partitions):
+            with open(a.path, 'rb') as fa, open(b.path, 'rb') as fb:
+                assert fa.read() == fb.read()
+
+        parts = read_parts(parallel_dir, Path(test_file).stem)
+        ids = [int(row[0]) for part in parts for row in part[1:]]
+        assert ids == list(range(1000))
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(sequential_dir)
+        shutil.rmtree(parallel_dir)
+
+
+def test_planner_with_small_blocks():
+    """Record boundaries are found across scan block edges."""
+    test_file = create_test_csv(rows=200)
+    try:
+        dialect = CSVDialect()
+        _, expected = ChunkPlanner(dialect, max_rows=7).plan(test_file)
+        header, chunks = ChunkPlanner(dialect, max_rows=7, block_size=5).plan(test_file)
+        assert header == b'ID,NOTE\r\n'
+        actual = [(c.start, c.end, c.rows) for c in chunks]
+        assert actual == [(c.start, c.end, c.rows) for c in expected]
+        assert sum(chunk.rows for chunk in chunks) == 200
+    finally:
+        os.unlink(test_file)
+
+
+if __name__ == "__main__":
+    test_row_chunks_respect_quoted_newlines()
+    test_byte_chunks_stay_under_limit()
+    test_planner_with_small_blocks()
+    print("✓ All chunking tests passed")
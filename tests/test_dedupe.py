@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Tests for row deduplication during split.
+"""
+
+import csv
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor import dedupe
+from csv_processor.config import Config
+from csv_processor.dedupe import BloomFilter, DedupePolicy, Deduplicator, estimate_row_count
+from csv_processor.memory import spill_batch_rows
+
+
+def create_test_csv(rows=8000):
+    """Create a test CSV file in which about half the rows repeat earlier ones."""
+    rng = random.Random(11)
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ORDER', 'REGION', 'AMOUNT', 'LOADED_AT'])
+        for i in range(rows):
+            order = rng.randint(0, rows // 2)
+            writer.writerow([str(order), f'R{order % 5}', str(order * 7), str(i)])
+        return f.name
+
+
+def expected_output(test_file, key_fields, included_fields):
+    """First occurrence of every key, per region, in source order."""
+    with open(test_file, newline='') as f:
+        source = list(csv.DictReader(f))
+    seen = set()
+    expected = {}
+    for row in source:
+        key = tuple(row[field] for field in key_fields)
+        if key not in seen:
+            seen.add(key)
+            expected.setdefault(row['REGION'], []).append([row[field] for field in included_fields])
+    return expected, len(source) - len(seen)
+
+
+def read_outputs(output_dir, stem):
+    outputs = {}
+    for name in os.listdir(output_dir):
+        with open(os.path.join(output_dir, name), newline='') as f:
+            outputs[name[:-len(f'_{stem}.csv')]] = list(csv.reader(f))[1:]
+    return outputs
+
+
+def test_exact_dedupe_on_included_fields():
+    """Whole-row duplicates are dropped and counted."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, output_dir, ['REGION'], ['ORDER', 'AMOUNT'], dedupe=True
+        )
+        assert result.success, result.error
+        expected, duplicates = expected_output(test_file, ['ORDER', 'AMOUNT'], ['ORDER', 'AMOUNT'])
+        assert duplicates > 1000
+        assert result.duplicates_removed == duplicates
+        assert read_outputs(output_dir, Path(test_file).stem) == expected
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_exact_dedupe_spills_and_keeps_order():
+    """With a tiny memory budget, spilled hash partitions give the same output."""
+    # Several parse batches, so that later batches are spilled
+    test_file = create_test_csv(rows=30000)
+    output_dir = tempfile.mkdtemp()
+    try:
+        for writer_threads in (0, 2):
+            shutil.rmtree(output_dir)
+            processor = CSVProcessor(
+                progress_callback=lambda msg: None, writer_threads=writer_threads
+            )
+            result = processor.split_csv_by_fields(
+                test_file, output_dir, ['REGION'], ['ORDER', 'LOADED_AT'],
+                dedupe=DedupePolicy(fields=['ORDER'], memory_budget=8 * 1024)
+            )
+            assert result.success, result.error
+            expected, duplicates = expected_output(test_file, ['ORDER'], ['ORDER', 'LOADED_AT'])
+            assert result.duplicates_removed == duplicates
+            assert read_outputs(output_dir, Path(test_file).stem) == expected
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def test_drain_reads_within_budget():
+    """Spilled rows are read back in batches sized from the budget and the partition count."""
+    budget = 4 * 1024 * 1024
+    deduplicator = Deduplicator(DedupePolicy(memory_budget=budget))
+    loaded = []
+
+    class CountingPickle:
+        HIGHEST_PROTOCOL = pickle.HIGHEST_PROTOCOL
+        dump = staticmethod(pickle.dump)
+
+        @staticmethod
+        def load(f):
+            batch = pickle.load(f)
+            if f.name.endswith('.distinct'):
+                # Survivor files are the ones read all at once by the merge
+                loaded.append(len(batch))
+            return batch
+
+    dedupe.pickle = CountingPickle
+    try:
+        deduplicator.start_spilling()
+        for start in range(0, 60000, 5000):
+            rows = [(str(i % 40000), f'value {i}') for i in range(start, start + 5000)]
+            keys = [(row[0],) for row in rows]
+            kept_keys, kept = deduplicator.filter(keys, [('all',)] * len(rows), rows)
+            assert not kept
+        drained = [row for _, rows in deduplicator.drain() for row in rows]
+    finally:
+        dedupe.pickle = pickle
+        deduplicator.close()
+
+    assert drained == [(str(i), f'value {i}') for i in range(40000)]
+    assert deduplicator.duplicates == 20000
+    batch_rows = spill_batch_rows(
+        budget, Config.DEDUPE_SPILL_PARTITIONS, deduplicator._spilled_row_bytes
+    )
+    assert Config.SPILL_MIN_BATCH_ROWS < batch_rows < Config.SPILL_BATCH_ROWS
+    assert max(loaded) <= batch_rows
+
+
+def test_approximate_dedupe_never_keeps_duplicates():
+    """The Bloom filter mode drops every duplicate and loses few unique rows."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, output_dir, ['REGION'], ['ORDER'],
+            dedupe=DedupePolicy(mode='approximate', memory_budget=64 * 1024)
+        )
+        assert result.success, result.error
+        expected, duplicates = expected_output(test_file, ['ORDER'], ['ORDER'])
+        outputs = read_outputs(output_dir, Path(test_file).stem)
+        written = [row[0] for rows in outputs.values() for row in rows]
+        assert len(written) == len(set(written))
+        unique = sum(len(rows) for rows in expected.values())
+        assert unique - len(written) <= unique * 0.01
+        assert result.duplicates_removed == result.total_rows - len(written)
+
+        bloom = BloomFilter(1024, 0.01)
+        assert not bloom.add(('a',)) and bloom.add(('a',))
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_bloom_filter_sized_for_source():
+    """The Bloom filter is sized from the estimated rows, with the memory budget only as a cap."""
+    test_file = create_test_csv(rows=20000)
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        f.write('ORDER,REGION\n1,A\n2,B\n')
+        tiny_file = f.name
+    output_dir = tempfile.mkdtemp()
+    try:
+        assert estimate_row_count(tiny_file) == 3
+        assert 20001 <= estimate_row_count(test_file) <= 20001 * 1.2
+
+        policy = DedupePolicy(mode='approximate')
+        assert Deduplicator(policy, expected_rows=3)._bloom.bits < 1024 * 8
+        sized = Deduplicator(policy, expected_rows=20000)._bloom
+        assert sized.capacity >= 20000 and len(sized._array) < 1024 * 1024
+        capped = Deduplicator(policy, filter_bytes=4096, expected_rows=10 ** 9)._bloom
+        assert len(capped._array) == 4096
+
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            tiny_file, output_dir, ['REGION'], ['ORDER'], dedupe=policy
+        )
+        assert result.success, result.error
+        if result.rss_growth is not None:
+            assert result.rss_growth < policy.memory_budget // 16
+    finally:
+        os.unlink(test_file)
+        os.unlink(tiny_file)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    test_exact_dedupe_on_included_fields()
+    test_exact_dedupe_spills_and_keeps_order()
+    test_drain_reads_within_budget()
+    test_approximate_dedupe_never_keeps_duplicates()
+    test_bloom_filter_sized_for_source()
+    print("✓ All dedupe tests passed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for CSV dialect, delimiter and encoding detection.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.dialect import detect_dialect, clear_dialect_cache
+
+
+def write_text(text, encoding='utf-8'):
+    """Write text to a temporary CSV file and return its path."""
+    with tempfile.NamedTemporaryFile(
+        mode='w', suffix='.csv', delete=False, newline='', encoding=encoding
+    ) as f:
+        f.write(text)
+        return f.name
+
+
+def test_semicolon_with_bom():
+    """Semicolon-delimited UTF-8 files with a BOM are detected and read cleanly."""
+    path = write_text('ID;NAME;DEPT\n1;"Doe; John";IT\n2;Jane;HR\n', encoding='utf-8-sig')
+    try:
+        dialect = detect_dialect(path)
+        assert dialect.delimiter == ';'
+        assert dialect.encoding == 'utf-8-sig'
+        assert dialect.has_bom
+        assert dialect.lineterminator == '\n'
+        assert CSVProcessor.get_csv_headers(path) == ['ID', 'NAME', 'DEPT']
+    finally:
+        os.unlink(path)
+
+
+def test_legacy_encoding_and_tabs():
+    """Non-UTF-8 and tab-separated files fall back to a working encoding."""
+    path = write_text('ID\tNAME\tCITY\r\n1\tCaf\xe9\tMontr\xe9al\r\n', encoding='cp1252')
+    try:
+        dialect = detect_dialect(path)
+        assert dialect.delimiter == '\t'
+        assert dialect.encoding == 'cp1252'
+        assert dialect.lineterminator == '\r\n'
+    finally:
+        os.unlink(path)
+
+
+def test_detection_is_cached_per_file():
+    """Detection is reused until the file's size or mtime changes."""
+    clear_dialect_cache()
+    path = write_text('A,B\n1,2\n')
+    try:
+        first = detect_dialect(path)
+        assert detect_dialect(path) is first
+
+        with open(path, 'w', newline='') as f:
+            f.write('A|B|C\n1|2|3\n')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        second = detect_dialect(path)
+        assert second is not first
+        assert second.delimiter == '|'
+    finally:
+        os.unlink(path)
+
+
+def test_split_uses_detected_dialect():
+    """The split engine reads with the same dialect as header loading."""
+    path = write_text('ID;NAME;DEPT\n1;"Doe; John";IT\n2;Jane;HR\n3;Bob;IT\n', encoding='utf-8-sig')
+    output_dir = tempfile.mkdtemp()
+    try:
+        result = CSVProcessor().split_csv_by_fields(path, output_dir, ['DEPT'], ['ID', 'NAME'])
+        assert result.success, result.error
+        assert result.files_created == 2
+        assert result.total_rows == 3
+
+        it_file = os.path.join(output_dir, f"IT_{Path(path).stem}.csv")
+        with open(it_file, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        assert rows == [['ID', 'NAME'], ['1', 'Doe; John'], ['3', 'Bob']]
+    finally:
+        os.unlink(path)
+        import shutil
+        shutil.rmtree(output_dir)
+
+
+def test_backslash_escaped_quotes():
+    """Backslash escaping is detected even when a field ends in an escaped quote."""
+    escaped = write_text('ID,QUOTE,CITY\n1,"he said \\"hi\\"",Oslo\n2,"plain",Rome\n')
+    doubled = write_text('ID,QUOTE,CITY\n1,"he said ""hi""",Oslo\n2,"plain",Rome\n')
+    try:
+        dialect = detect_dialect(escaped)
+        assert not dialect.doublequote and dialect.escapechar == '\\'
+        with dialect.open(escaped) as f:
+            rows = list(csv.reader(f, **dialect.reader_kwargs()))
+        assert rows[1] == ['1', 'he said "hi"', 'Oslo']
+
+        dialect = detect_dialect(doubled)
+        assert dialect.doublequote and dialect.escapechar is None
+        with dialect.open(doubled) as f:
+            rows = list(csv.reader(f, **dialect.reader_kwargs()))
+        assert rows[1] == ['1', 'he said "hi"', 'Oslo']
+    finally:
+        os.unlink(escaped)
+        os.unlink(doubled)
+
+
+if __name__ == "__main__":
+    test_semicolon_with_bom()
+    test_legacy_encoding_and_tabs()
+    test_detection_is_cached_per_file()
+    test_split_uses_detected_dialect()
+    test_backslash_escaped_quotes()
+    print("✓ All dialect tests passed")
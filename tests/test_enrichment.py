@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for lookup-join enrichment during split.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.enrichment import LookupJoin
+
+
+def write_csv(rows, suffix='.csv'):
+    with tempfile.NamedTemporaryFile(mode='w', suffix=suffix, delete=False, newline='') as f:
+        csv.writer(f).writerows(rows)
+        return f.name
+
+
+def create_test_files(rows=3000):
+    """Create a source file of orders and a lookup file of region names."""
+    source = write_csv(
+        [['ORDER', 'CODE', 'AMOUNT']]
+        + [[str(i), f'R{i % 7}', str(i * 3)] for i in range(rows)]
+    )
+    # R6 has no lookup entry; R0 is repeated and its first entry wins
+    lookup = write_csv(
+        [['CODE', 'NAME', 'ZONE']]
+        + [[f'R{n}', f'Region {n}', 'East' if n % 2 else 'West'] for n in range(6)]
+        + [['R0', 'Duplicate', 'None']]
+    )
+    return source, lookup
+
+
+def read_outputs(output_dir):
+    outputs = {}
+    for name in os.listdir(output_dir):
+        with open(os.path.join(output_dir, name), newline='') as f:
+            outputs[name] = list(csv.reader(f))
+    return outputs
+
+
+def test_split_by_joined_column():
+    """Joined columns can be split on and included, in both engine modes."""
+    source, lookup = create_test_files()
+    output_dir = tempfile.mkdtemp()
+    stem = Path(source).stem
+    try:
+        for writer_threads in (0, 2):
+            shutil.rmtree(output_dir, ignore_errors=True)
+            processor = CSVProcessor(
+                progress_callback=lambda msg: None, writer_threads=writer_threads
+            )
+            result = processor.split_csv_by_fields(
+                source, output_dir, ['ZONE'], ['ORDER', 'NAME'],
+                join=LookupJoin(lookup, on=['CODE'])
+            )
+            assert result.success, result.error
+            assert result.total_rows == 3000
+            assert result.unmatched_rows == len([i for i in range(3000) if i % 7 == 6])
+
+            outputs = read_outputs(output_dir)
+            zones = ('East', 'West', 'empty')
+            assert sorted(outputs) == sorted(f'{zone}_{stem}.csv' for zone in zones)
+            west = outputs[f'West_{stem}.csv']
+            assert west[0] == ['ORDER', 'NAME']
+            assert west[1] == ['0', 'Region 0']
+            west_ids = [int(row[0]) for row in west[1:]]
+            assert west_ids == [i for i in range(3000) if i % 7 in (0, 2, 4)]
+            assert all(row[1] == '' for row in outputs[f'empty_{stem}.csv'][1:])
+    finally:
+        for path in (source, lookup):
+            os.unlink(path)
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def test_inner_join_with_prefix():
+    """Inner joins drop unmatched rows; prefixed names avoid header clashes."""
+    source, lookup = create_test_files(rows=700)
+    output_dir = tempfile.mkdtemp()
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        join = LookupJoin(
+            lookup, on=['CODE'], columns=['CODE', 'NAME'], lookup_on=['CODE'], how='inner'
+        )
+        result = processor.split_csv_by_fields(source, output_dir, ['CODE'], ['ORDER'], join=join)
+        assert not result.success
+        assert 'CODE' in result.error
+
+        join = LookupJoin(
+            lookup, on=['CODE'], columns=['CODE', 'NAME'], lookup_on=['CODE'], how='inner',
+            prefix='lookup_'
+        )
+        result = processor.split_csv_by_fields(
+            source, output_dir, ['lookup_NAME'], ['ORDER', 'lookup_CODE'], join=join
+        )
+        assert result.success, result.error
+        assert result.files_created == 6
+        rows = [row for rows in read_outputs(output_dir).values() for row in rows[1:]]
+        assert len(rows) == 600
+        assert all(int(order) % 7 == int(code[1:]) for order, code in rows)
+        assert join.duplicate_keys == 1
+    finally:
+        for path in (source, lookup):
+            os.unlink(path)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    test_split_by_joined_column()
+    test_inner_join_with_prefix()
+    print("✓ All enrichment tests passed")
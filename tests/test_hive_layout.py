@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the Hive-style nested partition layout.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor import partitioning
+from csv_processor.partitioning import HIVE_DEFAULT_PARTITION, HiveLayout, hive_escape
+
+
+# Values that a naive sanitizer would map to the same name
+TRICKY_VALUES = ['a/b', 'ab', 'a=b', '50%', '50%25', '', '.', '..', HIVE_DEFAULT_PARTITION]
+
+
+def create_test_csv():
+    """Create a test CSV file whose split values need escaping."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'CODE', 'YEAR'])
+        for i in range(900):
+            writer.writerow([str(i), TRICKY_VALUES[i % len(TRICKY_VALUES)], str(2020 + i % 2)])
+        return f.name
+
+
+def test_escaping_is_collision_free():
+    """Every distinct value gets its own single path component."""
+    components = [hive_escape(value) for value in TRICKY_VALUES + ['x ', 'x%20', 'tab\t']]
+    assert len(set(components)) == len(components)
+    assert all('/' not in c and c not in ('.', '..') for c in components)
+    assert hive_escape('North') == 'North'
+    assert hive_escape('a/b') == 'a%2Fb'
+
+
+def test_split_to_hive_directories():
+    """Each partition lands in its own field=value directory, in both engine modes."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    stem = Path(test_file).stem
+    try:
+        for writer_threads in (0, 2):
+            shutil.rmtree(output_dir)
+            processor = CSVProcessor(
+                progress_callback=lambda msg: None, writer_threads=writer_threads
+            )
+            result = processor.split_csv_by_fields(
+                test_file, output_dir, ['CODE', 'YEAR'], ['ID'], layout='hive', manifest=True
+            )
+            assert result.success, result.error
+            assert result.files_created == len(TRICKY_VALUES) * 2
+
+            for i, value in enumerate(TRICKY_VALUES):
+                for year in ('2020', '2021'):
+                    path = os.path.join(
+                        output_dir, f'CODE={hive_escape(value)}', f'YEAR={year}', f'{stem}.csv'
+                    )
+                    with open(path, newline='') as f:
+                        ids = [int(row[0]) for row in list(csv.reader(f))[1:]]
+                    assert ids == [
+                        n for n in range(900)
+                        if n % len(TRICKY_VALUES) == i and str(2020 + n % 2) == year
+                    ]
+
+            with open(os.path.join(output_dir, '_manifest.csv'), newline='') as f:
+                manifest = list(csv.DictReader(f))
+            assert os.path.join(f'CODE={hive_escape("a/b")}', 'YEAR=2020', f'{stem}.csv') in {
+                row['file'] for row in manifest
+            }
+
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, output_dir, ['CODE'], ['ID'], layout='nested'
+        )
+        assert not result.success
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_directories_created_once():
+    """mkdir runs once per partition directory, however often a path is requested."""
+    output_dir = tempfile.mkdtemp()
+    calls = []
+    original_makedirs = partitioning.os.makedirs
+
+    def counting_makedirs(path, exist_ok=False):
+        calls.append(path)
+        original_makedirs(path, exist_ok=exist_ok)
+
+    try:
+        partitioning.os.makedirs = counting_makedirs
+        layout = HiveLayout(output_dir, ['A', 'B'], 'part.csv')
+        for _ in range(3):
+            for a in ('x', 'y'):
+                for b in ('1', '2'):
+                    expected = os.path.join(output_dir, f'A={a}', f'B={b}', 'part.csv')
+                    assert layout.path_for((a, b)) == expected
+        # makedirs also calls itself for missing parents
+        leaf_calls = [path for path in calls if os.path.basename(path).startswith('B=')]
+        assert len(leaf_calls) == 4 == layout.directories_created
+    finally:
+        partitioning.os.makedirs = original_makedirs
+        shutil.rmtree(output_dir)
+
+
+def test_case_folded_values_detected():
+    """Values differing only in case fail where the file system merges their directories."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION'])
+        for i in range(10):
+            writer.writerow([str(i), ('North', 'north')[i % 2]])
+        test_file = f.name
+    output_dir = tempfile.mkdtemp()
+    original_samefile = partitioning.os.path.samefile
+    try:
+        # Case-sensitive here: both directories exist and keep their own rows
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, output_dir, ['REGION'], ['ID'], layout='hive'
+        )
+        assert result.success, result.error
+        assert sorted(os.listdir(output_dir)) == ['REGION=North', 'REGION=north']
+
+        # Case-insensitive, as on Windows and macOS: the clash is reported
+        shutil.rmtree(output_dir)
+        partitioning.os.path.samefile = lambda first, second: True
+        for writer_threads in (0, 2):
+            result = CSVProcessor(
+                progress_callback=lambda msg: None, writer_threads=writer_threads
+            ).split_csv_by_fields(test_file, output_dir, ['REGION'], ['ID'], layout='hive')
+            assert not result.success
+            assert 'REGION=North' in result.error and 'REGION=north' in result.error
+    finally:
+        partitioning.os.path.samefile = original_samefile
+        os.unlink(test_file)
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_escaping_is_collision_free()
+    test_split_to_hive_directories()
+    test_directories_created_once()
+    test_case_folded_values_detected()
+    print("✓ All Hive layout tests passed")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary columnar ingest cache.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.config import Config
+from csv_processor.ingest_cache import IngestCache
+
+
+def write_test_csv(path, rows=5000, region_prefix='R'):
+    """Write a test CSV file with a low- and a high-cardinality column."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION', 'NOTE', 'UNUSED'])
+        for i in range(rows):
+            writer.writerow([str(i), f'{region_prefix}{i % 4}', f'note, "{i}"\nline', 'x' * 20])
+    return path
+
+
+def read_outputs(output_dir):
+    outputs = {}
+    for name in os.listdir(output_dir):
+        with open(os.path.join(output_dir, name), 'rb') as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def split(processor, source, output_dir):
+    shutil.rmtree(output_dir, ignore_errors=True)
+    result = processor.split_csv_by_fields(source, output_dir, ['REGION'], ['NOTE', 'ID'])
+    assert result.success, result.error
+    return read_outputs(output_dir)
+
+
+def test_cached_split_matches_parsed_split():
+    """Splits read from the cache write the same files, and the entry is reused."""
+    work_dir = tempfile.mkdtemp()
+    original_chunk_rows = Config.INGEST_CACHE_CHUNK_ROWS
+    original_max_dictionary = Config.INGEST_CACHE_MAX_DICTIONARY
+    try:
+        # Small chunks, and a dictionary limit that ID and NOTE outgrow part-way
+        Config.INGEST_CACHE_CHUNK_ROWS = 700
+        Config.INGEST_CACHE_MAX_DICTIONARY = 1000
+        source = write_test_csv(os.path.join(work_dir, 'source.csv'))
+        output_dir = os.path.join(work_dir, 'out')
+        expected = split(CSVProcessor(progress_callback=lambda msg: None), source, output_dir)
+
+        cache = IngestCache(os.path.join(work_dir, 'cache'))
+        processor = CSVProcessor(progress_callback=lambda msg: None, ingest_cache=cache)
+        assert split(processor, source, output_dir) == expected
+        entry = cache.lookup(source)
+        assert entry is not None and entry.rows == 5000
+        assert entry.encoding('REGION') == 'dictionary'
+        assert entry.encoding('ID') == 'plain'
+        built_inode = os.stat(entry.directory).st_ino
+
+        for writer_threads in (0, 2):
+            processor.writer_threads = writer_threads
+            assert split(processor, source, output_dir) == expected
+        # The entry was not rebuilt
+        assert os.listdir(cache.cache_dir) == [os.path.basename(entry.directory)]
+        assert os.stat(entry.directory).st_ino == built_inode
+
+        result = processor.split_csv_by_fields(source, output_dir, ['REGION'], ['ID'])
+        assert result.engine == 'columnar-cache'
+    finally:
+        Config.INGEST_CACHE_CHUNK_ROWS = original_chunk_rows
+        Config.INGEST_CACHE_MAX_DICTIONARY = original_max_dictionary
+        shutil.rmtree(work_dir)
+
+
+def test_changed_source_invalidates_entry():
+    """A source with a new size or mtime is parsed again."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = write_test_csv(os.path.join(work_dir, 'source.csv'), rows=200)
+        output_dir = os.path.join(work_dir, 'out')
+        cache = IngestCache(os.path.join(work_dir, 'cache'))
+        processor = CSVProcessor(progress_callback=lambda msg: None, ingest_cache=cache)
+        split(processor, source, output_dir)
+
+        write_test_csv(source, rows=300, region_prefix='S')
+        outputs = split(processor, source, output_dir)
+        assert sorted(outputs) == [f'S{n}_source.csv' for n in range(4)]
+        assert cache.lookup(source).rows == 300
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_least_recently_used_entries_are_evicted():
+    """The cache stays within max_bytes by removing the oldest entries."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        sources = [
+            write_test_csv(os.path.join(work_dir, f'source{n}.csv'), rows=1000) for n in range(3)
+        ]
+        cache = IngestCache(os.path.join(work_dir, 'cache'))
+        processor = CSVProcessor(progress_callback=lambda msg: None, ingest_cache=cache)
+        for source in sources[:2]:
+            split(processor, source, os.path.join(work_dir, 'out'))
+            time.sleep(0.05)
+        entry_size = cache.lookup(sources[0]).size_bytes
+        time.sleep(0.05)
+
+        # sources[0] was used last, so sources[1] is evicted first
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+        split(processor, sources[2], os.path.join(work_dir, 'out'))
+        assert cache.lookup(sources[1]) is None
+        assert cache.lookup(sources[0]) is not None
+        assert cache.lookup(sources[2]) is not None
+        assert cache.total_bytes() <= cache.max_bytes
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_cached_split_matches_parsed_split()
+    test_changed_source_invalidates_entry()
+    test_least_recently_used_entries_are_evicted()
+    print("✓ All ingest cache tests passed")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the lazy partition iteration API.
+"""
+
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.config import Config
+from csv_processor.exceptions import ValidationError
+from csv_processor.streams import StreamSource
+
+
+def create_test_csv(rows=2500, distinct=2000):
+    """Create a test CSV file whose rows repeat after distinct rows."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION', 'AMOUNT'])
+        for i in range(rows):
+            writer.writerow([str(i % distinct), f'R{i % 3}', str(i % distinct * 2)])
+        return f.name
+
+
+def test_pairs_match_split_files():
+    """Keyed rows carry the same rows, in the same order, as the split files."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        partitions = processor.iter_partitions(test_file, ['REGION'], ['AMOUNT', 'ID'])
+        assert partitions.header == ['AMOUNT', 'ID']
+        rows_by_key = {}
+        for key, row in partitions:
+            rows_by_key.setdefault(key, []).append(list(row))
+        assert partitions.result.total_rows == 2500
+        assert partitions.result.bytes_read == os.path.getsize(test_file)
+
+        processor.split_csv_by_fields(test_file, output_dir, ['REGION'], ['AMOUNT', 'ID'])
+        stem = Path(test_file).stem
+        for (region,), rows in rows_by_key.items():
+            with open(os.path.join(output_dir, f'{region}_{stem}.csv'), newline='') as f:
+                assert list(csv.reader(f))[1:] == rows
+        assert sorted(rows_by_key) == [('R0',), ('R1',), ('R2',)]
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_grouped_batches_with_dedupe():
+    """Grouped mode yields per-batch groups; dedupe and buckets apply as when splitting."""
+    # More rows than one parsed batch of Config.PARSE_BATCH_SIZE
+    rows = Config.PARSE_BATCH_SIZE * 2 + 500
+    test_file = create_test_csv(rows, distinct=rows - 500)
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        groups = list(processor.iter_partitions(
+            test_file, ['REGION'], ['ID'], grouped=True, dedupe=True
+        ))
+        # Each key appears once per batch it occurs in
+        assert len(groups) > 3
+        ids = [int(row[0]) for _, group_rows in groups for row in group_rows]
+        assert sorted(ids) == list(range(rows - 500))
+
+        bucketed = processor.iter_partitions(test_file, ['ID'], ['ID'], buckets=4)
+        assert {key for key, _ in bucketed} <= {('0',), ('1',), ('2',), ('3',)}
+    finally:
+        os.unlink(test_file)
+
+
+def test_lazy_and_validated_up_front():
+    """Bad fields fail at once; iteration can stop early; streams work too."""
+    test_file = create_test_csv()
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        try:
+            processor.iter_partitions(test_file, ['CITY'], ['ID'])
+            assert False, "Missing split field should be rejected"
+        except ValidationError as e:
+            assert 'CITY' in str(e)
+
+        with processor.iter_partitions(test_file, ['REGION'], ['ID']) as partitions:
+            first = [next(partitions) for _ in range(5)]
+        assert [row for _, row in first] == [('0',), ('1',), ('2',), ('3',), ('4',)]
+        assert partitions.result.total_rows < 2500
+
+        with open(test_file, 'rb') as f:
+            data = f.read()
+        streamed = processor.iter_partitions(
+            StreamSource(io.BytesIO(data), 'upload.csv'), ['REGION'], ['ID']
+        )
+        assert sum(1 for _ in streamed) == 2500
+    finally:
+        os.unlink(test_file)
+
+
+if __name__ == "__main__":
+    test_pairs_match_split_files()
+    test_grouped_batches_with_dedupe()
+    test_lazy_and_validated_up_front()
+    print("✓ All partition iteration tests passed")
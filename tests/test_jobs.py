@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent job queue and its worker pool.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor.config import Config
+from csv_processor.exceptions import FileOperationError, ValidationError
+from csv_processor.jobs import JobQueue, JobRunner
+from csv_processor.processor import ProcessingResult
+from csv_processor.sorting import SortColumn
+
+
+def write_test_csv(path, rows=100):
+    """Write a test CSV file with a REGION column to split by."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION', 'AMOUNT'])
+        for i in range(rows):
+            writer.writerow([str(i), f'R{i % 3}', str(i * 10)])
+    return path
+
+
+def test_jobs_run_in_priority_order_and_store_results():
+    """Higher priorities run first, and each result is kept with its job."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = write_test_csv(os.path.join(work_dir, 'source.csv'))
+        queue = JobQueue(os.path.join(work_dir, 'jobs.db'))
+        low = queue.submit(source, os.path.join(work_dir, 'low'), ['REGION'], ['ID'])
+        high = queue.submit(
+            source, os.path.join(work_dir, 'high'), ['REGION'], ['ID', 'AMOUNT'], priority=5,
+            sort_by=[SortColumn('AMOUNT', kind='numeric', descending=True)], writer_threads=2
+        )
+        missing = queue.submit(
+            os.path.join(work_dir, 'missing.csv'), os.path.join(work_dir, 'x'), ['REGION'], ['ID']
+        )
+        cancelled = queue.submit(source, os.path.join(work_dir, 'never'), ['REGION'], ['ID'])
+        assert queue.cancel(cancelled)
+
+        runner = JobRunner(queue)
+        assert runner.run_pending() == 3
+
+        jobs = {job.id: job for job in queue.list_jobs()}
+        assert jobs[high].started_at <= jobs[low].started_at
+        assert jobs[high].status == 'succeeded' and jobs[low].status == 'succeeded'
+        assert jobs[high].result['files_created'] == 3 and jobs[high].result['total_rows'] == 100
+        with open(os.path.join(work_dir, 'high', 'R0_source.csv'), newline='') as f:
+            amounts = [int(row[1]) for row in list(csv.reader(f))[1:]]
+        assert amounts == sorted(amounts, reverse=True)
+        assert jobs[missing].status == 'failed' and jobs[missing].error
+        assert jobs[cancelled].status == 'cancelled'
+        assert not os.path.exists(os.path.join(work_dir, 'never'))
+
+        try:
+            queue.submit(source, work_dir, ['REGION'], ['ID'], colour='blue')
+            assert False, "Unknown option should be rejected"
+        except ValidationError:
+            pass
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_jobs_survive_restart():
+    """Queued jobs stay queued, and jobs of a vanished runner are requeued."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = write_test_csv(os.path.join(work_dir, 'source.csv'))
+        db_path = os.path.join(work_dir, 'jobs.db')
+        queue = JobQueue(db_path)
+        first = queue.submit(source, os.path.join(work_dir, 'first'), ['REGION'], ['ID'])
+        second = queue.submit(source, os.path.join(work_dir, 'second'), ['REGION'], ['ID'])
+        # A runner takes the first job and then dies without a heartbeat
+        assert queue.claim('dead-runner').id == first
+
+        reopened = JobQueue(db_path)
+        assert reopened.get(first).status == 'running'
+        assert reopened.get(second).status == 'queued'
+        assert reopened.requeue_stale(stale_after=60.0) == 0
+        assert reopened.requeue_stale(stale_after=-1.0) == 1
+
+        runner = JobRunner(reopened)
+        assert runner.run_pending() == 2
+        assert reopened.get(first).status == 'succeeded'
+        assert reopened.get(first).attempts == 2
+        assert reopened.get(second).status == 'succeeded'
+
+        # The dead runner's late result does not overwrite the rerun
+        late = ProcessingResult(success=False, error='late')
+        assert not reopened.finish(first, late, 'dead-runner')
+        assert reopened.get(first).status == 'succeeded' and reopened.get(first).error is None
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_device_limit_and_worker_pool():
+    """No more jobs run on one disk than allowed; the pool drains the queue."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = write_test_csv(os.path.join(work_dir, 'source.csv'))
+        queue = JobQueue(os.path.join(work_dir, 'jobs.db'))
+        ids = [
+            queue.submit(source, os.path.join(work_dir, f'out{n}'), ['REGION'], ['ID'])
+            for n in range(4)
+        ]
+
+        # Everything is on one disk, so a second job cannot start beside the first
+        assert queue.claim('a', device_limit=1).id == ids[0]
+        assert queue.claim('b', device_limit=1) is None
+        assert queue.claim('b', device_limit=2).id == ids[1]
+        queue.requeue_stale(stale_after=-1.0)
+
+        runner = JobRunner(queue, workers=3, device_limit=2)
+        runner.start()
+        runner.wake()
+        deadline = time.time() + 30
+        while time.time() < deadline and not all(queue.get(job_id).finished for job_id in ids):
+            time.sleep(0.05)
+        runner.stop()
+
+        jobs = [queue.get(job_id) for job_id in ids]
+        assert all(job.status == 'succeeded' for job in jobs), [job.to_dict() for job in jobs]
+        assert all(
+            os.path.exists(os.path.join(work_dir, f'out{n}', 'R1_source.csv')) for n in range(4)
+        )
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_worker_survives_queue_errors():
+    """A worker that cannot read the queue logs, backs off and keeps running."""
+    work_dir = tempfile.mkdtemp()
+    backoff = Config.JOB_ERROR_BACKOFF
+    try:
+        source = write_test_csv(os.path.join(work_dir, 'source.csv'))
+        queue = JobQueue(os.path.join(work_dir, 'jobs.db'))
+        job_id = queue.submit(source, os.path.join(work_dir, 'out'), ['REGION'], ['ID'])
+        claim = queue.claim
+        failures = [2]
+
+        def flaky_claim(*args, **kwargs):
+            if failures[0]:
+                failures[0] -= 1
+                raise FileOperationError("Job queue error: database is locked")
+            return claim(*args, **kwargs)
+
+        queue.claim = flaky_claim
+        Config.JOB_ERROR_BACKOFF = 0.01
+        runner = JobRunner(queue, workers=1)
+        runner.start()
+        deadline = time.time() + 30
+        while time.time() < deadline and not queue.get(job_id).finished:
+            time.sleep(0.05)
+        runner.stop()
+        assert failures[0] == 0
+        assert queue.get(job_id).status == 'succeeded'
+    finally:
+        Config.JOB_ERROR_BACKOFF = backoff
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_jobs_run_in_priority_order_and_store_results()
+    test_jobs_survive_restart()
+    test_device_limit_and_worker_pool()
+    test_worker_survives_queue_errors()
+    print("✓ All job queue tests passed")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory budget governor.
+"""
+
+import csv
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.config import Config
+from csv_processor.dedupe import DedupePolicy, Deduplicator
+from csv_processor.memory import MemoryGovernor, spill_batch_rows
+from csv_processor.sorting import SortColumn, SortingWriter, build_sort_key
+from csv_processor.writers import PartitionFileWriter
+
+
+def create_test_csv(work_dir, rows):
+    """Create a test CSV file whose IDs repeat every half of the rows."""
+    path = os.path.join(work_dir, 'orders.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION', 'AMOUNT'])
+        for i in range(rows):
+            writer.writerow([str(i % (rows // 2)), f'R{i % 5}', str((i * 7919) % 1000)])
+    return path
+
+
+def read_outputs(output_dir):
+    outputs = {}
+    for name in sorted(os.listdir(output_dir)):
+        with open(os.path.join(output_dir, name), 'rb') as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def test_governor_escalates_in_order():
+    """Strategies escalate through every step, on estimates or RSS growth, and never back off."""
+    rss = [1000]
+    estimate = [0]
+    switches = []
+    governor = MemoryGovernor(1000, rss_interval=0.0, rss_reader=lambda: rss[0])
+    governor.track(lambda: estimate[0])
+    governor.on_switch(switches.append)
+
+    assert governor.check() == 'group'
+    estimate[0] = 600
+    assert governor.check() == 'flush'
+    estimate[0] = 0
+    assert governor.check() == 'flush'
+    rss[0] = 1900
+    assert governor.check() == 'spill'
+    assert switches == ['flush', 'spill']
+    assert governor.peak_usage == 900
+
+    jumped = []
+    governor = MemoryGovernor(1000, rss_reader=lambda: None)
+    governor.track(lambda: 5000)
+    governor.on_switch(jumped.append)
+    assert governor.check() == 'spill' and jumped == ['flush', 'spill']
+
+
+def test_grouping_switches_to_flushing():
+    """A split over its budget writes batches as it reads them, with unchanged output."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        # More rows than one parsed batch, so grouping is interrupted mid-file
+        source = create_test_csv(work_dir, Config.PARSE_BATCH_SIZE * 3)
+        expected = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            source, os.path.join(work_dir, 'plain'), ['REGION'], ['ID', 'AMOUNT']
+        )
+        assert expected.memory_strategy is None
+
+        roomy = CSVProcessor(progress_callback=lambda msg: None, max_memory=64 * 1024 * 1024 * 1024)
+        result = roomy.split_csv_by_fields(
+            source, os.path.join(work_dir, 'roomy'), ['REGION'], ['ID', 'AMOUNT']
+        )
+        assert result.success, result.error
+        assert result.memory_strategy == 'group'
+
+        tight = CSVProcessor(progress_callback=lambda msg: None, max_memory=1024 * 1024)
+        result = tight.split_csv_by_fields(
+            source, os.path.join(work_dir, 'tight'), ['REGION'], ['ID', 'AMOUNT'],
+            max_rows_per_file=4000
+        )
+        assert result.success, result.error
+        assert result.memory_strategy in ('flush', 'spill')
+        assert result.to_dict()['memory_strategy'] == result.memory_strategy
+        assert result.total_rows == expected.total_rows
+
+        plain = read_outputs(os.path.join(work_dir, 'plain'))
+        assert read_outputs(os.path.join(work_dir, 'roomy')) == plain
+        # Rolled parts joined back together hold the same rows in the same order
+        for name, data in plain.items():
+            stem = name[:-len('.csv')]
+            parts = sorted(
+                part for part in os.listdir(os.path.join(work_dir, 'tight'))
+                if part.startswith(stem + '_part')
+            )
+            rows = []
+            for part in parts:
+                with open(os.path.join(work_dir, 'tight', part), newline='') as f:
+                    rows.extend(list(csv.reader(f))[1:])
+            assert rows == list(csv.reader(data.decode('utf-8').splitlines()))[1:]
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_sort_and_dedupe_spill_under_budget():
+    """Under a tiny budget sorting and dedupe spill to disk and still give the same output."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = create_test_csv(work_dir, Config.PARSE_BATCH_SIZE * 2)
+        options = dict(sort_by=['AMOUNT'], dedupe=True)
+        expected = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            source, os.path.join(work_dir, 'plain'), ['REGION'], ['ID', 'AMOUNT'], **options
+        )
+        tight = CSVProcessor(progress_callback=lambda msg: None, max_memory=1000)
+        result = tight.split_csv_by_fields(
+            source, os.path.join(work_dir, 'tight'), ['REGION'], ['ID', 'AMOUNT'], **options
+        )
+        assert result.success, result.error
+        assert result.memory_strategy == 'spill'
+        assert result.duplicates_removed == expected.duplicates_removed == Config.PARSE_BATCH_SIZE
+        plain = read_outputs(os.path.join(work_dir, 'plain'))
+        assert read_outputs(os.path.join(work_dir, 'tight')) == plain
+
+        archive = os.path.join(work_dir, 'orders.zip')
+        result = tight.split_csv_to_archive(source, archive, ['REGION'], ['ID'])
+        assert result.success, result.error
+        assert all(info.part is not None for info in result.partitions)
+
+        failed = CSVProcessor(progress_callback=lambda msg: None, max_memory=0).split_csv_by_fields(
+            source, os.path.join(work_dir, 'bad'), ['REGION'], ['ID']
+        )
+        assert not failed.success and 'Maximum memory' in failed.error
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_approximate_dedupe_fits_budget():
+    """A Bloom filter larger than max_memory is shrunk to fit and does not force a spill."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = create_test_csv(work_dir, 2000)
+        max_memory = 64 * 1024 * 1024
+        policy = DedupePolicy(mode='approximate')
+        assert policy.memory_budget > max_memory
+        processor = CSVProcessor(progress_callback=lambda msg: None, max_memory=max_memory)
+        result = processor.split_csv_by_fields(
+            source, os.path.join(work_dir, 'out'), ['REGION'], ['ID', 'AMOUNT'], dedupe=policy
+        )
+        assert result.success, result.error
+        assert result.memory_strategy == 'group'
+        assert result.duplicates_removed == 1000
+
+        deduplicator = Deduplicator(policy, filter_bytes=1024)
+        assert deduplicator.memory_bytes == 0
+        assert deduplicator._bloom.bits == 1024 * 8
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_spill_batches_follow_budget():
+    """Spilled runs are pickled in batches sized from the budget, and merges check the governor."""
+    assert spill_batch_rows(10 ** 12, 64, 100) == Config.SPILL_BATCH_ROWS
+    assert spill_batch_rows(1000, 64, 100) == Config.SPILL_MIN_BATCH_ROWS
+    assert spill_batch_rows(64 * 100 * 500, 64, 100) == 500
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        header = ['ID', 'AMOUNT']
+        writer = PartitionFileWriter(header, lambda key: os.path.join(work_dir, f'{key[0]}.csv'))
+        checks = []
+        budget = 2 * 1024 * 1024
+        sorting = SortingWriter(
+            writer, build_sort_key([SortColumn('AMOUNT', 'numeric')], header), budget,
+            temp_dir=work_dir, memory_check=lambda: checks.append(1)
+        )
+        rows = [(str(i), str((i * 7919) % 100000)) for i in range(60000)]
+        for start in range(0, len(rows), 5000):
+            sorting.append(('all',), rows[start:start + 5000])
+        runs = sorting._runs[('all',)]
+        assert sorting.runs_spilled >= 2
+        for run in runs:
+            with open(run.path, 'rb') as f:
+                batch = pickle.load(f)
+            expected_rows = spill_batch_rows(budget, Config.SORT_MERGE_FAN_IN, run.row_bytes)
+            assert len(batch) == expected_rows < 10000
+        sorting.close_all()
+        assert checks
+        with open(os.path.join(work_dir, 'all.csv'), newline='') as f:
+            amounts = [int(row[1]) for row in list(csv.reader(f))[1:]]
+        assert amounts == sorted(amounts) and len(amounts) == 60000
+    finally:
+        shutil.rmtree(work_dir)
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = create_test_csv(work_dir, Config.PARSE_BATCH_SIZE * 4)
+        checks = []
+        original_check = MemoryGovernor.check
+
+        def counting_check(governor):
+            checks.append(governor.strategy)
+            return original_check(governor)
+
+        MemoryGovernor.check = counting_check
+        try:
+            tight = CSVProcessor(progress_callback=lambda msg: None, max_memory=1000)
+            result = tight.split_csv_by_fields(
+                source, os.path.join(work_dir, 'out'), ['REGION'], ['ID', 'AMOUNT'], dedupe=True
+            )
+        finally:
+            MemoryGovernor.check = original_check
+        assert result.success, result.error
+        # One check per parsed batch, then more while the spilled rows are drained
+        assert len(checks) > 4
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_governor_escalates_in_order()
+    test_grouping_switches_to_flushing()
+    test_sort_and_dedupe_spill_under_budget()
+    test_approximate_dedupe_fits_budget()
+    test_spill_batches_follow_budget()
+    print("✓ All memory governor tests passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for merging CSV files into one.
+"""
+
+import csv
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.config import Config
+from csv_processor.sorting import SortColumn
+
+
+def write_csv(directory, name, rows, delimiter=','):
+    path = os.path.join(directory, name)
+    with open(path, 'w', newline='') as f:
+        csv.writer(f, delimiter=delimiter).writerows(rows)
+    return path
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_concat_aligns_columns_by_name():
+    """Inputs with reordered and missing columns are concatenated in order."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        first = write_csv(work_dir, 'a.csv', [['ID', 'NAME'], ['1', 'x'], ['2', 'y']])
+        second = write_csv(
+            work_dir, 'b.csv', [['NAME', 'CITY', 'ID'], ['z', 'Oslo', '3']], delimiter=';'
+        )
+        third = write_csv(work_dir, 'c.csv', [['ID'], ['4']])
+        output = os.path.join(work_dir, 'out', 'merged.csv')
+
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        result = processor.merge_csv_files([first, second, third], output)
+        assert result.success, result.error
+        assert result.total_rows == 4
+        assert result.bytes_written == os.path.getsize(output)
+        assert read_rows(output) == [
+            ['ID', 'NAME', 'CITY'],
+            ['1', 'x', ''], ['2', 'y', ''], ['3', 'z', 'Oslo'], ['4', '', '']
+        ]
+
+        result = processor.merge_csv_files([first, second], output, fields=['CITY', 'ID'])
+        assert result.success, result.error
+        assert read_rows(output) == [['CITY', 'ID'], ['', '1'], ['', '2'], ['Oslo', '3']]
+
+        result = processor.merge_csv_files([first, second], first)
+        assert not result.success
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_sorted_merge_round_trips_a_split():
+    """Merging sorted split outputs restores the sorted source, in multiple passes."""
+    work_dir = tempfile.mkdtemp()
+    original_fan_in = Config.MERGE_FAN_IN
+    rng = random.Random(5)
+    rows = [[str(i), f'K{rng.randint(0, 40)}', str(rng.randint(0, 999))] for i in range(4000)]
+    try:
+        source = write_csv(work_dir, 'source.csv', [['ID', 'KEY', 'VALUE']] + rows)
+        split_dir = os.path.join(work_dir, 'split')
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        result = processor.split_csv_by_fields(
+            source, split_dir, ['KEY'], ['VALUE', 'ID', 'KEY'],
+            sort_by=[SortColumn('VALUE', 'numeric')]
+        )
+        assert result.success, result.error
+
+        Config.MERGE_FAN_IN = 4
+        output = os.path.join(work_dir, 'merged.csv')
+        parts = sorted(info.path for info in result.partitions)
+        result = processor.merge_csv_files(parts, output, sort_by=[SortColumn('VALUE', 'numeric')])
+        assert result.success, result.error
+        assert result.total_rows == 4000
+        assert result.max_open_fds is not None
+
+        merged = read_rows(output)
+        assert merged[0] == ['VALUE', 'ID', 'KEY']
+        values = [int(row[0]) for row in merged[1:]]
+        assert values == sorted(values)
+        assert sorted(int(row[1]) for row in merged[1:]) == list(range(4000))
+
+        result = processor.merge_csv_files([source, parts[0]], output, sort_by=['ID'])
+        assert not result.success
+        assert 'not sorted' in result.error
+    finally:
+        Config.MERGE_FAN_IN = original_fan_in
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_concat_aligns_columns_by_name()
+    test_sorted_merge_round_trips_a_split()
+    print("✓ All merging tests passed")
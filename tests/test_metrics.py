@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for processing metrics and the Prometheus text-file exporter.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.metrics import ProcessingMetrics, TextfileExporter
+
+
+def create_test_csv():
+    """Create a small employee CSV file."""
+    test_data = [
+        ['ID', 'NAME', 'DEPARTMENT'],
+        ['1', 'John Doe', 'IT'],
+        ['2', 'Jane Smith', 'HR'],
+        ['3', 'Bob Johnson', 'IT'],
+    ]
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        csv.writer(f).writerows(test_data)
+        return f.name
+
+
+def test_metrics_across_runs_and_export():
+    """Successful and failed runs are counted and exported in text format."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        metrics = ProcessingMetrics()
+        processor = CSVProcessor(progress_callback=lambda msg: None, metrics=metrics)
+
+        assert processor.split_csv_by_fields(test_file, output_dir, ['DEPARTMENT'], ['ID']).success
+        assert not processor.split_csv_by_fields(test_file, output_dir, ['MISSING'], ['ID']).success
+
+        assert metrics.rows_processed.value() == 3
+        assert metrics.partitions_created.value() == 2
+        assert metrics.runs.value('success') == 1
+        assert metrics.runs.value('failure') == 1
+        assert metrics.errors.value('ValidationError') == 1
+
+        prom_file = os.path.join(output_dir, 'metrics', 'csv_processor.prom')
+        TextfileExporter(metrics, prom_file).write()
+        with open(prom_file, encoding='utf-8') as f:
+            text = f.read()
+        assert '# TYPE csv_processor_rows_processed_total counter' in text
+        assert 'csv_processor_rows_processed_total 3' in text
+        assert 'csv_processor_errors_total{type="ValidationError"} 1' in text
+        assert 'csv_processor_phase_duration_seconds_count{phase="parse"} 1' in text
+        assert 'csv_processor_run_duration_seconds_bucket{le="+Inf"} 1' in text
+        leftovers = os.listdir(os.path.dirname(prom_file))
+        assert not [name for name in leftovers if name.endswith('.tmp')]
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    test_metrics_across_runs_and_export()
+    print("✓ All metrics tests passed")
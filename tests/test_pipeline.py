@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for pipelined splitting with dedicated writer threads.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.config import Config
+
+
+def create_test_csv(rows=25000):
+    """Create a test CSV file with many regions spread over several batches."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION', 'AMOUNT'])
+        for i in range(rows):
+            writer.writerow([str(i), f'R{i % 37}', str(i * 3)])
+        return f.name
+
+
+def read_outputs(output_dir):
+    """Map each output file name to its contents."""
+    outputs = {}
+    for name in os.listdir(output_dir):
+        with open(os.path.join(output_dir, name), 'rb') as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def test_pipelined_output_matches_in_memory():
+    """Writer threads produce byte-identical files, rows in source order."""
+    test_file = create_test_csv()
+    baseline_dir = tempfile.mkdtemp()
+    pipelined_dir = tempfile.mkdtemp()
+    try:
+        baseline = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, baseline_dir, ['REGION'], ['ID', 'AMOUNT']
+        )
+        pipelined = CSVProcessor(
+            progress_callback=lambda msg: None, writer_threads=3
+        ).split_csv_by_fields(test_file, pipelined_dir, ['REGION'], ['ID', 'AMOUNT'])
+        assert baseline.success, baseline.error
+        assert pipelined.success, pipelined.error
+
+        assert pipelined.total_rows == baseline.total_rows == 25000
+        assert pipelined.files_created == baseline.files_created == 37
+        assert pipelined.bytes_written == baseline.bytes_written
+        assert read_outputs(pipelined_dir) == read_outputs(baseline_dir)
+
+        assert set(pipelined.stages) == {'reader', 'writer-0', 'writer-1', 'writer-2'}
+        assert sum(
+            stage['batches'] for name, stage in pipelined.stages.items() if name != 'reader'
+        ) > 0
+        assert baseline.stages == {}
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(baseline_dir)
+        shutil.rmtree(pipelined_dir)
+
+
+def test_pipelined_reopens_evicted_partitions():
+    """Partitions evicted from the open-file cache are appended to, not truncated."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    original_limit = Config.MAX_OPEN_FILES
+    try:
+        Config.MAX_OPEN_FILES = 4
+        result = CSVProcessor(
+            progress_callback=lambda msg: None, writer_threads=2
+        ).split_csv_by_fields(test_file, output_dir, ['REGION'], ['ID'])
+        assert result.success, result.error
+        assert sum(partition.rows for partition in result.partitions) == 25000
+
+        with open(os.path.join(output_dir, f'R0_{Path(test_file).stem}.csv'), newline='') as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ['ID']
+        assert [int(row[0]) for row in rows[1:]] == list(range(0, 25000, 37))
+    finally:
+        Config.MAX_OPEN_FILES = original_limit
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_colliding_keys_get_their_own_files():
+    """Keys whose names clean to the same file, up to case, get numbered files, not one."""
+    keys = ['a/b', 'ab', 'a?b', 'AB']
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION'])
+        for i in range(20000):
+            writer.writerow([str(i), keys[i % 4]])
+        test_file = f.name
+    stem = Path(test_file).stem
+    work_dir = tempfile.mkdtemp()
+    original_limit = Config.MAX_OPEN_FILES
+    try:
+        Config.MAX_OPEN_FILES = 2
+        runs = {
+            'memory': CSVProcessor(progress_callback=lambda msg: None),
+            'pipelined': CSVProcessor(progress_callback=lambda msg: None, writer_threads=2),
+            'governed': CSVProcessor(progress_callback=lambda msg: None, max_memory=1024 * 1024),
+        }
+        outputs = {}
+        for name, processor in runs.items():
+            result = processor.split_csv_by_fields(
+                test_file, os.path.join(work_dir, name), ['REGION'], ['ID', 'REGION']
+            )
+            assert result.success, result.error
+            assert result.files_created == 4
+            outputs[name] = read_outputs(os.path.join(work_dir, name))
+
+        assert outputs['pipelined'] == outputs['governed'] == outputs['memory']
+        names = [f'ab_{stem}.csv', f'ab_{stem}-2.csv', f'ab_{stem}-3.csv', f'AB_{stem}-4.csv']
+        assert sorted(outputs['memory']) == sorted(names)
+        for index, name in enumerate(names):
+            rows = list(csv.reader(outputs['memory'][name].decode('utf-8').splitlines()))
+            assert rows[0] == ['ID', 'REGION']
+            assert rows[1:] == [[str(i), keys[index]] for i in range(index, 20000, 4)]
+
+        rolled_dir = os.path.join(work_dir, 'rolled')
+        result = runs['pipelined'].split_csv_by_fields(
+            test_file, rolled_dir, ['REGION'], ['ID', 'REGION'], max_bytes_per_file=20000
+        )
+        assert result.success, result.error
+        for info in result.partitions:
+            with open(info.path, newline='') as f:
+                rows = list(csv.reader(f))
+            assert {row[1] for row in rows[1:]} == {info.split_key[0]}
+        assert len({info.path for info in result.partitions}) == len(result.partitions)
+    finally:
+        Config.MAX_OPEN_FILES = original_limit
+        os.unlink(test_file)
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_pipelined_output_matches_in_memory()
+    test_pipelined_reopens_evicted_partitions()
+    test_colliding_keys_get_their_own_files()
+    print("✓ All pipeline tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for aggregated progress logging and the partition manifest.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor, Config
+from csv_processor.logger import ProgressAggregator
+
+
+def test_aggregator_collapses_events():
+    """Only the first events are reported individually; the rest are summarized."""
+    messages = []
+    progress = ProgressAggregator(messages.append, interval=3600, detail_limit=2)
+    for i in range(1000):
+        progress.add(lambda: f"event {i}")
+    progress.flush()
+
+    assert messages[:2] == ["event 0", "event 1"]
+    assert len(messages) == 3
+    assert messages[2].startswith("Created 998 files in the last")
+    assert "(1,000 total)" in messages[2]
+
+
+def test_many_partitions_with_manifest():
+    """A many-partition run logs a bounded number of messages and writes a manifest."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'KEY'])
+        writer.writerows([str(i), f'K{i}'] for i in range(500))
+        test_file = f.name
+    output_dir = tempfile.mkdtemp()
+    try:
+        messages = []
+        processor = CSVProcessor(progress_callback=messages.append)
+        result = processor.split_csv_by_fields(
+            test_file, output_dir, ['KEY'], ['ID'], manifest=True
+        )
+        assert result.success, result.error
+        assert result.files_created == 500
+        created = [m for m in messages if m.startswith("Created file for")]
+        assert len(created) == Config.PROGRESS_DETAIL_LIMIT
+        assert len(messages) < 50
+
+        with open(os.path.join(output_dir, Config.MANIFEST_FILENAME), newline='') as f:
+            manifest = list(csv.reader(f))
+        assert manifest[0] == ['KEY', 'file', 'rows', 'bytes']
+        assert len(manifest) == 501
+        key, filename, rows, size = manifest[1]
+        assert rows == '1'
+        assert os.path.getsize(os.path.join(output_dir, filename)) == int(size)
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    test_aggregator_collapses_events()
+    test_many_partitions_with_manifest()
+    print("✓ All progress tests passed")
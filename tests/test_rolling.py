@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for size-bounded rolling of partition files.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.config import Config
+
+
+def create_skewed_csv(rows=5000):
+    """Create a test CSV file where one region holds 90% of the rows."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION', 'NOTE'])
+        for i in range(rows):
+            writer.writerow([str(i), 'North' if i % 10 else 'South', f'note {i}'])
+        return f.name
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_roll_by_rows():
+    """Partitions roll every N rows into numbered parts that each have a header."""
+    test_file = create_skewed_csv()
+    output_dir = tempfile.mkdtemp()
+    stem = Path(test_file).stem
+    try:
+        for writer_threads in (0, 2):
+            shutil.rmtree(output_dir)
+            processor = CSVProcessor(
+                progress_callback=lambda msg: None, writer_threads=writer_threads
+            )
+            result = processor.split_csv_by_fields(
+                test_file, output_dir, ['REGION'], ['ID'], manifest=True, max_rows_per_file=1000
+            )
+            assert result.success, result.error
+            assert result.files_created == 6
+            assert sorted(os.listdir(output_dir)) == sorted(
+                [f'North_{stem}_part{n:04d}.csv' for n in range(1, 6)]
+                + [f'South_{stem}_part0001.csv', Config.MANIFEST_FILENAME]
+            )
+
+            north = []
+            for n in range(1, 6):
+                rows = read_rows(os.path.join(output_dir, f'North_{stem}_part{n:04d}.csv'))
+                assert rows[0] == ['ID']
+                assert len(rows) - 1 == (1000 if n < 5 else 500)
+                north.extend(int(row[0]) for row in rows[1:])
+            assert north == [i for i in range(5000) if i % 10]
+
+            manifest = read_rows(os.path.join(output_dir, Config.MANIFEST_FILENAME))
+            assert manifest[0] == ['REGION', 'file', 'rows', 'bytes', 'part']
+            assert sorted((row[0], row[4]) for row in manifest[1:]) == sorted(
+                [('North', str(n)) for n in range(1, 6)] + [('South', '1')]
+            )
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def test_roll_by_bytes():
+    """No part exceeds the byte limit and no rows are lost or reordered."""
+    test_file = create_skewed_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, output_dir, ['REGION'], ['ID', 'NOTE'], max_bytes_per_file=4096
+        )
+        assert result.success, result.error
+        assert all(os.path.getsize(p.path) == p.bytes_written <= 4096 for p in result.partitions)
+        assert result.bytes_written == sum(p.bytes_written for p in result.partitions)
+
+        north = [p for p in result.partitions if p.split_key == ('North',)]
+        assert [p.part for p in north] == list(range(1, len(north) + 1))
+        ids = [int(row[0]) for p in north for row in read_rows(p.path)[1:]]
+        assert ids == [i for i in range(5000) if i % 10]
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    test_roll_by_rows()
+    test_roll_by_bytes()
+    print("✓ All rolling tests passed")
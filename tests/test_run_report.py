@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for run metrics on ProcessingResult and the JSON run report.
+"""
+
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor, Config
+from csv_processor.resources import ResourceSampler
+
+
+def create_test_csv():
+    """Create a small employee CSV file."""
+    test_data = [
+        ['ID', 'NAME', 'DEPARTMENT', 'SALARY'],
+        ['1', 'John Doe', 'IT', '75000'],
+        ['2', 'Jane Smith', 'HR', '65000'],
+        ['3', 'Bob Johnson', 'IT', '80000'],
+    ]
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        csv.writer(f).writerows(test_data)
+        return f.name
+
+
+def test_result_metrics_and_report():
+    """Results carry byte, timing and partition metrics and can be saved as JSON."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        result = processor.split_csv_by_fields(
+            test_file, output_dir, ['DEPARTMENT'], ['ID', 'NAME'], run_report=True
+        )
+        assert result.success, result.error
+        assert result.bytes_read == os.path.getsize(test_file)
+        assert result.engine == 'csv'
+        assert result.wall_time > 0 and result.rows_per_second > 0
+        assert result.max_open_fds >= 2
+
+        sizes = {p.split_key: (p.rows, p.bytes_written) for p in result.partitions}
+        assert sizes[('IT',)][0] == 2 and sizes[('HR',)][0] == 1
+        for partition in result.partitions:
+            assert os.path.getsize(partition.path) == partition.bytes_written
+        assert result.bytes_written == sum(p.bytes_written for p in result.partitions)
+
+        with open(os.path.join(output_dir, Config.RUN_REPORT_FILENAME), encoding='utf-8') as f:
+            report = json.load(f)
+        assert report['result']['total_rows'] == 3
+        assert report['split_by_fields'] == ['DEPARTMENT']
+        assert len(report['result']['partitions']) == 2
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_resources_are_per_run():
+    """RSS and descriptors are measured from the start of each run, not the process lifetime."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    held = []
+    try:
+        sampler = ResourceSampler(interval=0.01).start()
+        block = bytearray(b'x' * (32 * 1024 * 1024))
+        held = [open(test_file) for _ in range(20)]
+        time.sleep(0.05)
+        sampler.stop()
+        del block
+        if sampler.rss_growth is not None:
+            assert sampler.rss_growth >= 16 * 1024 * 1024
+        if sampler.fd_growth is not None:
+            assert sampler.fd_growth >= 20
+
+        # The descriptors still held and the earlier peak belong to the process, not to this run
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, output_dir, ['DEPARTMENT'], ['ID', 'NAME']
+        )
+        assert result.success, result.error
+        assert 2 <= result.max_open_fds < 20
+        if result.rss_growth is not None:
+            assert 0 <= result.rss_growth < 16 * 1024 * 1024
+        assert result.to_dict()['rss_growth'] == result.rss_growth
+    finally:
+        for f in held:
+            f.close()
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    test_result_metrics_and_report()
+    test_resources_are_per_run()
+    print("✓ All run report tests passed")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTTP job service and streamed uploads.
+"""
+
+import csv
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.jobs import JobQueue
+from csv_processor.service import JobService
+from csv_processor.streams import StreamSource
+
+
+def csv_bytes(rows=3000):
+    lines = ['ID,REGION,NOTE']
+    for i in range(rows):
+        lines.append(f'{i},R{i % 3},"note, {i}"')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class TrickleStream:
+    """Binary stream returning a few bytes per read, recording how far it was read."""
+
+    def __init__(self, data, step=7):
+        self.data = data
+        self.step = step
+        self.position = 0
+
+    def read(self, size=-1):
+        size = self.step if size < 0 else min(size, self.step)
+        chunk = self.data[self.position:self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+
+def request(service, method, path, body=None, headers=None):
+    host, port = service.address
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        headers = headers or {}
+        conn.request(method, path, body=body, headers=headers,
+                     encode_chunked='Transfer-Encoding' in headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def read_ids(path):
+    with open(path, newline='') as f:
+        return [int(row[0]) for row in list(csv.reader(f))[1:]]
+
+
+def test_stream_source_split():
+    """A stream is split like the same data in a file, reading each byte once."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        data = csv_bytes()
+        source = os.path.join(work_dir, 'orders.csv')
+        with open(source, 'wb') as f:
+            f.write(data)
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        expected = processor.split_csv_by_fields(
+            source, os.path.join(work_dir, 'file'), ['REGION'], ['ID', 'NOTE']
+        )
+
+        stream = TrickleStream(data, step=4096)
+        result = processor.split_csv_by_fields(
+            StreamSource(stream, 'orders.csv'), os.path.join(work_dir, 'stream'),
+            ['REGION'], ['ID', 'NOTE']
+        )
+        assert result.success, result.error
+        assert result.engine == 'csv-stream'
+        assert result.bytes_read == len(data) == stream.position
+        assert result.total_rows == expected.total_rows
+        for name in os.listdir(os.path.join(work_dir, 'file')):
+            with open(os.path.join(work_dir, 'file', name), 'rb') as a, \
+                    open(os.path.join(work_dir, 'stream', name), 'rb') as b:
+                assert a.read() == b.read()
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_http_jobs_and_uploads():
+    """Local-file jobs are queued and run; chunked uploads are split as they arrive."""
+    work_dir = tempfile.mkdtemp()
+    service = JobService(JobQueue(os.path.join(work_dir, 'jobs.db')), port=0, workers=1)
+    service.start()
+    try:
+        source = os.path.join(work_dir, 'local.csv')
+        with open(source, 'wb') as f:
+            f.write(csv_bytes(300))
+        status, job = request(service, 'POST', '/jobs', json.dumps({
+            'source_file': source, 'output_dir': os.path.join(work_dir, 'queued'),
+            'split_by_fields': ['REGION'], 'included_fields': ['ID'], 'options': {'manifest': True},
+        }))
+        assert status == 202 and job['status'] in ('queued', 'running')
+        deadline = time.time() + 20
+        while time.time() < deadline and job['status'] in ('queued', 'running'):
+            time.sleep(0.05)
+            status, job = request(service, 'GET', f"/jobs/{job['id']}")
+        assert job['status'] == 'succeeded', job
+        assert job['result']['total_rows'] == 300 and job['result']['files_created'] == 3
+        assert os.path.exists(os.path.join(work_dir, 'queued', '_manifest.csv'))
+
+        def chunks():
+            data = csv_bytes()
+            for start in range(0, len(data), 1000):
+                yield data[start:start + 1000]
+
+        query = urlencode(
+            [('name', 'orders.csv'), ('output_dir', os.path.join(work_dir, 'uploaded')),
+             ('split_by', 'REGION'), ('include', 'ID,NOTE')]
+        )
+        status, upload = request(service, 'POST', f'/uploads?{query}', body=chunks(),
+                                 headers={'Transfer-Encoding': 'chunked'})
+        assert status == 200, upload
+        assert upload['result']['engine'] == 'csv-stream'
+        assert upload['result']['total_rows'] == 3000
+        uploaded = os.path.join(work_dir, 'uploaded', 'R1_orders.csv')
+        assert read_ids(uploaded) == list(range(1, 3000, 3))
+
+        # A Content-Length upload missing a split field fails as a job
+        query = urlencode([
+            ('output_dir', os.path.join(work_dir, 'bad')), ('split_by', 'CITY'), ('include', 'ID')
+        ])
+        status, failed = request(service, 'POST', f'/uploads?{query}', body=csv_bytes(10))
+        assert status == 422 and failed['status'] == 'failed' and 'CITY' in failed['error']
+
+        status, jobs = request(service, 'GET', '/jobs')
+        assert status == 200
+        assert [job['status'] for job in jobs] == ['succeeded', 'succeeded', 'failed']
+        assert request(service, 'GET', '/jobs/999')[0] == 404
+        assert request(service, 'GET', '/jobs?status=bogus')[0] == 400
+        assert request(service, 'DELETE', f"/jobs/{job['id']}")[0] == 409
+    finally:
+        service.shutdown()
+        shutil.rmtree(work_dir)
+
+
+def test_malformed_requests_get_responses():
+    """Bad headers are a 400 and unexpected handler errors a 500, never a dropped connection."""
+    work_dir = tempfile.mkdtemp()
+    service = JobService(JobQueue(os.path.join(work_dir, 'jobs.db')), port=0, workers=1)
+    service.start()
+    try:
+        status, body = request(service, 'POST', '/jobs', b'{}', headers={'Content-Length': 'abc'})
+        assert status == 400 and 'Content-Length' in body['error']
+        query = urlencode([('output_dir', work_dir), ('split_by', 'REGION'), ('include', 'ID')])
+        status, body = request(
+            service, 'POST', f'/uploads?{query}', b'ID', headers={'Content-Length': '-5'}
+        )
+        assert status == 400 and 'Content-Length' in body['error']
+
+        def broken(job_id):
+            raise RuntimeError("database went away")
+        service.queue.get = broken
+        status, body = request(service, 'GET', '/jobs/1')
+        assert status == 500 and 'database went away' in body['error']
+    finally:
+        service.shutdown()
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_stream_source_split()
+    test_http_jobs_and_uploads()
+    test_malformed_requests_get_responses()
+    print("✓ All job service tests passed")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for sorting rows within partitions.
+"""
+
+import csv
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.config import Config
+from csv_processor.sorting import SortColumn, SortingWriter, build_sort_key
+from csv_processor.writers import PartitionFileWriter
+
+
+def create_test_csv(rows=6000):
+    """Create a test CSV file with shuffled amounts and dates."""
+    rng = random.Random(7)
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION', 'AMOUNT', 'DAY'])
+        for i in range(rows):
+            amount = '' if i % 97 == 0 else str(rng.randint(-500, 5000))
+            day = f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+            writer.writerow([str(i), ['North', 'South'][i % 2], amount, day])
+        return f.name
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_typed_sort_keys():
+    """Numeric values compare as numbers, invalid ones sort last in both directions."""
+    header = ['N', 'S']
+    rows = [['10', 'b'], ['9', 'a'], ['', 'c'], ['x', 'a'], ['-1.5', 'b']]
+
+    ascending = build_sort_key([SortColumn('N', 'numeric')], header)
+    assert [row[0] for row in sorted(rows, key=ascending)] == ['-1.5', '9', '10', '', 'x']
+
+    descending = build_sort_key([SortColumn('N', 'numeric', descending=True)], header)
+    assert [row[0] for row in sorted(rows, key=descending)] == ['10', '9', '-1.5', '', 'x']
+
+    mixed = build_sort_key([SortColumn('S', descending=True), SortColumn('N', 'numeric')], header)
+    assert [row for row in sorted(rows, key=mixed)][:2] == [['', 'c'], ['-1.5', 'b']]
+
+    dates = build_sort_key([SortColumn('N', 'date', date_format='%d/%m/%Y')], header)
+    assert sorted([['02/01/2024'], ['01/02/2023']], key=dates) == [['01/02/2023'], ['02/01/2024']]
+
+
+def test_external_sort_with_spilled_runs():
+    """A tiny memory budget forces spilled runs and the merged output is sorted and stable."""
+    test_file = create_test_csv()
+    output_dir = tempfile.mkdtemp()
+    try:
+        processor = CSVProcessor(progress_callback=lambda msg: None, writer_threads=2)
+        result = processor.split_csv_by_fields(
+            test_file, output_dir, ['REGION'], ['ID', 'AMOUNT', 'DAY'],
+            sort_by=[SortColumn('AMOUNT', 'numeric'), SortColumn('DAY', 'date')],
+            sort_memory=64 * 1024
+        )
+        assert result.success, result.error
+        assert result.total_rows == 6000
+
+        with open(test_file, newline='') as f:
+            source = list(csv.DictReader(f))
+        for region in ('North', 'South'):
+            rows = read_rows(os.path.join(output_dir, f'{region}_{Path(test_file).stem}.csv'))
+            expected = [row for row in source if row['REGION'] == region]
+            # Stable sort: equal keys keep their source order
+            expected.sort(key=lambda row: row['DAY'])
+            expected.sort(key=lambda row: (row['AMOUNT'] == '', int(row['AMOUNT'] or 0)))
+            assert [row['ID'] for row in rows] == [row['ID'] for row in expected]
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+def test_multi_pass_merge():
+    """Many spilled runs are merged in passes of at most SORT_MERGE_FAN_IN files."""
+    output_dir = tempfile.mkdtemp()
+    original_fan_in = Config.SORT_MERGE_FAN_IN
+    rng = random.Random(3)
+    values = [rng.randint(0, 300) for _ in range(3000)]
+    try:
+        Config.SORT_MERGE_FAN_IN = 4
+        inner = PartitionFileWriter(
+            ['V', 'SEQ'], lambda key: os.path.join(output_dir, f'{key[0]}.csv')
+        )
+        sort_key = build_sort_key([SortColumn('V', 'numeric')], ['V', 'SEQ'])
+        writer = SortingWriter(inner, sort_key, memory_budget=4096)
+        for start in range(0, len(values), 100):
+            batch = values[start:start + 100]
+            writer.append(('all',), [[str(v), str(start + i)] for i, v in enumerate(batch)])
+        writer.close_all()
+        assert writer.runs_spilled > 16
+        assert 0 < writer.peak_merge_files <= 5
+
+        rows = read_rows(os.path.join(output_dir, 'all.csv'))
+        assert [(int(row['V']), int(row['SEQ'])) for row in rows] == sorted(
+            (v, seq) for seq, v in enumerate(values)
+        )
+        assert os.listdir(output_dir) == ['all.csv']
+    finally:
+        Config.SORT_MERGE_FAN_IN = original_fan_in
+        shutil.rmtree(output_dir)
+
+
+def test_failed_run_discards_runs():
+    """After a failure spilled runs are removed and no partial partitions are merged and written."""
+    output_dir = tempfile.mkdtemp()
+    spill_dir = tempfile.mkdtemp()
+    try:
+        inner = PartitionFileWriter(['V'], lambda key: os.path.join(output_dir, f'{key[0]}.csv'))
+        sort_key = build_sort_key([SortColumn('V')], ['V'])
+        writer = SortingWriter(inner, sort_key, memory_budget=1024, temp_dir=spill_dir)
+        for start in range(0, 2000, 100):
+            writer.append(('all',), [[str(v)] for v in range(start, start + 100)])
+        assert writer.runs_spilled > 0 and os.listdir(spill_dir)
+        writer.abort()
+        assert os.listdir(spill_dir) == [] and os.listdir(output_dir) == []
+
+        # Bytes that are not UTF-8, past the detection sample, fail the read after runs were spilled
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+            csv_writer = csv.writer(f)
+            csv_writer.writerow(['ID', 'REGION', 'AMOUNT'])
+            for i in range(Config.PARSE_BATCH_SIZE * 2):
+                csv_writer.writerow([str(i), ['North', 'South'][i % 2], str(i % 977)])
+            test_file = f.name
+        with open(test_file, 'ab') as f:
+            f.write(b'broken,\xff\xfe,1\n')
+        try:
+            result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+                test_file, output_dir, ['REGION'], ['ID', 'AMOUNT'],
+                sort_by=['AMOUNT'], sort_memory=64 * 1024
+            )
+            assert not result.success
+            assert os.listdir(output_dir) == []
+        finally:
+            os.unlink(test_file)
+    finally:
+        shutil.rmtree(output_dir)
+        shutil.rmtree(spill_dir)
+
+
+def test_sort_field_must_be_included():
+    """Sorting by a field that is not written is rejected."""
+    test_file = create_test_csv(rows=10)
+    output_dir = tempfile.mkdtemp()
+    try:
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_by_fields(
+            test_file, output_dir, ['REGION'], ['ID'], sort_by=['AMOUNT']
+        )
+        assert not result.success
+        assert 'AMOUNT' in result.error
+    finally:
+        os.unlink(test_file)
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    test_typed_sort_keys()
+    test_external_sort_with_spilled_runs()
+    test_multi_pass_merge()
+    test_failed_run_discards_runs()
+    test_sort_field_must_be_included()
+    print("✓ All sorting tests passed")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite output sink.
+"""
+
+import csv
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor import CSVProcessor
+from csv_processor.sqlite_sink import SQLiteSink
+
+
+def create_test_csv(work_dir, rows=3000):
+    """Create a test CSV file with regions whose names differ only in case."""
+    path = os.path.join(work_dir, 'orders.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'REGION', 'AMOUNT'])
+        regions = ['North', 'north', 'South "S"', '']
+        for i in range(rows):
+            writer.writerow([str(i), regions[i % len(regions)], str(i * 3)])
+    return path
+
+
+def test_single_table_with_key_index():
+    """All rows land in one table with the split field as an indexed column."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = create_test_csv(work_dir)
+        database = os.path.join(work_dir, 'out', 'orders.db')
+        processor = CSVProcessor(progress_callback=lambda msg: None)
+        result = processor.split_csv_to_sqlite(
+            source, database, ['REGION'], ['ID', 'REGION', 'AMOUNT'], index_fields=['AMOUNT']
+        )
+        assert result.success, result.error
+        assert result.total_rows == 3000 and result.files_created == 1
+        assert result.bytes_written == os.path.getsize(database)
+        assert {info.split_key: info.rows for info in result.partitions} == {
+            ('North',): 750, ('north',): 750, ('South "S"',): 750, ('',): 750
+        }
+        assert not os.path.exists(database + '.building')
+
+        with sqlite3.connect(database) as conn:
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(data)')]
+            assert columns == ['REGION', 'ID', 'AMOUNT']
+            rows = conn.execute(
+                "SELECT ID, AMOUNT FROM data WHERE REGION = 'north' ORDER BY rowid"
+            ).fetchall()
+            assert rows == [(str(i), str(i * 3)) for i in range(1, 3000, 4)]
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(data)")}
+            assert indexes == {'data_key_idx', 'data_AMOUNT_idx'}
+            plan = ' '.join(str(row) for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM data WHERE REGION = 'North'"
+            ))
+            assert 'data_key_idx' in plan
+
+        # A second run replaces the database
+        result = processor.split_csv_to_sqlite(source, database, ['REGION'], ['ID'])
+        assert result.success, result.error
+        with sqlite3.connect(database) as conn:
+            assert conn.execute('SELECT COUNT(*) FROM data').fetchone()[0] == 3000
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_table_per_key():
+    """Each key gets its own table, unique ignoring case, listed in a catalog."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = create_test_csv(work_dir)
+        database = os.path.join(work_dir, 'orders.db')
+        result = CSVProcessor(progress_callback=lambda msg: None).split_csv_to_sqlite(
+            source, database, ['REGION'], ['ID', 'AMOUNT'], table='orders', table_per_key=True
+        )
+        assert result.success, result.error
+        with sqlite3.connect(database) as conn:
+            catalog = conn.execute(
+                'SELECT REGION, table_name, row_count FROM orders_partitions'
+            ).fetchall()
+            assert catalog == [
+                ('North', 'orders_North', 750), ('north', 'orders_north_2', 750),
+                ('South "S"', 'orders_SouthS', 750), ('', 'orders_empty', 750),
+            ]
+            for region, table_name, count in catalog:
+                rows = conn.execute(f'SELECT ID FROM "{table_name}" ORDER BY rowid').fetchall()
+                assert len(rows) == count
+            first = conn.execute('SELECT ID FROM orders_north_2 LIMIT 2').fetchall()
+            assert first == [('1',), ('5',)]
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_batches_and_transactions():
+    """Rows are inserted in executemany batches and committed in transactions."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        database = os.path.join(work_dir, 'small.db')
+        sink = SQLiteSink(database, ['ID'], ['KEY'], batch_rows=10, transaction_rows=25)
+        statements = []
+        sink._conn.set_trace_callback(statements.append)
+        for i in range(100):
+            sink.write((str(i % 7),), [(str(i),)])
+        sink.close()
+        assert sum(1 for s in statements if s.startswith('INSERT')) == 100
+        assert sum(1 for s in statements if s == 'COMMIT') == 100 // 30 + 1
+        with sqlite3.connect(database) as conn:
+            assert conn.execute('SELECT COUNT(*) FROM data').fetchone()[0] == 100
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_single_table_with_key_index()
+    test_table_per_key()
+    test_batches_and_transactions()
+    print("✓ All SQLite sink tests passed")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for watch-folder mode.
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from csv_processor.sorting import SortColumn
+from csv_processor.watch import SplitConfig, WatchFolder
+
+
+def write_test_csv(path, rows=50, header=('ID', 'REGION')):
+    """Write a test CSV file with a REGION column to split by."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(rows):
+            writer.writerow([str(i), f'R{i % 2}'])
+    return path
+
+
+def make_old(path, age=3600):
+    old = time.time() - age
+    os.utime(path, (old, old))
+
+
+def test_split_config_round_trip():
+    """A saved configuration loads back with the same options."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        config = SplitConfig(
+            os.path.join(work_dir, 'out'), ['REGION'], ['ID'],
+            sort_by=[SortColumn('ID', kind='numeric')], writer_threads=2
+        )
+        path = os.path.join(work_dir, 'split.json')
+        config.save(path)
+        loaded = SplitConfig.load(path)
+        assert loaded.to_dict() == config.to_dict()
+        assert loaded.options['sort_by'][0]['kind'] == 'numeric'
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def test_dropped_files_are_split_and_moved():
+    """Stable files are split and moved to done, broken ones to failed, with inotify and polling."""
+    for use_inotify in (True, False):
+        work_dir = tempfile.mkdtemp()
+        try:
+            drop_dir = os.path.join(work_dir, 'drop')
+            output_dir = os.path.join(work_dir, 'out')
+            os.makedirs(drop_dir)
+            for n in range(3):
+                make_old(write_test_csv(os.path.join(drop_dir, f'old{n}.csv')))
+            make_old(write_test_csv(os.path.join(drop_dir, 'broken.csv'), header=('ID', 'OTHER')))
+            write_test_csv(os.path.join(drop_dir, 'notes.txt'))
+
+            watcher = WatchFolder(
+                drop_dir, SplitConfig(output_dir, ['REGION'], ['ID']), workers=2,
+                stable_seconds=0.3, poll_interval=0.05, use_inotify=use_inotify,
+                progress_callback=lambda msg: None
+            )
+            thread = threading.Thread(target=watcher.run)
+            thread.start()
+            try:
+                # A file still being written is left alone until it stops changing
+                growing = os.path.join(drop_dir, 'late.csv')
+                write_test_csv(growing, rows=10)
+                for _ in range(5):
+                    time.sleep(0.1)
+                    with open(growing, 'a') as f:
+                        f.write('99,R1\n')
+                assert not os.path.exists(os.path.join(drop_dir, 'done', 'late.csv'))
+
+                deadline = time.time() + 20
+                while time.time() < deadline and watcher.files_done + watcher.files_failed < 5:
+                    time.sleep(0.05)
+            finally:
+                watcher.stop()
+                thread.join()
+
+            done = sorted(os.listdir(os.path.join(drop_dir, 'done')))
+            assert done == ['late.csv', 'old0.csv', 'old1.csv', 'old2.csv']
+            assert os.listdir(os.path.join(drop_dir, 'failed')) == ['broken.csv']
+            assert sorted(os.listdir(drop_dir)) == ['done', 'failed', 'notes.txt']
+            with open(os.path.join(output_dir, 'R1_late.csv'), newline='') as f:
+                assert len(list(csv.reader(f))) == 1 + 5 + 5
+            assert watcher.files_done == 4 and watcher.files_failed == 1
+        finally:
+            shutil.rmtree(work_dir)
+
+
+def test_polling_lists_directory_only_when_it_changes():
+    """An unchanged drop directory is not listed again, however many files it holds."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        drop_dir = os.path.join(work_dir, 'drop')
+        os.makedirs(os.path.join(drop_dir, 'done'))
+        os.makedirs(os.path.join(drop_dir, 'failed'))
+        for n in range(500):
+            open(os.path.join(drop_dir, f'archive{n}.txt'), 'w').close()
+        make_old(drop_dir)
+
+        watcher = WatchFolder(
+            drop_dir, SplitConfig(os.path.join(work_dir, 'out'), ['REGION'], ['ID']),
+            stable_seconds=0.0, use_inotify=False, progress_callback=lambda msg: None
+        )
+        for _ in range(20):
+            watcher.poll()
+        assert watcher.listings == 1
+
+        make_old(write_test_csv(os.path.join(drop_dir, 'new.csv')))
+        watcher.poll()
+        assert watcher.listings == 2
+        watcher.close()
+        assert watcher.files_done == 1
+        assert os.path.exists(os.path.join(drop_dir, 'done', 'new.csv'))
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    test_split_config_round_trip()
+    test_dropped_files_are_split_and_moved()
+    test_polling_lists_directory_only_when_it_changes()
+    print("✓ All watch folder tests passed")